@@ -57,6 +57,7 @@ class ServiceCache:
                 model_id="global.anthropic.claude-haiku-4-5-20251001-v1:0",
                 region="ap-southeast-2",
                 temperature=0.0,
+                retrieval_k=get_settings().vector_store.top_k,
             )
         return self._rag_agent
 
@@ -11,6 +11,7 @@ System role: Chat messaging HTTP API with streaming support
 import json
 import logging
 from collections.abc import AsyncGenerator
+from typing import Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -31,9 +32,17 @@ from backend.models.streaming import StreamEventType
 
 logger = logging.getLogger(__name__)
 
+# "event: <type>\ndata: " prefix per event type, encoded once
+_SSE_PREFIXES = {event_type: f"event: {event_type.value}\ndata: ".encode() for event_type in StreamEventType}
+
 router = APIRouter(prefix="/sessions", tags=["chat"])
 
 
+def _sse_event(event_type: StreamEventType, data: dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Event; runs once per streamed token, so the header is pre-encoded."""
+    return _SSE_PREFIXES[event_type] + json.dumps(data).encode() + b"\n\n"
+
+
 @router.post("/{session_id}/chat", response_model=ChatResponse)
 async def chat(
     session_id: UUID,
@@ -145,7 +154,7 @@ async def chat_stream(
     """
     logger.info(f"{__name__}:chat_stream - START session_id={session_id}")
 
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
         """Generate SSE events from chat stream."""
         try:
             async for event in chat_service.stream_chat(
@@ -154,23 +163,19 @@ async def chat_stream(
                 context_window_size=10,
             ):
                 # Format as SSE: "event: {type}\ndata: {json}\n\n"
-                event_type = event.event.value
-                event_data = json.dumps(event.data)
-                yield f"event: {event_type}\ndata: {event_data}\n\n"
+                yield _sse_event(event.event, event.data)
 
             logger.info(f"{__name__}:chat_stream - Stream completed for session_id={session_id}")
 
         except ValueError as e:
             # Session not found
             logger.error(f"{__name__}:chat_stream - ValueError: {e}")
-            error_data = json.dumps({"code": "SESSION_NOT_FOUND", "message": str(e)})
-            yield f"event: error\ndata: {error_data}\n\n"
+            yield _sse_event(StreamEventType.ERROR, {"code": "SESSION_NOT_FOUND", "message": str(e)})
 
         except Exception as e:
             # Generic error
             logger.error(f"{__name__}:chat_stream - {type(e).__name__}: {e}")
-            error_data = json.dumps({"code": "PROCESSING_ERROR", "message": str(e)})
-            yield f"event: error\ndata: {error_data}\n\n"
+            yield _sse_event(StreamEventType.ERROR, {"code": "PROCESSING_ERROR", "message": str(e)})
 
     return StreamingResponse(
         event_generator(),
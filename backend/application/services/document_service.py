@@ -10,6 +10,7 @@ System role: Document management orchestration
 
 from uuid import UUID
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.boundary.db.CRUD.document_crud import document_crud
@@ -115,8 +116,10 @@ class DocumentService:
         )
 
         try:
-            # Process document through pipeline
-            result = self.pipeline.process(
+            # Process document through pipeline; parsing, embedding and the
+            # batched S3 Vectors writes are blocking, so keep them off the event loop
+            result = await run_in_threadpool(
+                self.pipeline.process,
                 file_path=file_path,
                 s3_key=s3_key,
                 document_id=str(document.id),
@@ -165,7 +168,8 @@ class DocumentService:
         Returns:
             list[dict]: Search results with content, score, metadata
         """
-        results = self.vector_store.similarity_search(
+        results = await run_in_threadpool(
+            self.vector_store.similarity_search,
             query=query,
             k=k,
             session_id=str(session_id),
@@ -220,13 +224,11 @@ class DocumentService:
                 f"Document {doc_id} does not belong to session {session_id}"
             )
 
-        # Query S3 Vectors for all chunks belonging to this document
-        # Use a minimal dummy query since S3 Vectors requires a non-empty query for embedding
-        # Filtering by doc_id metadata ensures we get chunks only for this document
-        search_results = self.vector_store.similarity_search(
-            query=" ",  # Minimal non-empty query (S3 Vectors requires this)
-            k=1000,  # Get all chunks for this document
+        # List all chunks belonging to this document by their doc_id metadata
+        search_results = await run_in_threadpool(
+            self.vector_store.list_by_metadata,
             doc_id=str(doc_id),
+            limit=1000,  # Get all chunks for this document
         )
 
         # Extract chunk IDs from search results
@@ -234,7 +236,7 @@ class DocumentService:
 
         # Delete chunks from S3 Vectors if any exist
         if chunk_ids:
-            self.vector_store.delete_by_doc_id(str(doc_id), chunk_ids)
+            await run_in_threadpool(self.vector_store.delete_by_doc_id, str(doc_id), chunk_ids)
 
         # Delete document record from database
         await document_crud.delete_by_id(self.db, doc_id)
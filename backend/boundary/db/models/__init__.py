@@ -6,13 +6,34 @@ Exports:
   - DocumentModel, DocumentStatus: Document ORM model and status enum
   - JobModel, JobStatus, JobType: Job ORM model and related enums
 
+Models are resolved lazily (PEP 562) so importing one model does not pull
+in every other model module and its SQLAlchemy dialect types.
+
 Dependencies: sqlalchemy, backend.boundary.db.base
 System role: Database model definitions for domain entities
 """
 
-from backend.boundary.db.models.session_model import SessionModel
-from backend.boundary.db.models.document_model import DocumentModel, DocumentStatus
-from backend.boundary.db.models.job_model import JobModel, JobStatus, JobType
+import importlib
+
+_LAZY_EXPORTS: dict[str, str] = {
+    "SessionModel": "backend.boundary.db.models.session_model",
+    "DocumentModel": "backend.boundary.db.models.document_model",
+    "DocumentStatus": "backend.boundary.db.models.document_model",
+    "JobModel": "backend.boundary.db.models.job_model",
+    "JobStatus": "backend.boundary.db.models.job_model",
+    "JobType": "backend.boundary.db.models.job_model",
+}
+
+
+def __getattr__(name: str):
+    """Lazy import model classes on first attribute access."""
+    module_path = _LAZY_EXPORTS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_path), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "SessionModel",
@@ -0,0 +1,280 @@
+"""
+Columnar chunk store for the local FAISS vector store.
+
+Replaces LangChain's pickled InMemoryDocstore. Chunk text and metadata are
+kept in Arrow IPC segment files that are memory-mapped on load, so saving
+only writes the rows added since the last save and loading does not
+materialize a Python Document per chunk. The filterable fields get their
+own columns; any other metadata is kept as a JSON string in "extra".
+
+Dependencies: pyarrow, numpy, langchain_community.docstore
+System role: Chunk text/metadata persistence for FAISSVectorsStore
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+import numpy as np
+import pyarrow as pa
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+METADATA_FIELDS = ("session_id", "doc_id", "chunk_id", "page", "section", "source_uri")
+
+CHUNK_SCHEMA = pa.schema([
+    ("faiss_id", pa.int64()),
+    ("docstore_id", pa.string()),
+    ("text", pa.string()),
+    ("session_id", pa.string()),
+    ("doc_id", pa.string()),
+    ("chunk_id", pa.string()),
+    ("page", pa.int64()),
+    ("section", pa.string()),
+    ("source_uri", pa.string()),
+    ("extra", pa.string()),
+])
+
+DELETED_FILE = "deleted.npy"
+
+# Rewrite segments once this fraction of stored rows has been deleted
+COMPACTION_RATIO = 0.25
+
+
+class ChunkRow(NamedTuple):
+    """Lightweight chunk record returned by lookups (no Document allocation)."""
+
+    faiss_id: int
+    docstore_id: str
+    text: str
+    session_id: str | None
+    doc_id: str | None
+    chunk_id: str | None
+    page: int | None
+    section: str | None
+    source_uri: str | None
+    # JSON object of metadata outside METADATA_FIELDS (absent in older segments)
+    extra: str | None = None
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        """Metadata dict with unset fields omitted."""
+        metadata = json.loads(self.extra) if self.extra else {}
+        metadata.update(
+            (field, value)
+            for field in METADATA_FIELDS
+            if (value := getattr(self, field)) is not None
+        )
+        return metadata
+
+
+class ArrowChunkStore(Docstore):
+    """
+    Append-only Arrow segments keyed by faiss id, with an in-memory tail.
+
+    Rows added since the last save live in a pending list; save() writes
+    them as one new segment file. Deletes are tombstoned and persisted as
+    a small id array; segments are compacted once tombstones dominate.
+    Implements LangChain's Docstore interface so the FAISS wrapper
+    (as_retriever, MMR) keeps working.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._segments: list[pa.Table] = []
+        self._segment_paths: list[Path] = []
+        self._pending: list[ChunkRow] = []
+        # faiss_id -> (segment index or -1 for pending, row)
+        self._locations: dict[int, tuple[int, int]] = {}
+        self._faiss_id_by_key: dict[str, int] = {}
+        self._deleted: set[int] = set()
+        self._max_faiss_id = -1
+
+    @classmethod
+    def load(cls, directory: Path) -> "ArrowChunkStore":
+        """
+        Memory-map every segment in a directory written by save().
+
+        Args:
+            directory: Chunk store directory
+
+        Returns:
+            ArrowChunkStore: Store backed by the mapped segments
+        """
+        store = cls()
+        deleted_path = directory / DELETED_FILE
+        if deleted_path.exists():
+            store._deleted = set(np.load(deleted_path).tolist())
+
+        for path in sorted(directory.glob("segment-*.arrow")):
+            store._attach_segment(path)
+        return store
+
+    def _attach_segment(self, path: Path) -> None:
+        """Map a segment file and index its live rows."""
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        segment = len(self._segments)
+        self._segments.append(table)
+        self._segment_paths.append(path)
+
+        faiss_ids = table.column("faiss_id").to_numpy()
+        if len(faiss_ids):
+            self._max_faiss_id = max(self._max_faiss_id, int(faiss_ids.max()))
+        for row, (faiss_id, key) in enumerate(
+            zip(faiss_ids.tolist(), table.column("docstore_id").to_pylist())
+        ):
+            if faiss_id in self._deleted:
+                continue
+            self._locations[faiss_id] = (segment, row)
+            self._faiss_id_by_key[key] = faiss_id
+
+    @property
+    def max_faiss_id(self) -> int:
+        """Largest faiss id ever stored, including deleted rows (-1 if empty)."""
+        return self._max_faiss_id
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def index_to_docstore_id(self) -> dict[int, str]:
+        """Mapping of live faiss ids to docstore ids for the LangChain wrapper."""
+        return {faiss_id: key for key, faiss_id in self._faiss_id_by_key.items()}
+
+    def add_chunks(
+        self,
+        faiss_ids: Iterable[int],
+        docstore_ids: Iterable[str],
+        texts: Iterable[str],
+        metadatas: Iterable[dict[str, Any]],
+    ) -> None:
+        """Append chunks to the in-memory tail (persisted on the next save)."""
+        for faiss_id, key, text, metadata in zip(faiss_ids, docstore_ids, texts, metadatas):
+            row = ChunkRow(
+                faiss_id,
+                key,
+                text,
+                *(_to_str(metadata.get(field)) for field in ("session_id", "doc_id", "chunk_id")),
+                _to_int(metadata.get("page")),
+                *(_to_str(metadata.get(field)) for field in ("section", "source_uri")),
+                _extra_json(metadata),
+            )
+            self._locations[faiss_id] = (-1, len(self._pending))
+            self._faiss_id_by_key[key] = faiss_id
+            self._pending.append(row)
+            self._max_faiss_id = max(self._max_faiss_id, faiss_id)
+
+    def take(self, faiss_ids: Iterable[int]) -> list[ChunkRow | None]:
+        """
+        Fetch rows for faiss ids, batching the Arrow gathers per segment.
+
+        Returns:
+            list[ChunkRow | None]: Rows aligned with faiss_ids (None if unknown)
+        """
+        faiss_ids = list(faiss_ids)
+        rows: list[ChunkRow | None] = [None] * len(faiss_ids)
+        by_segment: dict[int, list[tuple[int, int]]] = {}
+        for position, faiss_id in enumerate(faiss_ids):
+            location = self._locations.get(faiss_id)
+            if location is None:
+                continue
+            segment, row = location
+            if segment < 0:
+                rows[position] = self._pending[row]
+            else:
+                by_segment.setdefault(segment, []).append((position, row))
+
+        for segment, wanted in by_segment.items():
+            taken = self._segments[segment].take(pa.array([row for _, row in wanted]))
+            for (position, _), record in zip(wanted, taken.to_pylist()):
+                rows[position] = ChunkRow(**record)
+        return rows
+
+    def live_rows(self) -> list[ChunkRow]:
+        """All non-deleted rows (used to rebuild derived in-memory state)."""
+        return [row for row in self.take(self._locations) if row is not None]
+
+    def search(self, search: str) -> Document | str:
+        """LangChain Docstore lookup by docstore id."""
+        faiss_id = self._faiss_id_by_key.get(search)
+        if faiss_id is None:
+            return f"ID {search} not found."
+        row = self.take([faiss_id])[0]
+        return Document(id=row.docstore_id, page_content=row.text, metadata=row.metadata)
+
+    def delete(self, ids: list) -> None:
+        """Tombstone rows by docstore id."""
+        for key in ids:
+            faiss_id = self._faiss_id_by_key.pop(key, None)
+            if faiss_id is None:
+                continue
+            self._locations.pop(faiss_id, None)
+            self._deleted.add(faiss_id)
+
+    def save(self, directory: Path) -> None:
+        """
+        Persist pending rows as a new segment and the tombstone list.
+
+        Compacts all live rows into a single segment when tombstones exceed
+        COMPACTION_RATIO of the stored rows.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        stored = sum(table.num_rows for table in self._segments) + len(self._pending)
+        if stored and len(self._deleted) / stored > COMPACTION_RATIO:
+            self._compact(directory)
+            return
+
+        if self._pending:
+            rows, self._pending = self._pending, []
+            path = self._write_segment(directory, rows)
+            self._attach_segment(path)
+        _atomic_save_npy(directory / DELETED_FILE, np.fromiter(self._deleted, dtype=np.int64))
+
+    def _compact(self, directory: Path) -> None:
+        """Rewrite live rows into one segment and drop tombstones."""
+        rows = self.live_rows()
+        old_paths = self._segment_paths
+        new_path = self._write_segment(directory, rows)
+
+        self.__init__()
+        self._attach_segment(new_path)
+        for path in old_paths:
+            path.unlink(missing_ok=True)
+        _atomic_save_npy(directory / DELETED_FILE, np.zeros(0, dtype=np.int64))
+        logger.info("%s:_compact - Compacted chunk store to %d rows", __name__, len(rows))
+
+    def _write_segment(self, directory: Path, rows: list[ChunkRow]) -> Path:
+        """Write rows to the next segment file atomically."""
+        next_number = 1 + max(
+            (int(path.stem.split("-")[1]) for path in directory.glob("segment-*.arrow")),
+            default=-1,
+        )
+        path = directory / f"segment-{next_number:06d}.arrow"
+        tmp_path = path.with_suffix(".arrow.tmp")
+        table = pa.Table.from_pylist([row._asdict() for row in rows], schema=CHUNK_SCHEMA)
+        with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, CHUNK_SCHEMA) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+        return path
+
+
+def _to_str(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def _to_int(value: Any) -> int | None:
+    return None if value is None else int(value)
+
+
+def _extra_json(metadata: dict[str, Any]) -> str | None:
+    extra = {key: value for key, value in metadata.items() if key not in METADATA_FIELDS}
+    return json.dumps(extra, default=str) if extra else None
+
+
+def _atomic_save_npy(path: Path, array: np.ndarray) -> None:
+    tmp_path = path.with_suffix(".tmp.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
@@ -0,0 +1,17 @@
+"""
+Persistent embedding cache shared across processes and restarts.
+
+Re-exports the implementation from the ingestion package, which must stay
+importable on its own inside the document processing Lambda image.
+
+Dependencies: backend.core.document_processing.embedding_cache
+System role: Embedding API call avoidance for the vector stores
+"""
+
+from backend.core.document_processing.embedding_cache import (
+    DEFAULT_CACHE_PATH,
+    SQLiteEmbeddingCache,
+    get_embedding_cache,
+)
+
+__all__ = ["DEFAULT_CACHE_PATH", "SQLiteEmbeddingCache", "get_embedding_cache"]
@@ -0,0 +1,275 @@
+"""
+FAISS index construction helpers for the local vector store.
+
+Builds ID-addressable FAISS indexes (flat, HNSW, IVF-PQ) so chunks keep
+stable int64 ids across deletes, optionally storing flat/HNSW vectors as
+fp16 or int8 scalar-quantized codes, migrates to IVF-PQ or int8 once enough
+vectors have been accumulated to train them, builds per-index-type
+search parameters, memory-maps saved indexes and sizes the OpenMP thread
+pool for the container.
+
+Dependencies: faiss-cpu, numpy
+System role: Index selection and training for FAISSVectorsStore
+"""
+
+import math
+import os
+from typing import Literal
+
+import faiss
+import numpy as np
+
+# Faiss rule of thumb: k-means needs ~39 training points per centroid
+TRAINING_POINTS_PER_CENTROID = 39
+
+IndexType = Literal["flat", "hnsw", "ivfpq", "mmap_flat"]
+
+Precision = Literal["fp32", "fp16", "int8"]
+
+SCALAR_QUANTIZER_TYPES = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# int8 codes use per-dimension min/max ranges calibrated on this many vectors
+SQ_TRAINING_SIZE = 10_000
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def available_cpus(cpu_max_path: str = CGROUP_CPU_MAX) -> int:
+    """
+    CPUs usable by this process, honouring a cgroup v2 CPU quota.
+
+    os.cpu_count() reports host cores, which oversubscribes OpenMP inside
+    a container limited to a fraction of them.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        with open(cpu_max_path) as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def configure_omp_threads(num_threads: int | None = None) -> int:
+    """
+    Set the FAISS OpenMP thread count (process-wide).
+
+    Args:
+        num_threads: Explicit thread count; defaults to available_cpus().
+            Use 1 when many searches run concurrently so request-level
+            parallelism is not multiplied by OpenMP threads.
+
+    Returns:
+        int: Thread count applied
+    """
+    threads = max(1, num_threads or available_cpus())
+    faiss.omp_set_num_threads(threads)
+    return threads
+
+
+def default_nlist(expected_corpus_size: int) -> int:
+    """Number of IVF cells for an expected corpus size (4 * sqrt(N), min 4)."""
+    return max(4, int(4 * math.sqrt(max(expected_corpus_size, 1))))
+
+
+def ivfpq_training_threshold(nlist: int, pq_nbits: int) -> int:
+    """Minimum vector count before IVF-PQ can be trained reliably."""
+    return TRAINING_POINTS_PER_CENTROID * max(nlist, 2**pq_nbits)
+
+
+def create_flat_index(dimension: int, precision: Precision = "fp32") -> faiss.Index:
+    """
+    Create a brute-force L2 index that accepts caller-assigned ids.
+
+    fp16/int8 store scalar-quantized codes; int8 must be trained before
+    vectors are added.
+    """
+    if precision == "fp32":
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(dimension))
+    return faiss.IndexIDMap2(
+        faiss.IndexScalarQuantizer(dimension, SCALAR_QUANTIZER_TYPES[precision], faiss.METRIC_L2)
+    )
+
+
+def create_hnsw_index(
+    dimension: int,
+    m: int = 32,
+    ef_construction: int = 200,
+    precision: Precision = "fp32",
+) -> faiss.Index:
+    """
+    Create an HNSW graph index that accepts caller-assigned ids.
+
+    fp16/int8 store scalar-quantized codes; int8 must be trained before
+    vectors are added.
+    """
+    if precision == "fp32":
+        hnsw = faiss.IndexHNSWFlat(dimension, m)
+    else:
+        hnsw = faiss.IndexHNSWSQ(dimension, SCALAR_QUANTIZER_TYPES[precision], m)
+    hnsw.hnsw.efConstruction = ef_construction
+    return faiss.IndexIDMap2(hnsw)
+
+
+def scalar_quantizer_type(index: faiss.Index) -> int | None:
+    """Return the ScalarQuantizer qtype of a flat/HNSW index, or None for float storage."""
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap2) else index
+    if isinstance(inner, faiss.IndexHNSW):
+        inner = faiss.downcast_index(inner.storage)
+    return inner.sq.qtype if isinstance(inner, faiss.IndexScalarQuantizer) else None
+
+
+def extract_hnsw(index: faiss.Index) -> faiss.IndexHNSW | None:
+    """Return the HNSW index inside an IDMap wrapper, or None."""
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap2) else index
+    return inner if isinstance(inner, faiss.IndexHNSW) else None
+
+
+def export_vectors(index: faiss.IndexIDMap2) -> tuple[np.ndarray, np.ndarray]:
+    """Return (vectors, ids) held by an IndexIDMap2-wrapped flat or HNSW index."""
+    ids = faiss.vector_to_array(index.id_map).astype(np.int64)
+    vectors = index.index.reconstruct_n(0, index.ntotal)
+    return vectors, ids
+
+
+def read_index_mmap(path: str) -> faiss.Index:
+    """
+    Read an index with its code arrays memory-mapped from the file.
+
+    Worker processes loading the same file share its pages through the OS
+    page cache instead of each holding a private copy. Flat and HNSW codes
+    are copied into owned memory on the first add or remove, so the index
+    stays mutable. Mapped IVF inverted lists are read-only, so IVF indexes
+    are read fully into memory instead.
+
+    Args:
+        path: Index file written by faiss.write_index
+
+    Returns:
+        faiss.Index: Loaded index
+    """
+    index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    if faiss.try_extract_index_ivf(index) is not None:
+        return faiss.read_index(path)
+    return index
+
+
+def build_ivfpq_index(
+    vectors: np.ndarray,
+    ids: np.ndarray,
+    nlist: int,
+    pq_m: int,
+    pq_nbits: int,
+) -> faiss.IndexIVFPQ:
+    """
+    Train an IVF-PQ index on the given vectors and add them with their ids.
+
+    Args:
+        vectors: Training/add matrix of shape (n, d), float32
+        ids: int64 ids aligned with vectors
+        nlist: Number of inverted lists (coarse centroids)
+        pq_m: Number of PQ sub-quantizers (must divide d)
+        pq_nbits: Bits per sub-quantizer code
+
+    Returns:
+        faiss.IndexIVFPQ: Trained index with a hashtable direct map so
+        reconstruct() and remove_ids() work with arbitrary ids
+
+    Raises:
+        ValueError: If pq_m does not divide the vector dimension
+    """
+    dimension = vectors.shape[1]
+    if dimension % pq_m:
+        raise ValueError(f"pq_m={pq_m} must divide embedding dimension {dimension}")
+
+    quantizer = faiss.IndexFlatL2(dimension)
+    index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, pq_nbits)
+    index.train(vectors)
+    index.set_direct_map_type(faiss.DirectMap.Hashtable)
+    index.add_with_ids(vectors, ids)
+    return index
+
+
+def train_and_add(
+    index: faiss.Index,
+    vectors: np.ndarray,
+    ids: np.ndarray,
+    training_size: int = SQ_TRAINING_SIZE,
+) -> faiss.Index:
+    """
+    Train an empty index on the first training_size vectors, then add all of them.
+
+    Args:
+        index: Untrained, empty index (e.g. an int8 scalar-quantized index)
+        vectors: Matrix of shape (n, d), float32
+        ids: int64 ids aligned with vectors
+        training_size: Vectors used to calibrate the quantizer ranges
+
+    Returns:
+        faiss.Index: The trained, populated index
+    """
+    index.train(vectors[:training_size])
+    index.add_with_ids(vectors, ids)
+    return index
+
+
+def remove_vectors(index: faiss.Index, ids: np.ndarray) -> faiss.Index:
+    """
+    Remove ids from an index, returning the index to use afterwards.
+
+    HNSW graphs do not support removal, so the graph is reset (keeping any
+    trained quantizer) and rebuilt from the remaining vectors; other index
+    types remove in place.
+    """
+    if extract_hnsw(index) is None:
+        index.remove_ids(ids)
+        return index
+
+    vectors, existing_ids = export_vectors(index)
+    keep = ~np.isin(existing_ids, ids)
+    index.reset()
+    if keep.any():
+        index.add_with_ids(vectors[keep], existing_ids[keep])
+    return index
+
+
+def apply_search_defaults(index: faiss.Index, nprobe: int, ef_search: int) -> None:
+    """Set nprobe/efSearch on the index for searches that cannot pass params."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = nprobe
+    hnsw = extract_hnsw(index)
+    if hnsw is not None:
+        hnsw.hnsw.efSearch = ef_search
+
+
+def make_search_params(
+    index: faiss.Index,
+    selector: faiss.IDSelector | None,
+    nprobe: int,
+    ef_search: int,
+) -> faiss.SearchParameters | None:
+    """
+    Build per-query search parameters matching the index type.
+
+    Args:
+        index: Index being searched
+        selector: Optional id filter applied during the scan
+        nprobe: IVF cells to probe (IVF indexes only)
+        ef_search: HNSW candidate list size (HNSW indexes only)
+
+    Returns:
+        faiss.SearchParameters | None: None when defaults suffice
+    """
+    if faiss.try_extract_index_ivf(index) is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+    if extract_hnsw(index) is not None:
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=ef_search)
+    if selector is not None:
+        return faiss.SearchParameters(sel=selector)
+    return None
@@ -4,18 +4,67 @@ FAISS vector store for local development.
 Provides same interface as S3VectorsStore but uses local FAISS index.
 Supports session filtering and metadata-based retrieval.
 Uses Google Gemini embeddings for consistency with production.
+Uses an HNSW graph index by default; "flat" gives exact search and "ivfpq"
+starts flat and switches to IVF-PQ once the corpus is large enough to train;
+its approximate PQ distances can optionally be re-scored exactly against
+float32 vectors kept in a memory-mapped file on disk.
+"mmap_flat" keeps L2-normalized vectors in a memory-mapped float32 file and
+scores queries by exact cosine similarity with a single matrix product.
+Every index type reports cosine similarity (higher is better): stored and
+query vectors are L2-normalized, so a squared L2 distance d from the other
+index types is reported as 1 - d/2.
+Flat/HNSW vectors are stored as fp16 by default; "int8" switches to 8-bit
+scalar-quantized codes once enough vectors exist to calibrate their ranges.
+Chunk text and metadata live in memory-mapped Arrow segments next to the
+index file instead of a pickled docstore. Indexes saved in LangChain's
+FAISS.save_local layout ({index}.faiss + {index}.pkl) are migrated to
+Arrow segments on first load; an existing index that cannot be loaded
+stops startup instead of being replaced by an empty one.
 
-Dependencies: faiss-cpu, backend.boundary.vdb.embeddings_wrapper, backend.boundary.vdb.vector_schemas
+Dependencies: faiss-cpu, pyarrow, backend.boundary.vdb.embeddings_wrapper, backend.boundary.vdb.mmap_flat_index, backend.boundary.vdb.mmr, backend.boundary.vdb.single_flight, backend.boundary.vdb.vector_schemas
 System role: Local vector store for development RAG
 """
 
+import atexit
 import logging
+import os
+import shutil
+import threading
+import uuid
+import weakref
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
+import faiss
+import numpy as np
 from langchain_community.vectorstores import FAISS
 
-from backend.boundary.vdb.embeddings_wrapper import FixedDimensionEmbeddings
+from backend.boundary.vdb.arrow_chunk_store import ArrowChunkStore, ChunkRow
+from backend.boundary.vdb.embeddings_wrapper import get_fixed_dimension_embeddings
+from backend.boundary.vdb.faiss_index_builder import (
+    SQ_TRAINING_SIZE,
+    IndexType,
+    Precision,
+    apply_search_defaults,
+    build_ivfpq_index,
+    configure_omp_threads,
+    create_flat_index,
+    create_hnsw_index,
+    default_nlist,
+    export_vectors,
+    ivfpq_training_threshold,
+    make_search_params,
+    read_index_mmap,
+    remove_vectors,
+    scalar_quantizer_type,
+    train_and_add,
+)
+from backend.boundary.vdb.mmap_flat_index import MmapFlatIndex
+from backend.boundary.vdb.mmr import mmr_select
+from backend.boundary.vdb.query_embedding_batcher import QUERY_TASK_TYPE, QueryEmbeddingBatcher
+from backend.boundary.vdb.single_flight import SingleFlight
 from backend.boundary.vdb.vector_schemas import (
     VectorMetadata,
     VectorSearchResult,
@@ -25,16 +74,59 @@ logger = logging.getLogger(__name__)
 
 # Local index path - use /tmp in production for Docker compatibility
 # The directory is created lazily in __init__ to avoid permission errors at import time
-import os
 FAISS_INDEX_DIR = Path(os.getenv("FAISS_INDEX_DIR", "/tmp/.faiss_index"))
 
+# Mutations are persisted at most once per interval by a background thread
+SAVE_INTERVAL_S = 5.0
+
+# Repeated queries (dev loops, eval harnesses) reuse their embedding
+QUERY_EMBEDDING_CACHE_SIZE = 2048
+
+# Deleted vectors are masked at query time until they exceed this share of the index
+TOMBSTONE_COMPACTION_RATIO = 0.10
+
+# Stores not yet closed, flushed by one atexit hook; weak so a store
+# that is no longer referenced can still be collected
+_OPEN_STORES: weakref.WeakSet = weakref.WeakSet()
+
+
+def _close_open_stores() -> None:
+    """Close every store still open at interpreter exit, saving pending mutations."""
+    for store in list(_OPEN_STORES):
+        try:
+            store.close()
+        except Exception as e:
+            logger.error("%s:_close_open_stores - Save failed: %s: %s", __name__, type(e).__name__, e)
+
+
+atexit.register(_close_open_stores)
+
+
+def _persist_loop(store_ref: weakref.ref, stop: threading.Event, interval_s: float) -> None:
+    """
+    Background loop saving a store once per interval while it is dirty.
+
+    Holds only a weak reference between saves, so the thread exits once
+    the store is closed or garbage collected.
+    """
+    while not stop.wait(interval_s):
+        store = store_ref()
+        if store is None:
+            return
+        try:
+            store.flush()
+        except Exception as e:
+            logger.error("%s:_persist_loop - Save failed: %s: %s", __name__, type(e).__name__, e)
+        del store
+
 
 class FAISSVectorsStore:
     """
     FAISS vector store for local development.
 
     Wraps LangChain FAISS with session filtering and metadata support.
-    Persists index to disk for reuse across runs.
+    Persists index to disk for reuse across runs, debounced on a
+    background thread and flushed by close() or at interpreter exit.
     Uses Google Gemini embeddings for consistency with production.
     """
 
@@ -45,6 +137,20 @@ class FAISSVectorsStore:
         embedding_region: str = "us-east-1",
         embedding_model_id: str = "models/gemini-embedding-001",
         embedding_dimension: int = 1024,
+        index_type: IndexType = "hnsw",
+        precision: Precision = "fp16",
+        hnsw_m: int = 32,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        nlist: int | None = None,
+        pq_m: int = 64,
+        pq_nbits: int = 8,
+        nprobe: int = 16,
+        rescore_k_factor: int = 0,
+        expected_corpus_size: int = 10_000,
+        sq_training_size: int = SQ_TRAINING_SIZE,
+        save_interval_s: float = SAVE_INTERVAL_S,
+        query_embedding_cache_size: int = QUERY_EMBEDDING_CACHE_SIZE,
     ) -> None:
         """
         Initialize FAISS vector store with Google Gemini embeddings.
@@ -54,91 +160,483 @@ class FAISSVectorsStore:
             region: AWS region (used for consistency, not needed for FAISS)
             embedding_region: Unused - kept for backwards compatibility
             embedding_model_id: Google embedding model ID (default: gemini-embedding-001)
-            embedding_dimension: Output dimension for embeddings (default: 1024)
+            embedding_dimension: Output dimension for embeddings (default: 1024,
+                overridden by the EMBED_DIM environment variable)
+            index_type: "hnsw" (graph), "flat" (exact), "ivfpq" (trained, compressed)
+                or "mmap_flat" (exact cosine over a memory-mapped matrix)
+            precision: Flat/HNSW vector storage: "fp32", "fp16" or "int8" (scalar quantized)
+            hnsw_m: HNSW graph degree
+            ef_construction: HNSW candidate list size while building
+            ef_search: HNSW candidate list size per query (recall/latency trade-off)
+            nlist: IVF cell count (default: 4 * sqrt(expected_corpus_size))
+            pq_m: Number of PQ sub-quantizers (must divide embedding_dimension)
+            pq_nbits: Bits per PQ sub-quantizer code
+            nprobe: IVF cells scanned per query (recall/latency trade-off)
+            rescore_k_factor: For "ivfpq", fetch k * factor PQ candidates and re-rank
+                them by exact distance against on-disk float32 vectors (0 disables)
+            expected_corpus_size: Corpus size used to derive the default nlist
+            sq_training_size: Vectors collected to calibrate int8 ranges before quantizing
+            save_interval_s: Debounce window for persisting mutations to disk
+            query_embedding_cache_size: In-memory LRU size for query embeddings (0 disables)
         """
         self._index_name = index_name
+        self._index_dir = FAISS_INDEX_DIR
+        self._index_path = self._index_dir / f"{index_name}.faiss"
+        self._chunks_dir = self._index_dir / f"{index_name}.chunks"
+        self._mmap_dir = self._index_dir / f"{index_name}.mmap"
+        self._exact_dir = self._index_dir / f"{index_name}.exact"
+        self._tombstones_path = self._index_dir / f"{index_name}.tombstones.npy"
         self._region = region
+        self._index_type = index_type
+        self._precision = precision
+        self._sq_training_size = sq_training_size
+        self._hnsw_m = hnsw_m
+        self._ef_construction = ef_construction
+        self._ef_search = ef_search
+        self._nlist = nlist or default_nlist(expected_corpus_size)
+        self._pq_m = pq_m
+        self._pq_nbits = pq_nbits
+        self._nprobe = nprobe
+        self._rescore_k_factor = rescore_k_factor if index_type == "ivfpq" else 0
+        self._save_interval_s = save_interval_s
+        # EMBED_DIM overrides the configured dimension for both the index and
+        # the embedder, so no probe embedding is needed
+        embedding_dimension = int(os.getenv("EMBED_DIM", embedding_dimension))
+        self._dimension = embedding_dimension
 
-        logger.info(
-            f"{__name__}:__init__ - Creating FixedDimensionEmbeddings with "
-            f"model={embedding_model_id}, dimension={embedding_dimension}"
-        )
+        # FAISS_NUM_THREADS=1 favours many concurrent searches over per-query parallelism
+        num_threads = configure_omp_threads(int(os.getenv("FAISS_NUM_THREADS", "0")) or None)
+        logger.debug("%s:__init__ - FAISS OpenMP threads set to %d", __name__, num_threads)
 
-        # Use wrapper that enforces consistent dimensions on all embed calls
-        self._embeddings = FixedDimensionEmbeddings(
-            model=embedding_model_id,
-            output_dimensionality=embedding_dimension,
-        )
-        logger.info(f"{__name__}:__init__ - FixedDimensionEmbeddings initialized")
+        # Use wrapper that enforces consistent dimensions on all embed calls,
+        # shared across stores so the Gemini client is built once per process
+        self._embeddings = get_fixed_dimension_embeddings(embedding_model_id, embedding_dimension)
+
+        # Coalesces concurrent query embeddings into one API call
+        self._query_embedder = QueryEmbeddingBatcher(self._embeddings)
+        self._embedding_model_id = embedding_model_id
+        self._embed_query_cached = lru_cache(maxsize=query_embedding_cache_size)(self._embed_query_uncached)
+        # Concurrent LRU misses for the same query share one embedding call
+        self._query_inflight = SingleFlight()
+
+        # Struct-of-arrays filter columns indexed by faiss id. session_id/doc_id
+        # strings are interned to int32 codes; -1 marks absent/deleted rows.
+        self._session_codes: dict[str, int] = {}
+        self._doc_codes: dict[str, int] = {}
+        self._meta_session = np.full(0, -1, dtype=np.int32)
+        self._meta_doc = np.full(0, -1, dtype=np.int32)
+        # Faiss ids deleted from the docstore but still present in the index
+        self._tombstones: set[int] = set()
 
         # Create index directory if it doesn't exist
-        FAISS_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        self._index_dir.mkdir(parents=True, exist_ok=True)
+
+        # Debounced persistence: mutations set _dirty, a daemon thread saves
+        self._lock = threading.RLock()
+        self._dirty = threading.Event()
 
         # Load or initialize FAISS index
         self._vector_store = self._load_or_create_index()
 
+        self._closed = threading.Event()
+        self._persist_thread = threading.Thread(
+            target=_persist_loop,
+            args=(weakref.ref(self), self._closed, save_interval_s),
+            name=f"faiss-persist-{index_name}",
+            daemon=True,
+        )
+        self._persist_thread.start()
+        _OPEN_STORES.add(self)
+
     def _load_or_create_index(self) -> FAISS:
-        """Load existing FAISS index or create new one."""
-        try:
-            logger.info(f"{__name__}:_load_or_create_index - START: Attempting to load existing index from {FAISS_INDEX_DIR}")
-            self._vector_store = FAISS.load_local(
-                str(FAISS_INDEX_DIR),
-                self._embeddings,
-                index_name=self._index_name,
-            )
-            logger.info(f"{__name__}:_load_or_create_index - SUCCESS: Index loaded successfully")
-            return self._vector_store
-        except Exception as e:
-            logger.info(f"{__name__}:_load_or_create_index - Index load failed ({type(e).__name__}): {e}, creating new index")
+        """
+        Load existing FAISS index, migrate a legacy one, or create a new one.
 
-        # Create empty index with a dummy document
-        logger.info(f"{__name__}:_load_or_create_index - Creating new FAISS index")
-        try:
-            logger.info(f"{__name__}:_load_or_create_index - Step 1: Generating dummy embedding")
-            dummy_embedding = self._embeddings.embed_query("dummy")
-            logger.info(f"{__name__}:_load_or_create_index - Step 1 OK: dummy_embedding type={type(dummy_embedding)}, length={len(dummy_embedding) if isinstance(dummy_embedding, list) else 'N/A'}")
+        Raises:
+            RuntimeError: If an index exists on disk but cannot be loaded
+        """
+        index_path = self._mmap_dir if self._index_type == "mmap_flat" else self._index_path
+        legacy_path = self._index_dir / f"{self._index_name}.pkl"
+        if index_path.exists() and self._chunks_dir.is_dir():
+            try:
+                logger.info("%s:_load_or_create_index - START: Loading index from %s", __name__, self._index_dir)
+                if self._index_type == "mmap_flat":
+                    index = MmapFlatIndex.load(self._mmap_dir, self._dimension)
+                else:
+                    index = read_index_mmap(str(self._index_path))
+                chunks = ArrowChunkStore.load(self._chunks_dir)
+                vector_store = FAISS(
+                    embedding_function=self._embeddings,
+                    index=index,
+                    docstore=chunks,
+                    index_to_docstore_id=chunks.index_to_docstore_id(),
+                    normalize_L2=True,
+                )
+                self._dimension = index.d
+                self._exact_vectors = self._load_exact_vectors(index)
+                if self._tombstones_path.exists():
+                    self._tombstones = set(np.load(self._tombstones_path).tolist())
+                # Deleted ids are never reused, so continue past the largest ever stored
+                self._next_id = max(chunks.max_faiss_id, max(self._tombstones, default=-1)) + 1
+                rows = chunks.live_rows()
+                self._register_filter_columns(
+                    np.fromiter((row.faiss_id for row in rows), dtype=np.int64, count=len(rows)),
+                    [row.metadata for row in rows],
+                )
+                self._warm_up(index)
+                logger.info("%s:_load_or_create_index - SUCCESS: Loaded %d chunks", __name__, len(rows))
+                return vector_store
+            except Exception as e:
+                logger.error(
+                    "%s:_load_or_create_index - Index load failed: %s: %s",
+                    __name__, type(e).__name__, e,
+                    exc_info=True,
+                )
+                raise RuntimeError(
+                    f"Could not load FAISS index '{self._index_name}' from {self._index_dir}. "
+                    "Move the index files aside to start with an empty index."
+                ) from e
 
-            import faiss
-            logger.info(f"{__name__}:_load_or_create_index - Step 2: Creating FAISS index with dimension={len(dummy_embedding)}")
+        if any(self._chunks_dir.glob("segment-*.arrow")):
+            raise RuntimeError(
+                f"FAISS index '{self._index_name}' in {self._index_dir} has chunks but no "
+                f"{self._index_type} index at {index_path}; it was probably built with another "
+                "index_type. Use that index_type or move the index files aside."
+            )
+        if legacy_path.exists() and self._index_path.exists():
+            return self._migrate_legacy_index()
 
-            dimension = len(dummy_embedding)
-            index = faiss.IndexFlatL2(dimension)
-            logger.info(f"{__name__}:_load_or_create_index - Step 2 OK: FAISS IndexFlatL2 created")
+        return self._create_index()
+
+    def _create_index(self) -> FAISS:
+        """Create and save an empty index sized from the configured embedding dimension."""
+        logger.info(
+            "%s:_create_index - START: Creating new %s index (dimension=%d)",
+            __name__, self._index_type, self._dimension,
+        )
+        try:
+            # ivfpq starts flat until enough vectors exist to train (see _maybe_train_ivfpq);
+            # int8 starts at full precision until its ranges are calibrated (see _maybe_train_sq8)
+            precision = "fp32" if self._precision == "int8" else self._precision
+            if self._index_type == "mmap_flat":
+                index = MmapFlatIndex.create(self._dimension, self._mmap_dir)
+            elif self._index_type == "hnsw":
+                index = create_hnsw_index(self._dimension, self._hnsw_m, self._ef_construction, precision)
+            else:
+                index = create_flat_index(self._dimension, precision)
 
-            logger.info(f"{__name__}:_load_or_create_index - Step 3: Creating FAISS wrapper (embedding_function type={type(self._embeddings).__name__})")
             vector_store = FAISS(
                 embedding_function=self._embeddings,
                 index=index,
-                docstore={},
+                docstore=ArrowChunkStore(),
                 index_to_docstore_id={},
+                normalize_L2=True,
             )
-            logger.info(f"{__name__}:_load_or_create_index - Step 3 OK: FAISS wrapper created")
-
-            logger.info(f"{__name__}:_load_or_create_index - Step 4: Saving index to {FAISS_INDEX_DIR}")
-            vector_store.save_local(str(FAISS_INDEX_DIR), index_name=self._index_name)
-            logger.info(f"{__name__}:_load_or_create_index - Step 4 OK: Index saved")
+            self._exact_vectors = None
+            if self._rescore_k_factor:
+                self._exact_vectors = MmapFlatIndex.create(self._dimension, self._exact_dir, normalize=False)
+            self._next_id = 0
+            self._tombstones = set()
+            # Drop leftovers of an index that never saved any chunks
+            shutil.rmtree(self._chunks_dir, ignore_errors=True)
+            self._save(vector_store)
+            logger.info("%s:_create_index - SUCCESS: Index created in %s", __name__, self._index_dir)
 
             return vector_store
         except Exception as e:
-            logger.error(f"{__name__}:_load_or_create_index - FAILED during index creation: {type(e).__name__}: {e}", exc_info=True)
+            logger.error(
+                "%s:_create_index - FAILED during index creation: %s: %s",
+                __name__, type(e).__name__, e,
+                exc_info=True,
+            )
             raise
 
-    def _filter_results(
+    def _migrate_legacy_index(self) -> FAISS:
+        """
+        Convert an index saved by FAISS.save_local into Arrow chunk segments.
+
+        Stored vectors are re-added as they are, so nothing is re-embedded.
+        The legacy .pkl file is left in place and can be deleted afterwards.
+
+        Raises:
+            RuntimeError: If the legacy index cannot be read or has another dimension
+        """
+        logger.info("%s:_migrate_legacy_index - START: Migrating %s from save_local layout", __name__, self._index_name)
+        try:
+            legacy = FAISS.load_local(
+                str(self._index_dir),
+                self._embeddings,
+                index_name=self._index_name,
+                allow_dangerous_deserialization=True,
+            )
+            if legacy.index.d != self._dimension:
+                raise ValueError(f"index dimension {legacy.index.d} != configured {self._dimension}")
+            positions = list(legacy.index_to_docstore_id)
+            doc_ids = [legacy.index_to_docstore_id[position] for position in positions]
+            documents = [legacy.docstore.search(doc_id) for doc_id in doc_ids]
+            vectors = legacy.index.reconstruct_batch(np.asarray(positions, dtype=np.int64))
+        except Exception as e:
+            logger.error(
+                "%s:_migrate_legacy_index - Migration failed: %s: %s",
+                __name__, type(e).__name__, e,
+                exc_info=True,
+            )
+            raise RuntimeError(
+                f"Could not migrate legacy FAISS index '{self._index_name}' in {self._index_dir}. "
+                "Move the .faiss and .pkl files aside to start with an empty index."
+            ) from e
+
+        self._vector_store = self._create_index()
+        self._add_vectors(
+            np.ascontiguousarray(vectors, dtype=np.float32),
+            doc_ids,
+            [document.page_content for document in documents],
+            [document.metadata for document in documents],
+        )
+        self.flush()
+        logger.info("%s:_migrate_legacy_index - SUCCESS: Migrated %d chunks", __name__, len(doc_ids))
+        return self._vector_store
+
+    def _load_exact_vectors(self, index: Any) -> MmapFlatIndex | None:
+        """Open the float32 re-scoring vectors, or None if disabled or they do not cover the index."""
+        if not self._rescore_k_factor:
+            return None
+        if self._exact_dir.is_dir():
+            exact = MmapFlatIndex.load(self._exact_dir, self._dimension, normalize=False)
+            # Rows beyond the index (a crash between saves) are harmless; missing rows are not
+            if exact.ntotal >= index.ntotal:
+                return exact
+        logger.warning(
+            "%s:_load_exact_vectors - Re-scoring vectors missing for %s, re-scoring disabled",
+            __name__, self._index_name,
+        )
+        return None
+
+    def _warm_up(self, index: Any) -> None:
+        """
+        Pre-fault the loaded index so the first real query avoids the cold-page cliff.
+
+        Asks the kernel to read ahead the memory-mapped vector and chunk
+        files, then runs one throwaway search to touch the index structures.
+        """
+        if hasattr(os, "posix_fadvise"):
+            for path in [*self._mmap_dir.glob("*.f32"), *self._chunks_dir.glob("segment-*.arrow")]:
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                    try:
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass
+        try:
+            index.search(np.zeros((1, self._dimension), dtype=np.float32), 1)
+        except Exception as e:
+            logger.debug("%s:_warm_up - Warmup search failed: %s", __name__, e)
+
+    def _save(self, vector_store: FAISS) -> None:
+        """
+        Persist chunk segments, then atomically replace the index file.
+
+        Chunks are written first so a crash between the two writes leaves
+        rows without vectors (ignored) rather than vectors without rows.
+        """
+        vector_store.docstore.save(self._chunks_dir)
+        tmp_tombstones = self._tombstones_path.with_suffix(".tmp.npy")
+        np.save(tmp_tombstones, np.fromiter(self._tombstones, dtype=np.int64, count=len(self._tombstones)))
+        os.replace(tmp_tombstones, self._tombstones_path)
+        if self._exact_vectors is not None:
+            self._exact_vectors.save()
+        if isinstance(vector_store.index, MmapFlatIndex):
+            # Vectors are appended as they are added; only the id array is written
+            vector_store.index.save()
+            return
+        tmp_path = self._index_path.with_suffix(".faiss.tmp")
+        faiss.write_index(vector_store.index, str(tmp_path))
+        os.replace(tmp_path, self._index_path)
+
+    def flush(self) -> None:
+        """Persist pending index mutations to disk immediately."""
+        with self._lock:
+            if not self._dirty.is_set():
+                return
+            self._dirty.clear()
+            self._save(self._vector_store)
+            logger.debug("%s:flush - Index saved to %s", __name__, self._index_dir)
+
+    def close(self) -> None:
+        """Stop the background persist thread and save pending mutations. Safe to call twice."""
+        self._closed.set()
+        self._persist_thread.join()
+        _OPEN_STORES.discard(self)
+        self.flush()
+
+    def _embed_query_uncached(self, model_id: str, query: str) -> np.ndarray:
+        """Embed a query via the batcher as a read-only, L2-normalized (1, d) float32 matrix; model_id is part of the LRU key only."""
+        def embed() -> np.ndarray:
+            vector = np.asarray([self._query_embedder.embed_query(query)], dtype=np.float32)
+            faiss.normalize_L2(vector)
+            vector.flags.writeable = False
+            return vector
+
+        return self._query_inflight.do((model_id, query), embed)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Query embedding as a (1, d) float32 matrix, served from the LRU when repeated."""
+        return self._embed_query_cached(self._embedding_model_id, query)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query the way similarity_search does, sharing its cache.
+
+        Args:
+            query: Query text
+
+        Returns:
+            np.ndarray: Read-only float32 query vector
+        """
+        return self._embed_query(query)[0]
+
+    def preload_queries(self, queries: list[str]) -> None:
+        """
+        Warm the query-embedding caches with expected queries, e.g. at startup.
+
+        Uncached queries are embedded in one batched API call, which stores
+        them in the persistent embedding cache; each is then loaded into
+        the in-memory LRU from that cache without further API calls.
+
+        Args:
+            queries: Query texts to warm
+        """
+        queries = list(dict.fromkeys(query for query in queries if query.strip()))
+        if not queries:
+            return
+        self._embeddings.embed_documents(queries, task_type=QUERY_TASK_TYPE)
+        for query in queries:
+            self._embed_query(query)
+        logger.info("%s:preload_queries - Preloaded %d query embeddings", __name__, len(queries))
+
+    def _maybe_train_ivfpq(self) -> None:
+        """Migrate the flat index to IVF-PQ once enough vectors exist to train it."""
+        index = self._vector_store.index
+        if self._index_type != "ivfpq" or faiss.try_extract_index_ivf(index) is not None:
+            return
+        if index.ntotal < ivfpq_training_threshold(self._nlist, self._pq_nbits):
+            return
+
+        vectors, ids = export_vectors(index)
+        self._vector_store.index = build_ivfpq_index(
+            vectors, ids, self._nlist, self._pq_m, self._pq_nbits
+        )
+        logger.info(
+            "%s:_maybe_train_ivfpq - Trained IVF-PQ index (nlist=%d, m=%d, nbits=%d) on %d vectors",
+            __name__, self._nlist, self._pq_m, self._pq_nbits, len(ids),
+        )
+
+    def _maybe_train_sq8(self) -> None:
+        """Re-encode vectors as int8 codes once enough exist to calibrate the quantizer."""
+        index = self._vector_store.index
+        if self._precision != "int8" or self._index_type == "mmap_flat":
+            return
+        if faiss.try_extract_index_ivf(index) is not None:
+            return
+        if scalar_quantizer_type(index) == faiss.ScalarQuantizer.QT_8bit:
+            return
+        if index.ntotal < self._sq_training_size:
+            return
+
+        vectors, ids = export_vectors(index)
+        if self._index_type == "hnsw":
+            quantized = create_hnsw_index(self._dimension, self._hnsw_m, self._ef_construction, "int8")
+        else:
+            quantized = create_flat_index(self._dimension, "int8")
+        self._vector_store.index = train_and_add(quantized, vectors, ids, self._sq_training_size)
+        logger.info("%s:_maybe_train_sq8 - Quantized %d vectors to int8", __name__, len(ids))
+
+    def _register_filter_columns(
         self,
-        results: list[tuple],
-        session_id: str | None = None,
-        doc_id: str | None = None,
-    ) -> list[tuple]:
-        """Filter results by metadata (session_id, doc_id)."""
-        filtered = []
-        for doc, score in results:
-            metadata = doc.metadata or {}
-            if session_id and metadata.get("session_id") != session_id:
-                continue
-            if doc_id and metadata.get("doc_id") != doc_id:
+        faiss_ids: np.ndarray,
+        metadatas: list[dict[str, Any] | None],
+    ) -> None:
+        """Write session_id/doc_id codes for new vectors into the filter columns."""
+        if not len(faiss_ids):
+            return
+
+        required = int(faiss_ids.max()) + 1
+        if required > len(self._meta_session):
+            capacity = max(required, 2 * len(self._meta_session), 1024)
+            for name in ("_meta_session", "_meta_doc"):
+                grown = np.full(capacity, -1, dtype=np.int32)
+                column = getattr(self, name)
+                grown[: len(column)] = column
+                setattr(self, name, grown)
+
+        for column, codes, key in (
+            (self._meta_session, self._session_codes, "session_id"),
+            (self._meta_doc, self._doc_codes, "doc_id"),
+        ):
+            column[faiss_ids] = [
+                codes.setdefault(value, len(codes)) if (value := (metadata or {}).get(key)) else -1
+                for metadata in metadatas
+            ]
+
+    def _unregister_filter_columns(self, faiss_ids: np.ndarray) -> None:
+        """Clear filter codes for deleted vectors so they never match a filter."""
+        self._meta_session[faiss_ids] = -1
+        self._meta_doc[faiss_ids] = -1
+
+    def _filter_mask(self, session_id: str | None, doc_id: str | None) -> np.ndarray | None:
+        """
+        Boolean mask over faiss ids matching the filters (None if unfiltered).
+
+        Vectorized compare over the int32 SoA columns instead of walking
+        per-result metadata dicts. Deleted rows have no codes, so filtered
+        masks already exclude tombstones; unfiltered searches get a mask
+        only while tombstones exist.
+        """
+        mask = None
+        for column, codes, value in (
+            (self._meta_session, self._session_codes, session_id),
+            (self._meta_doc, self._doc_codes, doc_id),
+        ):
+            if not value:
                 continue
-            filtered.append((doc, score))
-        return filtered
+            code = codes.get(value)
+            if code is None:
+                return np.zeros(0, dtype=bool)
+            column_mask = column[: self._next_id] == code
+            mask = column_mask if mask is None else mask & column_mask
+
+        if mask is None and self._tombstones:
+            mask = np.ones(self._next_id, dtype=bool)
+            mask[np.fromiter(self._tombstones, dtype=np.int64, count=len(self._tombstones))] = False
+        return mask
+
+    def _search_params(
+        self,
+        session_id: str | None,
+        doc_id: str | None,
+    ) -> tuple[faiss.SearchParameters | None, bool]:
+        """
+        Build FAISS search parameters restricting the scan to matching ids.
+
+        Returns:
+            tuple: (params or None, has_candidates). has_candidates is False
+            when the filters match no vectors, so the search can be skipped.
+        """
+        mask = self._filter_mask(session_id, doc_id)
+        if mask is not None and not mask.any():
+            return None, False
+        if isinstance(self._vector_store.index, MmapFlatIndex):
+            # The mmap index applies the boolean mask directly
+            return mask, True
+
+        selector = None
+        if mask is not None:
+            selector = faiss.IDSelectorBitmap(np.packbits(mask, bitorder="little"))
+
+        params = make_search_params(self._vector_store.index, selector, self._nprobe, self._ef_search)
+        return params, True
 
     def similarity_search(
         self,
@@ -159,61 +657,172 @@ class FAISSVectorsStore:
         Returns:
             list[VectorSearchResult]: Search results with scores and metadata
         """
-        logger.info(f"{__name__}:similarity_search - START: query_len={len(query)}, k={k}, session_id={session_id}, doc_id={doc_id}")
+        logger.debug(
+            "%s:similarity_search - START: query_len=%d, k=%d, session_id=%s, doc_id=%s",
+            __name__, len(query), k, session_id, doc_id,
+        )
+        debug = logger.isEnabledFor(logging.DEBUG)
         try:
-            # Fetch more results to account for filtering
-            fetch_k = k * 3 if (session_id or doc_id) else k
-            logger.info(f"{__name__}:similarity_search - Step 1: Fetching {fetch_k} results (fetch_k for filtering)")
-
-            logger.info(f"{__name__}:similarity_search - Step 1a: vector_store type={type(self._vector_store).__name__}")
-            results = self._vector_store.similarity_search_with_score(
-                query=query,
-                k=fetch_k,
-            )
-            logger.info(f"{__name__}:similarity_search - Step 1 OK: Retrieved {len(results)} raw results")
-
-            # Apply filtering
-            logger.info(f"{__name__}:similarity_search - Step 2: Applying filters (session_id={session_id}, doc_id={doc_id})")
-            filtered_results = self._filter_results(results, session_id, doc_id)
-            filtered_results = filtered_results[:k]
-            logger.info(f"{__name__}:similarity_search - Step 2 OK: Filtered to {len(filtered_results)} results (capped at k={k})")
-
-            # Build response
-            logger.info(f"{__name__}:similarity_search - Step 3: Building VectorSearchResult objects")
-            search_results = []
-            for idx, (doc, score) in enumerate(filtered_results):
-                try:
-                    metadata = doc.metadata or {}
-                    logger.debug(f"{__name__}:similarity_search - Processing result {idx}: chunk_id={metadata.get('chunk_id')}, score={score}")
-                    search_results.append(
-                        VectorSearchResult(
-                            chunk_id=metadata.get("chunk_id", ""),
-                            content=doc.page_content,
-                            metadata=VectorMetadata(
-                                session_id=metadata.get("session_id", ""),
-                                doc_id=metadata.get("doc_id", ""),
-                                chunk_id=metadata.get("chunk_id", ""),
-                                page=metadata.get("page"),
-                                section=metadata.get("section"),
-                                source_uri=metadata.get("source_uri", ""),
-                            ),
-                            similarity_score=float(score),
-                        )
+            # Filters are applied inside the FAISS scan via an IDSelector
+            params, has_candidates = self._search_params(session_id, doc_id)
+            if not has_candidates:
+                logger.debug("%s:similarity_search - No vectors match filters, skipping search", __name__)
+                return []
+
+            query_vector = self._embed_query(query)
+            scores, labels = self._search(query_vector, k, params)
+
+            search_results = self._hits_to_results(scores[0], labels[0])
+            if debug:
+                for idx, result in enumerate(search_results):
+                    logger.debug(
+                        "%s:similarity_search - Result %d: chunk_id=%s score=%.4f",
+                        __name__, idx, result.chunk_id, result.similarity_score,
                     )
-                except Exception as e:
-                    logger.error(f"{__name__}:similarity_search - Failed to process result {idx}: {type(e).__name__}: {e}", exc_info=True)
-                    raise
 
-            logger.info(
-                f"{__name__}:similarity_search - SUCCESS: Built {len(search_results)} results",
+            logger.debug(
+                "%s:similarity_search - SUCCESS: Built %d results",
+                __name__, len(search_results),
                 extra={"session_id": session_id, "k": k},
             )
             return search_results
 
         except Exception as e:
-            logger.error(f"{__name__}:similarity_search - FAILED: {type(e).__name__}: {e}", exc_info=True)
+            logger.error("%s:similarity_search - FAILED: %s: %s", __name__, type(e).__name__, e, exc_info=True)
+            raise
+
+    def similarity_search_batch(
+        self,
+        queries: list[str],
+        k: int = 5,
+        session_id: str | None = None,
+    ) -> list[list[VectorSearchResult]]:
+        """
+        Search for several queries at once.
+
+        All queries are embedded in one API call and searched with a single
+        FAISS call over the (nq, d) query matrix, so N queries cost one
+        embedding round-trip and one index scan.
+
+        Args:
+            queries: Search query texts
+            k: Number of results per query
+            session_id: Filter by session ID
+
+        Returns:
+            list[list[VectorSearchResult]]: Results aligned with queries
+        """
+        if not queries:
+            return []
+        try:
+            params, has_candidates = self._search_params(session_id, None)
+            if not has_candidates:
+                return [[] for _ in queries]
+
+            query_vectors = np.asarray(
+                self._embeddings.embed_documents(queries, task_type=QUERY_TASK_TYPE), dtype=np.float32
+            )
+            faiss.normalize_L2(query_vectors)
+            scores, labels = self._search(query_vectors, k, params)
+            results = [
+                self._hits_to_results(row_scores, row_labels) for row_scores, row_labels in zip(scores, labels)
+            ]
+
+            logger.debug(
+                "%s:similarity_search_batch - Searched %d queries", __name__, len(queries),
+                extra={"session_id": session_id, "k": k},
+            )
+            return results
+
+        except Exception as e:
+            logger.error("%s:similarity_search_batch - %s: %s", __name__, type(e).__name__, e)
             raise
 
+    def _search(
+        self,
+        query_vectors: np.ndarray,
+        k: int,
+        params: Any,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Search the index, re-ranking IVF-PQ candidates by exact distance when enabled.
+
+        PQ distances are approximate, so k * rescore_k_factor candidates are
+        fetched and re-scored against the float32 vectors; only the candidate
+        rows of the memory-mapped file are read. Squared L2 distances between
+        unit vectors are converted to cosine similarity (1 - d/2), the
+        score mmap_flat reports natively.
+
+        Returns:
+            tuple: (cosine similarities, labels), each (nq, k); missing slots are -1
+        """
+        index = self._vector_store.index
+        exact = self._exact_vectors
+        if exact is None or faiss.try_extract_index_ivf(index) is None:
+            scores, labels = index.search(query_vectors, k, params=params)
+            if isinstance(index, MmapFlatIndex):
+                return scores, labels
+            return 1 - scores / 2, labels
+
+        _, candidates = index.search(query_vectors, k * self._rescore_k_factor, params=params)
+        scores = np.full((len(query_vectors), k), -np.inf, dtype=np.float32)
+        labels = np.full((len(query_vectors), k), -1, dtype=np.int64)
+        for q, (query, row) in enumerate(zip(query_vectors, candidates)):
+            ids = row[row != -1]
+            if not len(ids):
+                continue
+            exact_distances = ((exact.reconstruct_batch(ids) - query) ** 2).sum(axis=1)
+            top = np.argsort(exact_distances)[:k]
+            scores[q, : len(top)] = 1 - exact_distances[top] / 2
+            labels[q, : len(top)] = ids[top]
+        return scores, labels
+
+    def _hits_to_results(self, scores: np.ndarray, labels: np.ndarray) -> list[VectorSearchResult]:
+        """Map one query's FAISS hits to results, skipping empty slots and deleted rows."""
+        # Rows are gathered straight from the Arrow segments, no Document per hit
+        hits = labels != -1
+        rows = self._vector_store.docstore.take(labels[hits].tolist())
+        # One pass from rows to results; tolist() casts the scores to Python floats at once
+        return [
+            _to_search_result(row, score)
+            for row, score in zip(rows, scores[hits].tolist())
+            if row is not None
+        ]
+
+    def list_by_metadata(
+        self,
+        session_id: str | None = None,
+        doc_id: str | None = None,
+        limit: int = 100,
+    ) -> list[VectorSearchResult]:
+        """
+        List chunks by metadata without embedding a query.
+
+        Matching ids come straight from the filter columns, so no vectors
+        are scanned; rows are returned in insertion order.
+
+        Args:
+            session_id: Filter by session ID
+            doc_id: Filter by document ID
+            limit: Maximum number of chunks to return
+
+        Returns:
+            list[VectorSearchResult]: Matching chunks with similarity_score 0.0
+        """
+        mask = self._filter_mask(session_id, doc_id)
+        if mask is None:
+            faiss_ids = list(islice(self._vector_store.index_to_docstore_id, limit))
+        else:
+            faiss_ids = np.flatnonzero(mask)[:limit].tolist()
+        rows = self._vector_store.docstore.take(faiss_ids)
+
+        results = [_to_search_result(row, 0.0) for row in rows if row is not None]
+        logger.debug(
+            "%s:list_by_metadata - Listed %d chunks", __name__, len(results),
+            extra={"session_id": session_id, "doc_id": doc_id},
+        )
+        return results
+
     def max_marginal_relevance_search(
         self,
         query: str,
@@ -225,6 +834,10 @@ class FAISSVectorsStore:
         """
         MMR search balancing relevance and diversity.
 
+        Candidates are fetched by FAISS with the session filter applied in
+        the scan, their vectors reconstructed from the index, and the MMR
+        re-rank computed in NumPy.
+
         Args:
             query: Search query text
             k: Number of results to return
@@ -236,43 +849,25 @@ class FAISSVectorsStore:
             list[VectorSearchResult]: Diverse search results
         """
         try:
-            results = self._vector_store.max_marginal_relevance_search(
-                query=query,
-                k=k,
-                fetch_k=fetch_k,
-                lambda_mult=lambda_mult,
-            )
+            params, has_candidates = self._search_params(session_id, None)
+            if not has_candidates:
+                return []
 
-            # Apply session filtering
-            if session_id:
-                results = [
-                    doc for doc in results
-                    if (doc.metadata or {}).get("session_id") == session_id
-                ][:k]
-
-            search_results = []
-            for doc in results:
-                metadata = doc.metadata or {}
-                search_results.append(
-                    VectorSearchResult(
-                        chunk_id=metadata.get("chunk_id", ""),
-                        content=doc.page_content,
-                        metadata=VectorMetadata(
-                            session_id=metadata.get("session_id", ""),
-                            doc_id=metadata.get("doc_id", ""),
-                            chunk_id=metadata.get("chunk_id", ""),
-                            page=metadata.get("page"),
-                            section=metadata.get("section"),
-                            source_uri=metadata.get("source_uri", ""),
-                        ),
-                        similarity_score=1.0,
-                    )
-                )
+            query_vector = self._embed_query(query)
+            index = self._vector_store.index
+            _, labels = index.search(query_vector, max(fetch_k, k), params=params)
+            candidate_ids = labels[0][labels[0] != -1]
+            if not len(candidate_ids):
+                return []
 
-            return search_results
+            candidates = index.reconstruct_batch(candidate_ids)
+            selected = mmr_select(query_vector[0], candidates, k, lambda_mult)
+            rows = self._vector_store.docstore.take(candidate_ids[selected].tolist())
+
+            return [_to_search_result(row, 1.0) for row in rows if row is not None]
 
         except Exception as e:
-            logger.error(f"{__name__}:max_marginal_relevance_search - {type(e).__name__}: {e}")
+            logger.error("%s:max_marginal_relevance_search - %s: %s", __name__, type(e).__name__, e)
             raise
 
     def as_retriever(
@@ -294,6 +889,11 @@ class FAISSVectorsStore:
         Returns:
             VectorStoreRetriever: LangChain retriever
         """
+        # LangChain's wrapper searches without per-query params, so it can
+        # neither skip tombstones nor use nprobe/efSearch overrides
+        self.compact()
+        if not isinstance(self._vector_store.index, MmapFlatIndex):
+            apply_search_defaults(self._vector_store.index, self._nprobe, self._ef_search)
         search_kwargs = {"k": k, **kwargs}
         if session_id:
             search_kwargs["filter"] = {"session_id": session_id}
@@ -303,10 +903,27 @@ class FAISSVectorsStore:
             search_kwargs=search_kwargs,
         )
 
+    def compact(self) -> None:
+        """Physically remove tombstoned vectors from the index."""
+        with self._lock:
+            if not self._tombstones:
+                return
+            ids = np.fromiter(self._tombstones, dtype=np.int64, count=len(self._tombstones))
+            self._vector_store.index = remove_vectors(self._vector_store.index, ids)
+            if self._exact_vectors is not None:
+                self._exact_vectors.remove_ids(ids)
+            self._tombstones.clear()
+            self._dirty.set()
+            logger.info("%s:compact - Removed %d tombstoned vectors", __name__, len(ids))
+
     def delete_by_doc_id(self, doc_id: str, chunk_ids: list[str]) -> None:
         """
         Delete all vectors for a document.
 
+        Chunks leave the docstore and filter columns immediately; their
+        vectors are tombstoned and masked out of searches, and the index
+        is compacted once tombstones exceed TOMBSTONE_COMPACTION_RATIO.
+
         Args:
             doc_id: Document ID
             chunk_ids: List of chunk IDs to delete
@@ -315,8 +932,24 @@ class FAISSVectorsStore:
             return
 
         try:
-            self._vector_store.delete(ids=chunk_ids)
-            self._vector_store.save_local(str(FAISS_INDEX_DIR), index_name=self._index_name)
+            with self._lock:
+                store = self._vector_store
+                faiss_id_by_chunk = {
+                    docstore_id: faiss_id
+                    for faiss_id, docstore_id in store.index_to_docstore_id.items()
+                }
+                faiss_ids = [faiss_id_by_chunk[c] for c in chunk_ids if c in faiss_id_by_chunk]
+                if not faiss_ids:
+                    return
+
+                self._unregister_filter_columns(np.asarray(faiss_ids, dtype=np.int64))
+                store.docstore.delete([store.index_to_docstore_id[i] for i in faiss_ids])
+                for faiss_id in faiss_ids:
+                    del store.index_to_docstore_id[faiss_id]
+                self._tombstones.update(faiss_ids)
+                if len(self._tombstones) > TOMBSTONE_COMPACTION_RATIO * store.index.ntotal:
+                    self.compact()
+                self._dirty.set()
             logger.info(
                 "Deleted document chunks",
                 extra={"doc_id": doc_id, "chunk_count": len(chunk_ids)},
@@ -345,15 +978,67 @@ class FAISSVectorsStore:
         Returns:
             list[str]: Added document IDs
         """
+        if not texts:
+            return []
+
         try:
-            doc_ids = self._vector_store.add_texts(
-                texts=texts,
-                metadatas=metadatas,
-                ids=ids,
-            )
-            self._vector_store.save_local(str(FAISS_INDEX_DIR), index_name=self._index_name)
-            logger.info(f"{__name__}:add_documents - Added {len(doc_ids)} documents")
+            # Vectors are added with explicit ids, so LangChain's positional
+            # add_texts cannot be used against the IDMap/IVF index.
+            doc_ids = ids or [str(uuid.uuid4()) for _ in texts]
+            metadatas = metadatas or [{} for _ in texts]
+            vectors = np.asarray(self._embeddings.embed_documents(texts), dtype=np.float32)
+
+            self._add_vectors(vectors, doc_ids, texts, metadatas)
+            logger.info("%s:add_documents - Added %d documents", __name__, len(doc_ids))
             return doc_ids
         except Exception as e:
-            logger.error(f"{__name__}:add_documents - {type(e).__name__}: {e}")
+            logger.error("%s:add_documents - %s: %s", __name__, type(e).__name__, e)
             raise
+
+    def _add_vectors(
+        self,
+        vectors: np.ndarray,
+        doc_ids: list[str],
+        texts: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        """Add embedded chunks under fresh faiss ids and mark the index dirty; vectors are L2-normalized in place."""
+        faiss.normalize_L2(vectors)
+        with self._lock:
+            faiss_ids = np.arange(self._next_id, self._next_id + len(texts), dtype=np.int64)
+            self._next_id += len(texts)
+
+            store = self._vector_store
+            store.index.add_with_ids(vectors, faiss_ids)
+            if self._exact_vectors is not None:
+                self._exact_vectors.add_with_ids(vectors, faiss_ids)
+            store.docstore.add_chunks(faiss_ids.tolist(), doc_ids, texts, metadatas)
+            store.index_to_docstore_id.update(zip(faiss_ids.tolist(), doc_ids))
+            self._register_filter_columns(faiss_ids, metadatas)
+
+            self._maybe_train_ivfpq()
+            self._maybe_train_sq8()
+            self._dirty.set()
+
+
+def _to_search_result(row: ChunkRow, score: float) -> VectorSearchResult:
+    """
+    Convert a chunk store row into a VectorSearchResult.
+
+    Uses model_construct to skip Pydantic validation: rows come from the
+    typed Arrow schema, so field types are already guaranteed.
+    """
+    chunk_id = row.chunk_id or ""
+    return VectorSearchResult.model_construct(
+        chunk_id=chunk_id,
+        content=row.text,
+        metadata=VectorMetadata.model_construct(
+            session_id=row.session_id or "",
+            doc_id=row.doc_id or "",
+            chunk_id=chunk_id,
+            page=row.page,
+            section=row.section,
+            source_uri=row.source_uri or "",
+        ),
+        similarity_score=score,
+    )
@@ -0,0 +1,196 @@
+"""
+Memory-mapped exact cosine index for the local FAISS vector store.
+
+Vectors are L2-normalized on add and appended to a raw float32 file that is
+memory-mapped for search, so a query is one BLAS matrix-vector product over
+the mapped rows followed by an argpartition. No training, no graph build;
+for corpora up to a few hundred thousand chunks this beats IVF setup cost.
+Implements the subset of the faiss.Index API used by FAISSVectorsStore and
+LangChain's FAISS wrapper (search, add_with_ids, remove_ids, reconstruct).
+
+Dependencies: numpy
+System role: "mmap_flat" index type for FAISSVectorsStore
+"""
+
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.f32"
+IDS_FILE = "ids.npy"
+
+# Rewrite the vector file once this fraction of rows has been deleted
+COMPACTION_RATIO = 0.25
+
+
+class MmapFlatIndex:
+    """
+    Append-only memory-mapped matrix of normalized vectors with int64 ids.
+
+    Row i of the vector file belongs to ids[i]; deleted rows keep their
+    vector bytes but their id is set to -1 until the next compaction.
+    search() returns cosine similarities (higher is better). With
+    normalize=False vectors are stored as given, for use as an exact
+    re-scoring store read through reconstruct_batch().
+    """
+
+    def __init__(self, dimension: int, directory: Path, normalize: bool = True) -> None:
+        """
+        Initialize an index over a directory (use create() or load()).
+
+        Args:
+            dimension: Vector dimension
+            directory: Directory holding the vector and id files
+            normalize: L2-normalize vectors on add
+        """
+        self.d = dimension
+        self._directory = directory
+        self._normalize = normalize
+        self._row_by_id: dict[int, int] = {}
+        # (ids, mapped vectors) swapped as one tuple so lock-free searches
+        # always see ids and rows of the same length
+        self._snapshot: tuple[np.ndarray, np.ndarray | None] = (np.zeros(0, dtype=np.int64), None)
+
+    @classmethod
+    def create(cls, dimension: int, directory: Path, normalize: bool = True) -> "MmapFlatIndex":
+        """Create an empty index, discarding any files already in the directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / VECTORS_FILE).write_bytes(b"")
+        (directory / IDS_FILE).unlink(missing_ok=True)
+        return cls(dimension, directory, normalize)
+
+    @classmethod
+    def load(cls, directory: Path, dimension: int, normalize: bool = True) -> "MmapFlatIndex":
+        """
+        Open an index written by save().
+
+        Rows appended after the last save (no saved id) are truncated.
+        """
+        index = cls(dimension, directory, normalize)
+        ids_path = directory / IDS_FILE
+        ids = np.load(ids_path) if ids_path.exists() else np.zeros(0, dtype=np.int64)
+        with open(directory / VECTORS_FILE, "r+b") as f:
+            f.truncate(len(ids) * dimension * np.dtype(np.float32).itemsize)
+        index._row_by_id = {faiss_id: row for row, faiss_id in enumerate(ids.tolist()) if faiss_id >= 0}
+        index._publish(ids)
+        return index
+
+    @property
+    def ntotal(self) -> int:
+        """Number of live vectors."""
+        return len(self._row_by_id)
+
+    def _publish(self, ids: np.ndarray, remap: bool = True) -> None:
+        """Swap in a new id array, remapping the vector file if its length changed."""
+        vectors = self._snapshot[1]
+        if remap:
+            vectors = None
+            if len(ids):
+                vectors = np.memmap(
+                    self._directory / VECTORS_FILE, dtype=np.float32, mode="r", shape=(len(ids), self.d)
+                )
+        self._snapshot = (ids, vectors)
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """Normalize (unless disabled) and append vectors to the mapped file."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._normalize:
+            vectors = _normalize(vectors)
+        with open(self._directory / VECTORS_FILE, "ab") as f:
+            f.write(vectors.tobytes())
+        current_ids = self._snapshot[0]
+        self._row_by_id.update((int(i), len(current_ids) + row) for row, i in enumerate(ids))
+        self._publish(np.concatenate([current_ids, np.asarray(ids, dtype=np.int64)]))
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        """Tombstone rows for ids; returns the number removed."""
+        rows = [row for i in ids.tolist() if (row := self._row_by_id.pop(i, None)) is not None]
+        if rows:
+            live_ids = self._snapshot[0].copy()
+            live_ids[rows] = -1
+            self._publish(live_ids, remap=False)
+        return len(rows)
+
+    def reconstruct(self, key: int) -> np.ndarray:
+        """Return the stored vector for one id (LangChain's MMR reads vectors this way)."""
+        return np.array(self._snapshot[1][self._row_by_id[int(key)]])
+
+    def reconstruct_batch(self, ids: np.ndarray) -> np.ndarray:
+        """Return the stored vectors for ids."""
+        rows = [self._row_by_id[int(i)] for i in ids]
+        return np.array(self._snapshot[1][rows])
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        params: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k by cosine similarity.
+
+        Args:
+            queries: Query matrix of shape (nq, d)
+            k: Number of neighbours per query
+            params: Optional boolean mask over faiss ids restricting results
+
+        Returns:
+            tuple: (similarities, ids), each (nq, k); missing slots are -1
+        """
+        ids, vectors = self._snapshot
+        queries = _normalize(np.asarray(queries, dtype=np.float32))
+        similarities = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        labels = np.full((len(queries), k), -1, dtype=np.int64)
+
+        allowed = ids >= 0
+        if params is not None:
+            in_mask = ids < len(params)
+            allowed &= in_mask & params[np.where(in_mask, ids, 0)]
+        if not allowed.any():
+            return similarities, labels
+
+        scores = queries @ vectors.T
+        scores[:, ~allowed] = -np.inf
+        top_k = min(k, int(allowed.sum()))
+        for q, row_scores in enumerate(scores):
+            top = np.argpartition(-row_scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-row_scores[top])]
+            similarities[q, :top_k] = row_scores[top]
+            labels[q, :top_k] = ids[top]
+        return similarities, labels
+
+    def save(self) -> None:
+        """Persist the id array, compacting the vector file if many rows are deleted."""
+        ids, vectors = self._snapshot
+        deleted = int((ids < 0).sum())
+        if len(ids) and deleted / len(ids) > COMPACTION_RATIO:
+            self._compact(ids, vectors)
+            return
+        _atomic_save_npy(self._directory / IDS_FILE, ids)
+
+    def _compact(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """Rewrite the vector file with live rows only."""
+        live = ids >= 0
+        tmp_path = self._directory / f"{VECTORS_FILE}.tmp"
+        np.ascontiguousarray(vectors[live]).tofile(tmp_path)
+        os.replace(tmp_path, self._directory / VECTORS_FILE)
+
+        live_ids = ids[live]
+        self._row_by_id = {faiss_id: row for row, faiss_id in enumerate(live_ids.tolist())}
+        self._publish(live_ids)
+        _atomic_save_npy(self._directory / IDS_FILE, live_ids)
+        logger.info("%s:_compact - Compacted vector file to %d rows", __name__, len(live_ids))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _atomic_save_npy(path: Path, array: np.ndarray) -> None:
+    tmp_path = path.with_suffix(".tmp.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
@@ -0,0 +1,50 @@
+"""
+Vectorized maximal marginal relevance (MMR) selection.
+
+Shared by the vector stores' max_marginal_relevance_search: candidates
+are fetched with their vectors and re-ranked locally with BLAS matrix
+products rather than per-pick Python similarity calls.
+
+Dependencies: numpy
+System role: Local MMR re-ranking for vector store search
+"""
+
+import numpy as np
+
+
+def mmr_select(
+    query_vector: np.ndarray,
+    candidates: np.ndarray,
+    k: int,
+    lambda_mult: float,
+) -> list[int]:
+    """
+    Greedy maximal marginal relevance over candidate vectors.
+
+    Each pick costs one matvec: the redundancy term (max similarity to
+    anything already selected) is kept as a running np.maximum instead of
+    re-reducing a full candidate Gram matrix.
+
+    Args:
+        query_vector: Query embedding, shape (d,)
+        candidates: Candidate embeddings, shape (n, d)
+        k: Number of candidates to select
+        lambda_mult: Balance factor (0=diversity, 1=relevance)
+
+    Returns:
+        list[int]: Selected row positions in candidates, in pick order
+    """
+    candidates = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    query_vector = query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+    relevance = lambda_mult * (candidates @ query_vector)
+
+    pick = int(np.argmax(relevance))
+    selected = [pick]
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    while len(selected) < min(k, len(candidates)):
+        np.maximum(redundancy, candidates @ candidates[pick], out=redundancy)
+        scores = relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+    return selected
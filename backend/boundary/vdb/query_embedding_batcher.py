@@ -0,0 +1,108 @@
+"""
+Micro-batching coalescer for query embeddings.
+
+Concurrent similarity searches (run in the FastAPI threadpool) each need a
+query embedding. Instead of one embedding API round-trip per query, the
+first caller waits a short window, then embeds every query that arrived in
+the meantime with a single embed_documents call.
+
+Dependencies: langchain_core.embeddings
+System role: Query embedding batching for vector store retrieval
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+WINDOW_MS = 10
+MAX_BATCH = 32
+
+# Batched query texts must still be embedded as queries, not documents
+QUERY_TASK_TYPE = "RETRIEVAL_QUERY"
+
+
+class QueryEmbeddingBatcher:
+    """
+    Coalesce concurrent embed_query calls into batched embed_documents calls.
+
+    The first thread to enqueue a query becomes the leader: it waits up to
+    window_ms (or until max_batch queries are queued), then embeds and
+    resolves pending queries in batches until the queue is empty. Other
+    threads block on their future.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        window_ms: int = WINDOW_MS,
+        max_batch: int = MAX_BATCH,
+    ) -> None:
+        """
+        Initialize the batcher.
+
+        Args:
+            embeddings: Embeddings used to embed coalesced queries
+            window_ms: How long the leader waits for more queries to arrive
+            max_batch: Maximum queries per embedding request
+        """
+        self._embeddings = embeddings
+        self._window_s = window_ms / 1000
+        self._max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, Future]] = []
+        self._leader_active = False
+        self._batch_full = threading.Event()
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Embed a query, sharing the API call with concurrent callers.
+
+        Args:
+            text: Query text to embed
+
+        Returns:
+            list[float]: Query embedding vector
+        """
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            if len(self._pending) >= self._max_batch:
+                self._batch_full.set()
+            is_leader = not self._leader_active
+            self._leader_active = True
+
+        if is_leader:
+            self._drain()
+        return future.result()
+
+    def _drain(self) -> None:
+        """Wait for the batching window, then flush pending queries until empty."""
+        self._batch_full.wait(self._window_s)
+        while True:
+            with self._lock:
+                batch = self._pending[: self._max_batch]
+                del self._pending[: self._max_batch]
+                if len(self._pending) < self._max_batch:
+                    self._batch_full.clear()
+                if not batch:
+                    self._leader_active = False
+                    return
+            self._embed_batch(batch)
+
+    def _embed_batch(self, batch: list[tuple[str, Future]]) -> None:
+        """Embed one batch and resolve (or fail) each caller's future."""
+        texts = [text for text, _ in batch]
+        try:
+            vectors = self._embeddings.embed_documents(texts, task_type=QUERY_TASK_TYPE)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        logger.debug("%s:_embed_batch - Embedded %d coalesced queries", __name__, len(texts))
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(vector)
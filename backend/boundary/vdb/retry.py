@@ -0,0 +1,28 @@
+"""
+Retry policy for S3 Vectors calls.
+
+Re-exports the policy from the ingestion package, which must stay
+importable on its own inside the document processing Lambda image, so
+retrieval and upload retry the same errors.
+
+Dependencies: backend.core.document_processing.retry
+System role: Transient-error retry decorators for S3 Vectors requests
+"""
+
+from backend.core.document_processing.retry import (
+    RETRYABLE_HTTP_STATUSES,
+    THROTTLING_ERROR_CODES,
+    TRANSIENT_NETWORK_ERRORS,
+    is_retryable,
+    retry_delete_throttling,
+    retry_throttling,
+)
+
+__all__ = [
+    "RETRYABLE_HTTP_STATUSES",
+    "THROTTLING_ERROR_CODES",
+    "TRANSIENT_NETWORK_ERRORS",
+    "is_retryable",
+    "retry_delete_throttling",
+    "retry_throttling",
+]
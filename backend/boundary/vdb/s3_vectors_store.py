@@ -5,36 +5,165 @@ Provides retrieval interface using Amazon S3 Vectors with metadata filtering.
 Supports session-isolated search and hybrid retrieval preparation.
 Uses Google Generative AI embeddings (1024-dimensional) for vector generation.
 
-Metadata Keys (matching S3 Vectors index definition):
-- Filterable: session_id, document_id, page_number, chunk_index
-- Non-filterable: text_content
-
-Dependencies: langchain_aws, backend.boundary.vdb.embeddings_wrapper, tenacity
+Metadata Keys (as written by VectorStoreTask at ingestion):
+- Filterable: session_id, doc_id, chunk_id, chunk_index, page
+- Chunk text: _page_content (AmazonS3Vectors page content key)
+
+Query embeddings are cached in a per-instance LRU and searches go straight
+to query_vectors with the cached vector, so repeated queries skip the
+embedding API round-trip; identical searches within a minute are served
+from a small TTL result cache. Queries slower than a latency budget are
+hedged with a second identical request; only throttling, 5xx and network
+errors are retried. The AmazonS3Vectors wrapper and its boto3 client are
+shared per process.
+
+Dependencies: langchain_aws, backend.boundary.vdb.embeddings_wrapper, backend.boundary.vdb.single_flight, backend.boundary.vdb.mmr, backend.boundary.vdb.retry
 System role: Production vector store (S3 Vectors)
 """
 
 import logging
-from typing import Any
-
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from itertools import repeat
+from operator import itemgetter
+from typing import Any, Iterable
+
+import numpy as np
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 from langchain_aws.vectorstores import AmazonS3Vectors
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential_jitter,
-)
 
-from backend.boundary.vdb.embeddings_wrapper import FixedDimensionEmbeddings
-from backend.boundary.vdb.vector_schemas import (
-    VectorMetadata,
-    VectorSearchResult,
-)
+from backend.boundary.vdb.embeddings_wrapper import get_fixed_dimension_embeddings
+from backend.boundary.vdb.mmr import mmr_select
+from backend.boundary.vdb.query_embedding_batcher import QUERY_TASK_TYPE, QueryEmbeddingBatcher
+from backend.boundary.vdb.retry import retry_delete_throttling, retry_throttling
+from backend.boundary.vdb.single_flight import SingleFlight
+from backend.boundary.vdb.vector_schemas import VectorMetadata, VectorSearchResult
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Repeated queries (chat follow-ups, eval harnesses) reuse their embedding
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Identical searches (chat re-renders, eval loops) are served from memory
+# for this long; deletes clear the cache, other writers are bounded by the TTL
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL_S = 60.0
+
+# Upper bound on concurrent query_vectors calls per batch search
+MAX_SEARCH_WORKERS = 32
+
+# A query still running after this long gets a second, hedged request
+HEDGE_AFTER_MS = 250
+
+# Shared by all stores; hedged requests must not block on a per-call pool shutdown
+_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=2 * MAX_SEARCH_WORKERS, thread_name_prefix="s3vectors-query")
+
+# Shared batch-search pool so each call does not spin up its own threads;
+# batch workers wait on _QUERY_EXECUTOR futures, so it must be separate
+_BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_SEARCH_WORKERS, thread_name_prefix="s3vectors-batch")
+
+# Pool sized for batch search plus hedges (AWS_MAX_POOL overrides), kept
+# alive between requests; short timeouts let hedging and _query_vectors
+# retries handle slow calls
+S3_VECTORS_CLIENT_CONFIG = Config(
+    max_pool_connections=int(os.getenv("AWS_MAX_POOL", 2 * MAX_SEARCH_WORKERS)),
+    tcp_keepalive=True,
+    connect_timeout=1.0,
+    read_timeout=5.0,
+    retries={"max_attempts": 0},
+)
+
+# Chunk ids per DeleteVectors request, and concurrent delete requests
+DELETE_BATCH_SIZE = 100
+DELETE_WORKERS = 8
+
+# Shared by all stores, so DELETE_WORKERS also caps deletes in flight per process
+_DELETE_EXECUTOR = ThreadPoolExecutor(max_workers=DELETE_WORKERS, thread_name_prefix="s3vectors-delete")
+
+# Keys per GetVectors request (the API maximum)
+GET_VECTORS_BATCH_SIZE = 100
+
+# AmazonS3Vectors stores the chunk text under this metadata key
+PAGE_CONTENT_KEY = "_page_content"
+
+# Result fields pulled from vector metadata, with defaults for absent keys
+_METADATA_DEFAULTS = {
+    "chunk_id": "",
+    "session_id": "",
+    "doc_id": "",
+    "page": None,
+    "section": None,
+    "source_uri": "",
+    PAGE_CONTENT_KEY: "",
+}
+_get_result_fields = itemgetter(*_METADATA_DEFAULTS)
+
+
+
+@lru_cache(maxsize=8)
+def _get_vector_store(
+    vectors_bucket: str,
+    index_name: str,
+    region: str,
+    embedding_model_id: str,
+    embedding_dimension: int,
+) -> AmazonS3Vectors:
+    """
+    Return the process-wide AmazonS3Vectors for an index.
+
+    Building one creates a boto3 client (credential resolution, TLS pool),
+    so stores constructed per request share a cached instance instead.
+    """
+    logger.info(
+        "%s:_get_vector_store - Creating AmazonS3Vectors for %s/%s", __name__, vectors_bucket, index_name
+    )
+    vector_store = AmazonS3Vectors(
+        vector_bucket_name=vectors_bucket,
+        index_name=index_name,
+        embedding=get_fixed_dimension_embeddings(embedding_model_id, embedding_dimension),
+        region_name=region,
+        config=S3_VECTORS_CLIENT_CONFIG,
+    )
+    _use_orjson_parser(vector_store.client)
+    return vector_store
+
+
+def _use_orjson_parser(client: Any) -> None:
+    """
+    Parse this client's JSON response bodies with orjson instead of json.
+
+    QueryVectors responses carry page content for every hit (and GetVectors
+    responses float vectors for MMR), so parsing is a visible share of a search. Only this
+    client's parser is replaced; other boto3 clients keep botocore's.
+    """
+    if not ORJSON_AVAILABLE:
+        return
+
+    def parse_body_as_json(body_contents: bytes) -> Any:
+        if not body_contents:
+            return {}
+        try:
+            return orjson.loads(body_contents)
+        except orjson.JSONDecodeError:
+            # Same fallback as botocore: surface the raw body as the message
+            return {"message": body_contents.decode("utf-8")}
+
+    client._response_parser._parse_body_as_json = parse_body_as_json
+
 
 class S3VectorsStore:
     """
@@ -53,6 +182,10 @@ class S3VectorsStore:
         embedding_region: str = "us-east-1",
         embedding_model_id: str = "models/gemini-embedding-001",
         embedding_dimension: int = 1024,
+        query_embedding_cache_size: int = QUERY_EMBEDDING_CACHE_SIZE,
+        hedge_after_ms: int = HEDGE_AFTER_MS,
+        result_cache_size: int = RESULT_CACHE_SIZE,
+        result_cache_ttl_s: float = RESULT_CACHE_TTL_S,
     ) -> None:
         """
         Initialize S3 Vectors store with Google Gemini embeddings.
@@ -64,51 +197,160 @@ class S3VectorsStore:
             embedding_region: Unused - kept for backwards compatibility
             embedding_model_id: Google embedding model ID (default: gemini-embedding-001)
             embedding_dimension: Output dimension for embeddings (default: 1024)
+            query_embedding_cache_size: In-memory LRU size for query embeddings (0 disables)
+            hedge_after_ms: Latency budget before a query is hedged with a second request
+            result_cache_size: Maximum cached similarity_search results (0 disables)
+            result_cache_ttl_s: Seconds a cached result stays valid
         """
         self._vectors_bucket = vectors_bucket
         self._index_name = index_name
         self._region = region
+        self._hedge_after_s = hedge_after_ms / 1000
+
+        # (query, filter items, k) -> (expiry, results), oldest first
+        self._result_cache: OrderedDict[tuple, tuple[float, list[VectorSearchResult]]] = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        self._result_cache_size = result_cache_size
+        self._result_cache_ttl_s = result_cache_ttl_s
 
         logger.info(
-            f"{__name__}:__init__ - Creating FixedDimensionEmbeddings with "
-            f"model={embedding_model_id}, dimension={embedding_dimension}"
+            "%s:__init__ - Getting shared FixedDimensionEmbeddings with model=%s, dimension=%d",
+            __name__, embedding_model_id, embedding_dimension,
         )
 
-        # Use wrapper that enforces consistent dimensions on all embed calls
-        self._embeddings = FixedDimensionEmbeddings(
-            model=embedding_model_id,
-            output_dimensionality=embedding_dimension,
+        # Use wrapper that enforces consistent dimensions on all embed calls,
+        # shared across stores so the Gemini client is built once per process
+        self._embeddings = get_fixed_dimension_embeddings(embedding_model_id, embedding_dimension)
+        logger.info("%s:__init__ - FixedDimensionEmbeddings initialized", __name__)
+        # Coalesces concurrent query embeddings (e.g. parallel chat sessions) into one API call
+        self._query_embedder = QueryEmbeddingBatcher(self._embeddings)
+        self._embedding_model_id = embedding_model_id
+        self._embed_query_cached = lru_cache(maxsize=query_embedding_cache_size)(self._embed_query_uncached)
+        # Concurrent LRU misses for the same query share one embedding call
+        self._query_inflight = SingleFlight()
+
+        self._vector_store = _get_vector_store(
+            vectors_bucket, index_name, region, embedding_model_id, embedding_dimension
         )
-        logger.info(f"{__name__}:__init__ - FixedDimensionEmbeddings initialized")
+        # Unit query vector for metadata-only listing; any non-zero vector works
+        self._probe_vector = [1.0] + [0.0] * (embedding_dimension - 1)
+
+    def _cached_results(self, key: tuple) -> list[VectorSearchResult] | None:
+        """Return unexpired cached results for key, refreshing its LRU position."""
+        with self._result_cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, results = entry
+            if expires_at < time.monotonic():
+                del self._result_cache[key]
+                return None
+            self._result_cache.move_to_end(key)
+            return list(results)
+
+    def _cache_results(self, key: tuple, results: list[VectorSearchResult]) -> None:
+        """Store results under key, evicting the least recently used entries."""
+        if self._result_cache_size <= 0:
+            return
+        with self._result_cache_lock:
+            self._result_cache[key] = (time.monotonic() + self._result_cache_ttl_s, list(results))
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self._result_cache_size:
+                self._result_cache.popitem(last=False)
+
+    def _embed_query_uncached(self, model_id: str, query: str) -> np.ndarray:
+        """Embed a query as a read-only float32 vector; model_id is part of the LRU key only."""
+        def embed() -> np.ndarray:
+            vector = np.asarray(self._query_embedder.embed_query(query), dtype=np.float32)
+            vector.flags.writeable = False
+            return vector
+
+        return self._query_inflight.do((model_id, query), embed)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Query embedding, served from the LRU when repeated."""
+        return self._embed_query_cached(self._embedding_model_id, query)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query the way similarity_search does, sharing its cache.
 
-        self._vector_store = AmazonS3Vectors(
-            vector_bucket_name=vectors_bucket,
-            index_name=index_name,
-            embedding=self._embeddings,
-            region_name=region,
-        )
+        Args:
+            query: Query text
 
-    @retry(
-        retry=retry_if_exception_type((ClientError, Exception)),
-        stop=stop_after_attempt(5),
-        wait=wait_exponential_jitter(initial=1, max=30, jitter=5),
-        before_sleep=lambda retry_state: logger.warning(
-            f"{__name__}:similarity_search - Retry {retry_state.attempt_number}/5 after throttling"
-        ),
-        reraise=True,
-    )
-    def _search_with_retry(
+        Returns:
+            np.ndarray: Read-only float32 query vector
+        """
+        return self._embed_query(query)
+
+    def preload_queries(self, queries: list[str]) -> None:
+        """
+        Warm the query-embedding caches with expected queries, e.g. at startup.
+
+        Uncached queries are embedded in one batched API call, which stores
+        them in the persistent embedding cache; each is then loaded into
+        the in-memory LRU from that cache without further API calls.
+
+        Args:
+            queries: Query texts to warm
+        """
+        queries = list(dict.fromkeys(query for query in queries if query.strip()))
+        if not queries:
+            return
+        self._embeddings.embed_documents(queries, task_type=QUERY_TASK_TYPE)
+        for query in queries:
+            self._embed_query(query)
+        logger.info("%s:preload_queries - Preloaded %d query embeddings", __name__, len(queries))
+
+    @retry_throttling
+    def _query_vectors(
         self,
-        query: str,
+        query_vector: list[float],
         k: int,
         filter_dict: dict[str, Any] | None,
-    ) -> list[tuple]:
-        """Execute similarity search with retry on throttling."""
-        return self._vector_store.similarity_search_with_score(
-            query=query,
-            k=k,
+    ) -> list[dict]:
+        """Execute a query_vectors call with retry on throttling."""
+        response = self._vector_store.client.query_vectors(
+            vectorBucketName=self._vectors_bucket,
+            indexName=self._index_name,
+            topK=k,
+            queryVector={"float32": query_vector},
             filter=filter_dict,
+            returnMetadata=True,
+            returnDistance=True,
         )
+        return response["vectors"]
+
+    def _search_hedged(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        filter_dict: dict[str, Any] | None,
+    ) -> list[dict]:
+        """
+        Execute a query, hedging with a second request if the first is slow.
+
+        If the first request has not finished within the hedge budget, an
+        identical request is sent and whichever succeeds first wins.
+        """
+        # boto3 serializes plain lists only; convert once for both requests
+        query_vector = query_vector.tolist()
+        first = _QUERY_EXECUTOR.submit(self._query_vectors, query_vector, k, filter_dict)
+        try:
+            return first.result(timeout=self._hedge_after_s)
+        except TimeoutError:
+            pass
+
+        logger.debug("%s:_search_hedged - Query exceeded %.3fs, hedging", __name__, self._hedge_after_s)
+        second = _QUERY_EXECUTOR.submit(self._query_vectors, query_vector, k, filter_dict)
+        pending: set[Future] = {first, second}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+            if not pending:
+                return done.pop().result()
 
     def similarity_search(
         self,
@@ -120,7 +362,9 @@ class S3VectorsStore:
         """
         Search for similar documents with optional filtering.
 
-        Includes exponential backoff retry for API transient failures.
+        Slow queries are hedged; throttling errors are retried with
+        exponential backoff. Results are cached for result_cache_ttl_s
+        per (query, filter, k).
 
         Args:
             query: Search query text
@@ -134,52 +378,116 @@ class S3VectorsStore:
         Raises:
             ClientError: After max retries exhausted
         """
-        filter_dict: dict[str, Any] = {}
-        if session_id:
-            filter_dict["session_id"] = session_id
-        if doc_id:
-            filter_dict["document_id"] = doc_id
+        cache_key = (query, session_id or None, doc_id or None, k)
+        cached = self._cached_results(cache_key)
+        if cached is not None:
+            return cached
+
+        filter_dict = _build_filter(session_id, doc_id)
 
         try:
-            results = self._search_with_retry(
-                query=query,
+            results = self._search_hedged(
+                query_vector=self._embed_query(query),
                 k=k,
-                filter_dict=filter_dict if filter_dict else None,
+                filter_dict=filter_dict,
             )
 
-            search_results = []
-            for doc, score in results:
-                metadata = doc.metadata
-                search_results.append(
-                    VectorSearchResult(
-                        chunk_id=metadata.get("chunk_id", ""),
-                        content=doc.page_content,
-                        metadata=VectorMetadata(
-                            session_id=metadata.get("session_id", ""),
-                            doc_id=metadata.get("doc_id", ""),
-                            chunk_id=metadata.get("chunk_id", ""),
-                            page=metadata.get("page"),
-                            section=metadata.get("section"),
-                            source_uri=metadata.get("source_uri", ""),
-                        ),
-                        similarity_score=float(score),
-                    )
-                )
+            search_results = _to_search_results(results, [vector["distance"] for vector in results])
+            self._cache_results(cache_key, search_results)
 
-            logger.info(
-                f"{__name__}:similarity_search - Found {len(search_results)} results",
+            logger.debug(
+                "%s:similarity_search - Found %d results", __name__, len(search_results),
                 extra={"session_id": session_id, "k": k},
             )
 
             return search_results
 
         except ClientError as e:
-            logger.error(f"{__name__}:similarity_search - ClientError after retries: {e}")
+            logger.error("%s:similarity_search - ClientError after retries: %s", __name__, e)
             raise
         except Exception as e:
-            logger.error(f"{__name__}:similarity_search - {type(e).__name__}: {e}")
+            logger.error("%s:similarity_search - %s: %s", __name__, type(e).__name__, e)
             raise
 
+    def list_by_metadata(
+        self,
+        session_id: str | None = None,
+        doc_id: str | None = None,
+        limit: int = 100,
+    ) -> list[VectorSearchResult]:
+        """
+        List chunks by metadata without embedding a query.
+
+        For browse workflows (session dashboards, deletion prep) that want
+        chunks rather than nearest neighbours. Runs one filtered
+        QueryVectors call with a constant probe vector, so the service
+        applies the metadata filter and nothing is embedded or paged
+        through; the order of the returned chunks is arbitrary.
+
+        Args:
+            session_id: Filter by session ID
+            doc_id: Filter by document ID
+            limit: Maximum number of chunks to return
+
+        Returns:
+            list[VectorSearchResult]: Matching chunks with similarity_score 0.0
+        """
+        vectors = self._query_vectors(self._probe_vector, limit, _build_filter(session_id, doc_id))
+
+        logger.debug(
+            "%s:list_by_metadata - Listed %d chunks", __name__, len(vectors),
+            extra={"session_id": session_id, "doc_id": doc_id},
+        )
+        return _to_search_results(vectors, repeat(0.0))
+
+    def similarity_search_batch(
+        self,
+        queries: list[str],
+        k: int = 5,
+        session_id: str | None = None,
+    ) -> list[list[VectorSearchResult]]:
+        """
+        Search for several queries at once.
+
+        All queries are embedded in one API call and the S3 Vectors
+        queries run concurrently, so N queries cost about one embedding
+        round-trip and one query round-trip instead of N of each.
+
+        Args:
+            queries: Search query texts
+            k: Number of results per query
+            session_id: Filter by session ID
+
+        Returns:
+            list[list[VectorSearchResult]]: Results aligned with queries
+        """
+        if not queries:
+            return []
+
+        filter_dict = _build_filter(session_id, None)
+        vectors = np.asarray(self._embeddings.embed_documents(queries, task_type=QUERY_TASK_TYPE), dtype=np.float32)
+        responses = list(_BATCH_EXECUTOR.map(lambda vector: self._search_hedged(vector, k, filter_dict), vectors))
+
+        logger.debug(
+            "%s:similarity_search_batch - Searched %d queries", __name__, len(queries),
+            extra={"session_id": session_id, "k": k},
+        )
+        return [_to_search_results(results, [vector["distance"] for vector in results]) for results in responses]
+
+    @retry_throttling
+    def _get_vector_data(self, keys: list[str]) -> dict[str, list[float]]:
+        """Fetch stored float32 vectors by key, GET_VECTORS_BATCH_SIZE keys per GetVectors call."""
+        data: dict[str, list[float]] = {}
+        for start in range(0, len(keys), GET_VECTORS_BATCH_SIZE):
+            response = self._vector_store.client.get_vectors(
+                vectorBucketName=self._vectors_bucket,
+                indexName=self._index_name,
+                keys=keys[start : start + GET_VECTORS_BATCH_SIZE],
+                returnData=True,
+            )
+            data.update((vector["key"], vector["data"]["float32"]) for vector in response["vectors"])
+        return data
+
     def max_marginal_relevance_search(
         self,
         query: str,
@@ -191,6 +499,10 @@ class S3VectorsStore:
         """
         MMR search balancing relevance and diversity.
 
+        Fetches fetch_k candidates, then their stored vectors with
+        GetVectors (QueryVectors does not return vector data), and re-ranks
+        them locally; AmazonS3Vectors has no MMR search of its own.
+
         Args:
             query: Search query text
             k: Number of results to return
@@ -201,39 +513,28 @@ class S3VectorsStore:
         Returns:
             list[VectorSearchResult]: Diverse search results
         """
-        filter_dict: dict[str, Any] = {}
-        if session_id:
-            filter_dict["session_id"] = session_id
-
         try:
-            results = self._vector_store.max_marginal_relevance_search(
-                query=query,
-                k=k,
-                fetch_k=fetch_k,
-                lambda_mult=lambda_mult,
-                filter=filter_dict if filter_dict else None,
+            query_vector = self._embed_query(query)
+            candidates = self._search_hedged(
+                query_vector=query_vector,
+                k=max(fetch_k, k),
+                filter_dict=_build_filter(session_id, None),
+            )
+            data = self._get_vector_data([vector["key"] for vector in candidates])
+            # Vectors deleted between the two calls have no data
+            candidates = [vector for vector in candidates if vector["key"] in data]
+            if not candidates:
+                return []
+
+            selected = mmr_select(
+                query_vector,
+                np.asarray([data[vector["key"]] for vector in candidates], dtype=np.float32),
+                k,
+                lambda_mult,
             )
 
-            search_results = []
-            for doc in results:
-                metadata = doc.metadata
-                search_results.append(
-                    VectorSearchResult(
-                        chunk_id=metadata.get("chunk_id", ""),
-                        content=doc.page_content,
-                        metadata=VectorMetadata(
-                            session_id=metadata.get("session_id", ""),
-                            doc_id=metadata.get("doc_id", ""),
-                            chunk_id=metadata.get("chunk_id", ""),
-                            page=metadata.get("page"),
-                            section=metadata.get("section"),
-                            source_uri=metadata.get("source_uri", ""),
-                        ),
-                        similarity_score=1.0,  # MMR doesn't return scores
-                    )
-                )
-
-            return search_results
+            # MMR doesn't return scores
+            return _to_search_results([candidates[i] for i in selected], repeat(1.0))
 
         except Exception as e:
             logger.exception(
@@ -270,10 +571,23 @@ class S3VectorsStore:
             search_kwargs=search_kwargs,
         )
 
+    @retry_delete_throttling
+    def _delete_batch(self, chunk_ids: list[str]) -> None:
+        """Delete one batch of vectors with retry on throttling."""
+        self._vector_store.client.delete_vectors(
+            vectorBucketName=self._vectors_bucket,
+            indexName=self._index_name,
+            keys=chunk_ids,
+        )
+
     def delete_by_doc_id(self, doc_id: str, chunk_ids: list[str]) -> None:
         """
         Delete all vectors for a document.
 
+        Chunk ids are sent in DELETE_BATCH_SIZE batches on the shared
+        delete pool (DELETE_WORKERS requests at a time), each retried on
+        throttling.
+
         Args:
             doc_id: Document ID
             chunk_ids: List of chunk IDs to delete
@@ -281,8 +595,12 @@ class S3VectorsStore:
         if not chunk_ids:
             return
 
+        batches = [
+            chunk_ids[start : start + DELETE_BATCH_SIZE] for start in range(0, len(chunk_ids), DELETE_BATCH_SIZE)
+        ]
         try:
-            self._vector_store.delete(ids=chunk_ids)
+            # list() re-raises the first failed batch
+            list(_DELETE_EXECUTOR.map(self._delete_batch, batches))
             logger.info(
                 "Deleted document chunks",
                 extra={"doc_id": doc_id, "chunk_count": len(chunk_ids)},
@@ -293,3 +611,54 @@ class S3VectorsStore:
                 extra={"doc_id": doc_id, "error": str(e)},
             )
             raise
+        finally:
+            # Deletes are rare; dropping every cached result is simpler than tracking hits
+            with self._result_cache_lock:
+                self._result_cache.clear()
+
+
+@lru_cache(maxsize=1024)
+def _build_filter(session_id: str | None, doc_id: str | None) -> dict[str, Any] | None:
+    """
+    S3 Vectors metadata filter for the given session/document, or None.
+
+    Memoized so repeated searches in a session reuse one dict; callers
+    must not mutate the returned filter.
+    """
+    filter_dict: dict[str, Any] = {}
+    if session_id:
+        filter_dict["session_id"] = session_id
+    if doc_id:
+        filter_dict["doc_id"] = doc_id
+    return filter_dict or None
+
+
+def _to_search_results(vectors: list[dict], scores: Iterable[float]) -> list[VectorSearchResult]:
+    """
+    Convert S3 Vectors result entries into VectorSearchResults.
+
+    Uses model_construct to skip Pydantic validation: metadata was written
+    by our own ingestion path. The only type drift is page, which S3
+    Vectors returns as a float, so it is coerced explicitly.
+    """
+    results = []
+    for vector, score in zip(vectors, scores):
+        chunk_id, session_id, doc_id, page, section, source_uri, content = _get_result_fields(
+            {**_METADATA_DEFAULTS, **vector.get("metadata", {})}
+        )
+        results.append(
+            VectorSearchResult.model_construct(
+                chunk_id=chunk_id,
+                content=content,
+                metadata=VectorMetadata.model_construct(
+                    session_id=session_id,
+                    doc_id=doc_id,
+                    chunk_id=chunk_id,
+                    page=None if page is None else int(page),
+                    section=section,
+                    source_uri=source_uri,
+                ),
+                similarity_score=float(score),
+            )
+        )
+    return results
@@ -0,0 +1,65 @@
+"""
+In-flight call deduplication (single-flight) for embedding lookups.
+
+When several threads miss the query-embedding LRU for the same query at
+once, only the first calls the embedding API; the others wait on its
+future and receive the same result (or exception). This keeps a burst of
+identical questions, or a retry storm, from fanning out into duplicate
+API calls.
+
+Dependencies: threading, concurrent.futures
+System role: Thundering-herd protection for vector store query embeddings
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time, sharing its result with waiters.
+
+    Keys are dropped as soon as their call finishes, so this only merges
+    concurrent calls; caching finished results is left to the caller.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty in-flight map."""
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Return fn(), or the result of an identical call already in flight.
+
+        Args:
+            key: Identity of the call (equal keys share one call)
+            fn: Function computing the result
+
+        Returns:
+            T: Result of the owning call; its exception is raised in every waiter
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
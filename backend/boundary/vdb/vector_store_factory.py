@@ -38,6 +38,10 @@ def get_vector_store():
             index_name=settings.vector_store.index_name,
             embedding_region=settings.vector_store.embedding_region,
             embedding_model_id=settings.vector_store.embedding_model,
+            index_type=settings.vector_store.faiss_index_type,
+            precision=settings.vector_store.faiss_precision,
+            rescore_k_factor=settings.vector_store.faiss_rescore_k_factor,
+            query_embedding_cache_size=settings.vector_store.query_embedding_cache_size,
         )
 
     elif store_type == "s3":
@@ -48,6 +52,7 @@ def get_vector_store():
             region=settings.vector_store.aws_region,
             embedding_region=settings.vector_store.embedding_region,
             embedding_model_id=settings.vector_store.embedding_model,
+            query_embedding_cache_size=settings.vector_store.query_embedding_cache_size,
         )
 
     else:
@@ -10,6 +10,8 @@ System role: Central configuration aggregator for the application
 
 from functools import lru_cache
 
+from pydantic import Field
+
 from backend.configs.base import BaseSettings
 from backend.configs.database import DatabaseSettings
 from backend.configs.vector_store import VectorStoreSettings
@@ -20,11 +22,11 @@ from backend.configs.s3_documents import S3DocumentsSettings
 class Settings(BaseSettings):
     """Unified application settings aggregating all config modules."""
 
-    # Aggregated settings
-    database: DatabaseSettings = DatabaseSettings()
-    vector_store: VectorStoreSettings = VectorStoreSettings()
-    observability: ObservabilitySettings = ObservabilitySettings()
-    s3_documents: S3DocumentsSettings = S3DocumentsSettings()
+    # Aggregated settings, built with Settings() rather than at import time
+    database: DatabaseSettings = Field(default_factory=DatabaseSettings)
+    vector_store: VectorStoreSettings = Field(default_factory=VectorStoreSettings)
+    observability: ObservabilitySettings = Field(default_factory=ObservabilitySettings)
+    s3_documents: S3DocumentsSettings = Field(default_factory=S3DocumentsSettings)
 
 
 @lru_cache
@@ -35,7 +35,28 @@ class VectorStoreSettings(BaseSettings):
         description="Embedding vector dimension (1024 for S3 Vectors index compatibility)",
     )
 
-    top_k: int = Field(default=5, description="Number of top results to retrieve")
+    query_embedding_cache_size: int = Field(
+        default=1024,
+        description="In-memory LRU size for query embeddings per store (0 disables)",
+    )
+
+    faiss_index_type: str = Field(
+        default="hnsw",
+        description="FAISS index type for local dev: 'hnsw', 'flat', 'ivfpq' or 'mmap_flat'",
+    )
+    faiss_precision: str = Field(
+        default="fp16",
+        description="FAISS flat/HNSW vector storage: 'fp32', 'fp16' or 'int8'",
+    )
+    faiss_rescore_k_factor: int = Field(
+        default=0,
+        description="FAISS 'ivfpq': re-rank k * factor PQ candidates by exact distance (0 disables)",
+    )
+
+    top_k: int = Field(
+        default=5,
+        description="Number of top results to retrieve (3 suffices for contextually embedded chunks)",
+    )
     similarity_threshold: float = Field(
         default=0.7,
         description="Minimum similarity score for retrieval (0.0-1.0)",
@@ -0,0 +1,113 @@
+"""
+Semantic answer cache for the RAG agent.
+
+Stores generated answers per session keyed by the question's embedding.
+A later question whose embedding is close enough (cosine similarity at or
+above the threshold) is answered from the cache, skipping both retrieval
+and generation. Entries expire after a TTL so answers pick up documents
+uploaded or deleted since.
+
+Dependencies: numpy
+System role: Repeated-question short-circuit for RAGAgent
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class _Entry:
+    """One cached answer with its unit-length question embedding."""
+
+    vector: np.ndarray
+    answer: Any
+    expires_at: float
+
+
+class SemanticAnswerCache:
+    """
+    Per-session cache of answers looked up by embedding similarity.
+
+    Sessions are evicted least recently used once max_sessions is reached;
+    within a session the oldest entry is dropped past max_entries_per_session.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_s: float = 600.0,
+        max_sessions: int = 1024,
+        max_entries_per_session: int = 64,
+    ) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit
+            ttl_s: Seconds an answer stays valid
+            max_sessions: Sessions kept before the least recently used is dropped
+            max_entries_per_session: Answers kept per session
+        """
+        self._threshold = similarity_threshold
+        self._ttl_s = ttl_s
+        self._max_sessions = max_sessions
+        self._max_entries = max_entries_per_session
+        self._sessions: OrderedDict[str | None, list[_Entry]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str | None, query_vector: np.ndarray) -> Any | None:
+        """
+        Return the cached answer for the most similar live question, if close enough.
+
+        Args:
+            session_id: Session the question belongs to
+            query_vector: Question embedding
+
+        Returns:
+            Any | None: Cached answer, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = self._sessions.get(session_id)
+            if not entries:
+                return None
+            entries[:] = [entry for entry in entries if entry.expires_at > now]
+            if not entries:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            similarities = np.stack([entry.vector for entry in entries]) @ _unit(query_vector)
+            best = int(similarities.argmax())
+            if similarities[best] < self._threshold:
+                return None
+            return entries[best].answer
+
+    def put(self, session_id: str | None, query_vector: np.ndarray, answer: Any) -> None:
+        """
+        Cache an answer for a question.
+
+        Args:
+            session_id: Session the question belongs to
+            query_vector: Question embedding
+            answer: Answer to return for similar questions
+        """
+        entry = _Entry(_unit(query_vector), answer, time.monotonic() + self._ttl_s)
+        with self._lock:
+            entries = self._sessions.setdefault(session_id, [])
+            self._sessions.move_to_end(session_id)
+            entries.append(entry)
+            del entries[: -self._max_entries]
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    """float32 copy of vector scaled to unit length (zero vectors stay zero)."""
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
@@ -10,27 +10,91 @@ Dependencies: langchain.agents, langchain_aws, backend.boundary.vdb
 System role: RAG Q&A agent orchestration
 """
 
+import asyncio
 import logging
+import re
+import threading
+import time
+import weakref
 from collections.abc import AsyncGenerator
+from functools import lru_cache
 
+import numpy as np
 from fastapi.concurrency import run_in_threadpool
 from langchain.agents import create_agent
 from langchain.agents.structured_output import ToolStrategy
 from langchain_aws import ChatBedrockConverse
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.messages.ai import UsageMetadata, add_usage
+from langchain_core.prompts import ChatPromptTemplate
 
 from backend.boundary.vdb.vector_store_factory import get_vector_store
+from backend.core.agentic_system.agent.answer_cache import SemanticAnswerCache
 from backend.core.agentic_system.agent.rag_agent_prompt import (
     get_rag_prompt,
     register_rag_prompt,
 )
-from backend.core.agentic_system.agent.rag_agent_schema import RAGResponse
+from backend.core.agentic_system.agent.rag_agent_schema import RAGCitation, RAGResponse
 from backend.core.agentic_system.agent.rag_agent_tool import create_search_tool
-from backend.models.streaming import StreamEvent, StreamEventType, StreamingCitation
+from backend.models.streaming import StreamEvent, StreamEventType
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 load_dotenv()
 logger = logging.getLogger(__name__)
+
+# Seconds a fetched prompt is reused before asking the registry again
+# (matches the Langfuse client's own prompt cache TTL)
+PROMPT_REFRESH_S = 60.0
+
+# Returned without calling the model when retrieval finds no chunks
+NO_RESULTS_ANSWER = "I couldn't find any relevant documents for this question."
+
+# invoke_fast asks for inline chunk markers instead of schema-guided output
+FAST_CITATION_INSTRUCTION = (
+    "After each statement, cite the chunk it is based on as [cite:<chunk_id>], "
+    "using the chunk_id field of the context."
+)
+_CITE_MARKER = re.compile(r" ?\[cite:([^\]\s]+)\]")
+
+# Search tool and compiled agent per vector store, then per (model_id, temperature);
+# entries go away with their store
+_SEARCH_AGENTS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_SEARCH_AGENTS_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _get_chat_model(model_id: str, temperature: float) -> ChatGoogleGenerativeAI:
+    """
+    Return the process-wide streaming chat model for a model and temperature.
+
+    Building one creates a new API client, so agents share a cached instance.
+    """
+    return ChatGoogleGenerativeAI(model=model_id, temperature=temperature)
+
+
+def _get_search_agent(vector_store, model_id: str, temperature: float) -> tuple:
+    """
+    Return the shared search tool and compiled agent graph for a store and model.
+
+    create_agent compiles a LangGraph graph, so agents with the same store,
+    model and temperature reuse one instead of rebuilding it. The cache is
+    keyed weakly on the store and the tool only holds a weak proxy to it,
+    so a discarded store releases its agents.
+    """
+    with _SEARCH_AGENTS_LOCK:
+        agents = _SEARCH_AGENTS.setdefault(vector_store, {})
+        key = (model_id, temperature)
+        if key not in agents:
+            search_tool = create_search_tool(weakref.proxy(vector_store))
+            agent = create_agent(
+                model=_get_chat_model(model_id, temperature),
+                tools=[search_tool],
+                response_format=ToolStrategy(RAGResponse),
+            )
+            agents[key] = (search_tool, agent)
+        return agents[key]
+
+
 class RAGAgent:
     """
     RAG Q&A agent with citation support.
@@ -48,6 +112,7 @@ class RAGAgent:
         temperature: float = 0.0,
         use_prompt_registry: bool = False,
         prompt_label: str | None = None,
+        retrieval_k: int = 5,
     ) -> None:
         """
         Initialize RAG agent with vector store and model.
@@ -59,6 +124,8 @@ class RAGAgent:
             temperature: Model temperature (0.0 for deterministic)
             use_prompt_registry: Whether to fetch prompts from Langfuse
             prompt_label: Optional label filter when using registry
+            retrieval_k: Chunks retrieved per question (3 suffices for
+                documents ingested with contextual retrieval)
         """
         # Use factory to select vector store based on environment if not provided
         if vector_store is None:
@@ -68,20 +135,17 @@ class RAGAgent:
         self._prompt_label = prompt_label
         self._model_id = model_id
         self._temperature = temperature
+        self._retrieval_k = retrieval_k
+        self._prompt: ChatPromptTemplate | None = None
+        self._prompt_fetched_at = 0.0
 
-        # Initialize streaming model (used by astream method)
-        self._model = ChatGoogleGenerativeAI(
-            model=model_id,
-            temperature=temperature,
-        )
-
-        self._search_tool = create_search_tool(vector_store)
+        # Streaming model (used by astream method) and agent graph, shared per process
+        self._model = _get_chat_model(model_id, temperature)
+        self._search_tool, self._agent = _get_search_agent(vector_store, model_id, temperature)
 
-        self._agent = create_agent(
-            model="google_genai:gemini-3-flash-preview",
-            tools=[self._search_tool],
-            response_format=ToolStrategy(RAGResponse),
-        )
+        # Answers to repeated first-turn questions, looked up by question embedding
+        self._answer_cache = SemanticAnswerCache()
+        self._stream_cache = SemanticAnswerCache()
 
         if use_prompt_registry:
             register_rag_prompt(
@@ -90,6 +154,57 @@ class RAGAgent:
                 labels=[prompt_label] if prompt_label else None,
             )
 
+    def _get_prompt(self) -> ChatPromptTemplate:
+        """Prompt template, fetched (and converted) at most once per PROMPT_REFRESH_S."""
+        now = time.monotonic()
+        if self._prompt is None or now - self._prompt_fetched_at >= PROMPT_REFRESH_S:
+            self._prompt = get_rag_prompt(
+                use_registry=self._use_prompt_registry,
+                label=self._prompt_label,
+            )
+            self._prompt_fetched_at = now
+        return self._prompt
+
+    async def _aget_prompt(self) -> ChatPromptTemplate:
+        """Async _get_prompt; a refresh (possibly a registry round-trip) runs in a worker thread."""
+        if self._prompt is not None and time.monotonic() - self._prompt_fetched_at < PROMPT_REFRESH_S:
+            return self._prompt
+        return await run_in_threadpool(self._get_prompt)
+
+    def _log_usage(self, method: str, usage: UsageMetadata | None) -> None:
+        """
+        Log prompt token usage, including tokens served from the provider's prefix cache.
+
+        Gemini caches repeated prompt prefixes implicitly, so a rising
+        cache_read share shows the static system prompt is being reused.
+        """
+        if not usage:
+            return
+        cache_read = usage.get("input_token_details", {}).get("cache_read", 0)
+        logger.info(
+            f"{__name__}:{method} - Usage: input_tokens={usage['input_tokens']}, "
+            f"cache_read={cache_read}, output_tokens={usage['output_tokens']}"
+        )
+
+    def _cacheable_query_vector(
+        self,
+        question: str,
+        chat_history: list[BaseMessage] | None,
+    ) -> np.ndarray | None:
+        """
+        Question embedding for answer-cache lookups.
+
+        Returns None when the answer depends on chat history or the store
+        cannot embed queries. The store caches the embedding, so the
+        retrieval that follows a miss does not embed the question again.
+        """
+        if chat_history or not question.strip():
+            return None
+        embed_query = getattr(self._vector_store, "embed_query", None)
+        if embed_query is None:
+            return None
+        return embed_query(question)
+
     def _format_search_context(self, results: list) -> str:
         """Format search results into context string for prompts."""
         if not results:
@@ -126,28 +241,28 @@ relevance_score: {result.similarity_score:.3f}
         Returns:
             RAGResponse: Structured response with answer and citations
         """
-        prompt = get_rag_prompt(
-            use_registry=self._use_prompt_registry,
-            label=self._prompt_label,
-        )
+        query_vector = self._cacheable_query_vector(question, chat_history)
+        if query_vector is not None:
+            cached = self._answer_cache.get(session_id, query_vector)
+            if cached is not None:
+                logger.info(f"{__name__}:invoke - Answer cache hit session_id={session_id}")
+                return cached
+
+        prompt = self._get_prompt()
 
         # Search with session_id filter for multi-tenant isolation
         logger.info(f"{__name__}:invoke - Searching with session_id={session_id}")
         results = self._vector_store.similarity_search(
             query=question,
-            k=5,
+            k=self._retrieval_k,
             session_id=session_id,
         )
+        if not results:
+            logger.info(f"{__name__}:invoke - No search results, skipping the model call")
+            return RAGResponse(answer=NO_RESULTS_ANSWER)
         context = self._format_search_context(results)
 
-        # Format chat history if provided
-        history_text = ""
-        if chat_history:
-            formatted_messages = [
-                f"{'User' if msg.type == 'human' else 'Assistant'}: {msg.content}"
-                for msg in chat_history
-            ]
-            history_text = "Previous Conversation:\n" + "\n".join(formatted_messages) + "\n"
+        history_text = _format_history(chat_history)
 
         messages = prompt.invoke({
             "context": context,
@@ -156,8 +271,12 @@ relevance_score: {result.similarity_score:.3f}
         }).to_messages()
 
         result = self._agent.invoke({"messages": messages})
+        self._log_usage("invoke", _sum_usage(result["messages"]))
 
-        return result["structured_response"]
+        response = result["structured_response"]
+        if query_vector is not None:
+            self._answer_cache.put(session_id, query_vector, response)
+        return response
 
     async def ainvoke(
         self,
@@ -176,29 +295,31 @@ relevance_score: {result.similarity_score:.3f}
         Returns:
             RAGResponse: Structured response with answer and citations
         """
-        prompt = get_rag_prompt(
-            use_registry=self._use_prompt_registry,
-            label=self._prompt_label,
-        )
-
-        # Search with session_id filter for multi-tenant isolation
+        query_vector = await run_in_threadpool(self._cacheable_query_vector, question, chat_history)
+        if query_vector is not None:
+            cached = self._answer_cache.get(session_id, query_vector)
+            if cached is not None:
+                logger.info(f"{__name__}:ainvoke - Answer cache hit session_id={session_id}")
+                return cached
+
+        # Search with session_id filter for multi-tenant isolation, overlapping
+        # any prompt registry fetch with the retrieval round-trip
         logger.info(f"{__name__}:ainvoke - Searching with session_id={session_id}")
-        results = await run_in_threadpool(
-            self._vector_store.similarity_search,
-            query=question,
-            k=5,
-            session_id=session_id,
+        prompt, results = await asyncio.gather(
+            self._aget_prompt(),
+            run_in_threadpool(
+                self._vector_store.similarity_search,
+                query=question,
+                k=self._retrieval_k,
+                session_id=session_id,
+            ),
         )
+        if not results:
+            logger.info(f"{__name__}:ainvoke - No search results, skipping the model call")
+            return RAGResponse(answer=NO_RESULTS_ANSWER)
         context = self._format_search_context(results)
 
-        # Format chat history if provided
-        history_text = ""
-        if chat_history:
-            formatted_messages = [
-                f"{'User' if msg.type == 'human' else 'Assistant'}: {msg.content}"
-                for msg in chat_history
-            ]
-            history_text = "Previous Conversation:\n" + "\n".join(formatted_messages) + "\n"
+        history_text = _format_history(chat_history)
 
         messages = prompt.invoke({
             "context": context,
@@ -207,8 +328,78 @@ relevance_score: {result.similarity_score:.3f}
         }).to_messages()
 
         result = await self._agent.ainvoke({"messages": messages})
+        self._log_usage("ainvoke", _sum_usage(result["messages"]))
 
-        return result["structured_response"]
+        response = result["structured_response"]
+        if query_vector is not None:
+            self._answer_cache.put(session_id, query_vector, response)
+        return response
+
+    def invoke_fast(
+        self,
+        question: str,
+        session_id: str | None = None,
+        chat_history: list[BaseMessage] | None = None,
+    ) -> RAGResponse:
+        """
+        Answer a question with one plain model call instead of the structured-output agent.
+
+        The model marks the chunks it uses with [cite:chunk_id]. The markers
+        are parsed into citations and removed from the answer. This skips
+        the agent's tool-call round-trip and schema-guided decoding. The
+        trade-off: confidence and reasoning are left at their defaults, and
+        citations depend on the model following the marker format. Use
+        invoke() when the full schema is required.
+
+        Args:
+            question: User's question
+            session_id: Optional session ID for filtering
+            chat_history: Optional conversation history for context
+
+        Returns:
+            RAGResponse: Answer with citations for the chunks it cites
+        """
+        prompt = self._get_prompt()
+
+        logger.info(f"{__name__}:invoke_fast - Searching with session_id={session_id}")
+        results = self._vector_store.similarity_search(
+            query=question,
+            k=self._retrieval_k,
+            session_id=session_id,
+        )
+        if not results:
+            logger.info(f"{__name__}:invoke_fast - No search results, skipping the model call")
+            return RAGResponse(answer=NO_RESULTS_ANSWER)
+
+        messages = prompt.invoke({
+            "context": self._format_search_context(results),
+            "question": f"{question}\n\n{FAST_CITATION_INSTRUCTION}",
+            "chat_history": _format_history(chat_history),
+        }).to_messages()
+
+        response = self._model.invoke(messages)
+        self._log_usage("invoke_fast", response.usage_metadata)
+
+        text = _content_text(response.content)
+        results_by_id = {result.chunk_id: result for result in results}
+        # Each cited chunk once, in order of first citation; unknown ids are ignored
+        cited = [
+            results_by_id[chunk_id]
+            for chunk_id in dict.fromkeys(_CITE_MARKER.findall(text))
+            if chunk_id in results_by_id
+        ]
+        citations = [
+            RAGCitation(
+                chunk_id=result.chunk_id,
+                content_snippet=result.content[:100],
+                page=result.metadata.page,
+                section=result.metadata.section,
+                source_uri=result.metadata.source_uri or "",
+                relevance_score=result.similarity_score,
+            )
+            for result in cited
+        ]
+        return RAGResponse(answer=_CITE_MARKER.sub("", text).strip(), citations=citations)
 
     async def astream(
         self,
@@ -232,33 +423,77 @@ relevance_score: {result.similarity_score:.3f}
         """
         logger.info(f"{__name__}:astream - START session_id={session_id}, question_len={len(question)}")
 
-        # Step 1: Retrieve context from vector store
+        query_vector = await run_in_threadpool(self._cacheable_query_vector, question, chat_history)
+        if query_vector is not None:
+            cached = self._stream_cache.get(session_id, query_vector)
+            if cached is not None:
+                logger.info(f"{__name__}:astream - Answer cache hit, replaying {len(cached[1])} tokens")
+                for event in _replay_stream(*cached):
+                    yield event
+                return
+
+        # Step 1: Retrieve context from vector store (and the prompt, concurrently)
         try:
-            logger.info(f"{__name__}:astream - Step 1: Calling similarity_search (k=5)")
-            search_results = await run_in_threadpool(
-                self._vector_store.similarity_search,
-                query=question,
-                k=5,
-                session_id=session_id,
+            logger.info(f"{__name__}:astream - Step 1: Calling similarity_search (k={self._retrieval_k})")
+            search_results, prompt = await asyncio.gather(
+                run_in_threadpool(
+                    self._vector_store.similarity_search,
+                    query=question,
+                    k=self._retrieval_k,
+                    session_id=session_id,
+                ),
+                self._aget_prompt(),
             )
             logger.info(f"{__name__}:astream - Step 1 OK: Retrieved {len(search_results)} chunks")
         except Exception as e:
             logger.error(f"{__name__}:astream - Step 1 FAILED: similarity_search - {type(e).__name__}: {e}")
             raise
 
-        # Step 2: Extract citations from search results
+        # Nothing to ground an answer in: reply without a model round-trip
+        if not search_results:
+            logger.info(f"{__name__}:astream - No search results, skipping the model call")
+            for event in _replay_stream({"chunks": []}, [NO_RESULTS_ANSWER], []):
+                yield event
+            return
+
+        # Step 2: Build citations, context event chunks and prompt context in one pass
         try:
-            logger.info(f"{__name__}:astream - Step 2: Extracting citations")
-            citations = [
-                StreamingCitation(
-                    chunk_id=result.chunk_id,
-                    doc_name=result.metadata.source_uri.split("/")[-1] if result.metadata.source_uri else "unknown",
-                    page=result.metadata.page,
-                    section=result.metadata.section,
-                    source_uri=result.metadata.source_uri,
+            logger.info(f"{__name__}:astream - Step 2: Extracting citations and context")
+            citations = []
+            context_chunks = []
+            formatted_chunks = []
+            for result in search_results:
+                metadata = result.metadata
+                source_uri = metadata.source_uri
+                page = metadata.page
+                section = metadata.section
+                # Same fields as StreamingCitation, built as the dict the event sends
+                citations.append(
+                    {
+                        "chunk_id": result.chunk_id,
+                        "doc_name": source_uri.split("/")[-1] if source_uri else "unknown",
+                        "page": page,
+                        "section": section,
+                        "source_uri": source_uri,
+                    }
+                )
+                context_chunks.append(
+                    {
+                        "chunk_id": result.chunk_id,
+                        "content_snippet": result.content[:200],
+                        "page": page,
+                        "section": section,
+                        "source_uri": source_uri,
+                        "relevance_score": result.similarity_score,
+                    }
                 )
-                for result in search_results
-            ]
+                page_info = f"Page {page}" if page else "Page unknown"
+                section_info = f", Section: {section}" if section else ""
+                formatted_chunks.append(f"""---
+[{page_info}{section_info}]
+
+{result.content}
+---""")
             logger.info(f"{__name__}:astream - Step 2 OK: Extracted {len(citations)} citations")
         except Exception as e:
             logger.error(f"{__name__}:astream - Step 2 FAILED: citation extraction - {type(e).__name__}: {e}")
@@ -267,60 +502,21 @@ relevance_score: {result.similarity_score:.3f}
         # Step 3: Yield context event with citation metadata
         try:
             logger.info(f"{__name__}:astream - Step 3: Yielding CONTEXT event")
-            yield StreamEvent(
-                event=StreamEventType.CONTEXT,
-                data={
-                    "chunks": [
-                        {
-                            "chunk_id": result.chunk_id,
-                            "content_snippet": result.content[:200],
-                            "page": result.metadata.page,
-                            "section": result.metadata.section,
-                            "source_uri": result.metadata.source_uri,
-                            "relevance_score": result.similarity_score,
-                        }
-                        for result in search_results
-                    ]
-                },
-            )
+            context_data = {"chunks": context_chunks}
+            yield StreamEvent(event=StreamEventType.CONTEXT, data=context_data)
             logger.info(f"{__name__}:astream - Step 3 OK: CONTEXT event yielded")
         except Exception as e:
             logger.error(f"{__name__}:astream - Step 3 FAILED: CONTEXT event - {type(e).__name__}: {e}")
             raise
 
-        # Step 4: Format context for prompt
-        try:
-            logger.info(f"{__name__}:astream - Step 4: Formatting context for prompt")
-            if not search_results:
-                context_text = "No relevant documents found."
-                logger.warning(f"{__name__}:astream - No search results, using fallback context")
-            else:
-                formatted_chunks = []
-                for result in search_results:
-                    page_info = f"Page {result.metadata.page}" if result.metadata.page else "Page unknown"
-                    section_info = f", Section: {result.metadata.section}" if result.metadata.section else ""
-                    chunk_text = f"""---
-[{page_info}{section_info}]
-
-{result.content}
----"""
-                    formatted_chunks.append(chunk_text)
-                context_text = "\n".join(formatted_chunks)
-            logger.info(f"{__name__}:astream - Step 4 OK: context_len={len(context_text)}")
-        except Exception as e:
-            logger.error(f"{__name__}:astream - Step 4 FAILED: context formatting - {type(e).__name__}: {e}")
-            raise
+        # Step 4: Join context for prompt
+        context_text = "\n".join(formatted_chunks)
+        logger.info(f"{__name__}:astream - Step 4 OK: context_len={len(context_text)}")
 
         # Step 5: Format chat history
         try:
             logger.info(f"{__name__}:astream - Step 5: Formatting chat history")
-            history_text = ""
-            if chat_history:
-                formatted_messages = [
-                    f"{'User' if msg.type == 'human' else 'Assistant'}: {msg.content}"
-                    for msg in chat_history
-                ]
-                history_text = "Previous Conversation:\n" + "\n".join(formatted_messages) + "\n"
+            history_text = _format_history(chat_history)
             logger.info(f"{__name__}:astream - Step 5 OK: history_len={len(history_text)}, msg_count={len(chat_history) if chat_history else 0}")
         except Exception as e:
             logger.error(f"{__name__}:astream - Step 5 FAILED: history formatting - {type(e).__name__}: {e}")
@@ -329,10 +525,6 @@ relevance_score: {result.similarity_score:.3f}
         # Step 6: Build prompt messages
         try:
             logger.info(f"{__name__}:astream - Step 6: Building prompt messages")
-            prompt = get_rag_prompt(
-                use_registry=self._use_prompt_registry,
-                label=self._prompt_label,
-            )
             messages = prompt.invoke({
                 "context": context_text,
                 "question": question,
@@ -344,22 +536,19 @@ relevance_score: {result.similarity_score:.3f}
             raise
 
         # Step 7: Stream tokens from model
-        full_answer = ""
+        tokens = []
         token_index = 0
+        usage = None
         try:
             logger.info(f"{__name__}:astream - Step 7: Starting LLM stream (model={self._model_id})")
             async for chunk in self._model.astream(messages):
-                if chunk.content:
-                    # Handle both string and list content from Bedrock
-                    if isinstance(chunk.content, list):
-                        token_content = "".join(
-                            str(item) if isinstance(item, str) else (item.get("text", "") if isinstance(item, dict) else str(item))
-                            for item in chunk.content
-                        )
-                    else:
-                        token_content = str(chunk.content)
-
-                    full_answer += token_content
+                if chunk.usage_metadata:
+                    usage = add_usage(usage, chunk.usage_metadata)
+                token_content = _content_text(chunk.content)
+                if token_content:
+                    tokens.append(token_content)
+                    # The validating constructor runs in pydantic-core and is
+                    # cheaper per token than the pure-Python model_construct
                     yield StreamEvent(
                         event=StreamEventType.TOKEN,
                         data={"token": token_content, "index": token_index},
@@ -370,7 +559,9 @@ relevance_score: {result.similarity_score:.3f}
                     if token_index <= 3:
                         logger.info(f"{__name__}:astream - Token #{token_index}: '{token_content[:50]}'")
 
+            full_answer = "".join(tokens)
             logger.info(f"{__name__}:astream - Step 7 OK: Streamed {token_index} tokens, answer_len={len(full_answer)}")
+            self._log_usage("astream", usage)
         except Exception as e:
             logger.error(f"{__name__}:astream - Step 7 FAILED: LLM streaming - {type(e).__name__}: {e}")
             raise
@@ -380,9 +571,7 @@ relevance_score: {result.similarity_score:.3f}
             logger.info(f"{__name__}:astream - Step 8: Yielding CITATIONS event")
             yield StreamEvent(
                 event=StreamEventType.CITATIONS,
-                data={
-                    "citations": [citation.model_dump() for citation in citations]
-                },
+                data={"citations": citations},
             )
             logger.info(f"{__name__}:astream - Step 8 OK: CITATIONS event yielded")
         except Exception as e:
@@ -401,6 +590,49 @@ relevance_score: {result.similarity_score:.3f}
             logger.error(f"{__name__}:astream - Step 9 FAILED: COMPLETE event - {type(e).__name__}: {e}")
             raise
 
+        if query_vector is not None:
+            self._stream_cache.put(session_id, query_vector, (context_data, tokens, citations))
+
         logger.info(f"{__name__}:astream - END session_id={session_id}")
 
 
+def _content_text(content: str | list) -> str:
+    """Text of a streamed chunk's content: a str, or a list of str and content-block dicts."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        item if isinstance(item, str) else item.get("text", "") if isinstance(item, dict) else str(item)
+        for item in content
+    )
+
+
+def _format_history(chat_history: list[BaseMessage] | None) -> str:
+    """Render chat history for the prompt's {chat_history} slot ("" when there is none)."""
+    if not chat_history:
+        return ""
+    lines = "\n".join(
+        f"{'User' if msg.type == 'human' else 'Assistant'}: {msg.content}" for msg in chat_history
+    )
+    return f"Previous Conversation:\n{lines}\n"
+
+
+def _replay_stream(context_data: dict, tokens: list[str], citations_data: list[dict]) -> list[StreamEvent]:
+    """Build the astream event sequence for an answer that is already known."""
+    return [
+        StreamEvent(event=StreamEventType.CONTEXT, data=context_data),
+        *(
+            StreamEvent(event=StreamEventType.TOKEN, data={"token": token, "index": index})
+            for index, token in enumerate(tokens)
+        ),
+        StreamEvent(event=StreamEventType.CITATIONS, data={"citations": citations_data}),
+        StreamEvent(event=StreamEventType.COMPLETE, data={"full_answer": "".join(tokens)}),
+    ]
+
+
+def _sum_usage(messages: list[BaseMessage]) -> UsageMetadata | None:
+    """Total token usage over the model calls in an agent run."""
+    usage = None
+    for message in messages:
+        if isinstance(message, AIMessage) and message.usage_metadata:
+            usage = add_usage(usage, message.usage_metadata)
+    return usage
@@ -1,13 +1,13 @@
 """Document expansion via recursive RAG queries.
 
-Expands a single AI answer into ~25 related documents through parallel vector
-store queries. Non-agentic approach (retrieval only, no LLM reasoning).
+Expands a single AI answer into ~25 related documents through one batched
+round of vector store queries. Non-agentic approach (retrieval only, no LLM
+reasoning).
 
-Dependencies: asyncio, fastapi.concurrency, vector_store, logging
+Dependencies: fastapi.concurrency, vector_store, logging
 System role: Document retrieval and expansion for visual knowledge pipeline
 """
 
-import asyncio
 import logging
 from typing import TYPE_CHECKING
 
@@ -30,6 +30,7 @@ async def expand_documents(
     Process:
     1. Retrieve 5 relevant documents from original ai_answer
     2. For each doc, run RAG query with first 200 chars → 5 more docs
+       (all expansion queries go to the store as one batch)
     3. Flatten all docs, deduplicate by source_uri, cap at 25
 
     Args:
@@ -59,19 +60,15 @@ async def expand_documents(
         )
         logger.debug(f"{__name__}:expand_documents - Got {len(initial_docs)} initial docs")
 
-        # Step 2: Parallel expansion (query each doc's content)
-        logger.debug(f"{__name__}:expand_documents - Expanding {len(initial_docs)} docs in parallel")
-        expansion_tasks = [
-            run_in_threadpool(
-                vector_store.similarity_search,
-                query=doc.content[:200],  # Use first 200 chars as query
-                k=5,
-                session_id=session_id,
-            )
-            for doc in initial_docs
-        ]
-
-        expanded_docs_sets = await asyncio.gather(*expansion_tasks)
+        # Step 2: Batched expansion (query each doc's content); the store
+        # embeds all queries in one call and searches them concurrently
+        logger.debug(f"{__name__}:expand_documents - Expanding {len(initial_docs)} docs in one batch")
+        expanded_docs_sets = await run_in_threadpool(
+            vector_store.similarity_search_batch,
+            queries=[doc.content[:200] for doc in initial_docs],  # Use first 200 chars as query
+            k=5,
+            session_id=session_id,
+        )
         logger.debug(
             f"{__name__}:expand_documents - Parallel expansion complete: "
             f"{sum(len(docs) for docs in expanded_docs_sets)} docs retrieved"
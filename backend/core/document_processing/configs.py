@@ -46,6 +46,16 @@ class DocumentPipelineSettings(BaseSettings):
         description="Overlap between consecutive chunks",
     )
 
+    # Contextual retrieval settings
+    contextual_retrieval: bool = Field(
+        default=False,
+        description="Embed each chunk with a model-written context prefix (one LLM call per chunk)",
+    )
+    contextual_model_id: str = Field(
+        default="gemini-2.5-flash-lite",
+        description="Gemini model writing chunk contexts",
+    )
+
     # S3 Vectors settings
     vectors_bucket: str = Field(
         default="student-helper-dev-vectors",
@@ -0,0 +1,236 @@
+"""
+Persistent embedding cache shared across processes and restarts.
+
+Embeddings are keyed by a SHA-256 of (model, dimension, task type, text)
+and stored as fp16 blobs in a SQLite database, so re-ingesting the same
+chunks after a container restart, or from another worker process, does
+not call the embedding API again. The database is capped in size; the
+oldest entries are evicted first. Optionally vectors are stored as int8
+with a per-vector scale instead (half the size again, small recall loss).
+The database lives under /tmp by default (the only writable path in
+Lambda); if it cannot be opened, embedding runs uncached.
+
+Dependencies: sqlite3, numpy
+System role: Embedding API call avoidance for FixedDimensionEmbeddings (ingestion and retrieval)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Writable in Lambda and the API container (EMBEDDING_CACHE_PATH overrides)
+DEFAULT_CACHE_PATH = Path("/tmp/.embedding_cache/embed.sqlite")
+
+# SQLite caps bound parameters per statement; stay well below it
+MAX_KEYS_PER_QUERY = 500
+
+# Default cap on live database bytes (EMBEDDING_CACHE_MAX_BYTES overrides)
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Fraction of entries evicted, oldest first, once the cap is exceeded
+EVICTION_FRACTION = 0.10
+
+
+class SQLiteEmbeddingCache:
+    """
+    Content-addressed embedding cache backed by SQLite in WAL mode.
+
+    WAL allows many concurrent readers alongside a single writer, so the
+    cache can be shared by several worker processes. Each thread uses its
+    own connection.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        quantize: bool = False,
+    ) -> None:
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file
+            max_bytes: Live database size above which the oldest entries are evicted
+            quantize: Store new vectors as int8 with a per-vector scale instead of fp16
+        """
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._quantize = quantize
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS emb "
+                "(k BLOB PRIMARY KEY, v BLOB NOT NULL, t INTEGER NOT NULL DEFAULT 0, s REAL) WITHOUT ROWID"
+            )
+            # Older databases lack the insert-time (eviction) and scale (int8) columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(emb)")}
+            if "t" not in columns:
+                conn.execute("ALTER TABLE emb ADD COLUMN t INTEGER NOT NULL DEFAULT 0")
+            if "s" not in columns:
+                conn.execute("ALTER TABLE emb ADD COLUMN s REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS emb_t ON emb (t)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(model: str, dimension: int, task_type: str | None, text: str) -> bytes:
+        """Cache key for one text embedded with the given settings."""
+        return hashlib.sha256(f"{model}\0{dimension}\0{task_type or ''}\0{text}".encode()).digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, list[float]]:
+        """Return cached vectors for the keys that are present."""
+        found: dict[bytes, list[float]] = {}
+        conn = self._connection()
+        for start in range(0, len(keys), MAX_KEYS_PER_QUERY):
+            chunk = keys[start : start + MAX_KEYS_PER_QUERY]
+            placeholders = ",".join("?" * len(chunk))
+            for key, blob, scale in conn.execute(f"SELECT k, v, s FROM emb WHERE k IN ({placeholders})", chunk):
+                found[key] = _decode(blob, scale)
+        return found
+
+    def put_many(self, items: dict[bytes, list[float]]) -> None:
+        """Store vectors as fp16 (or int8) blobs, keeping any existing entries."""
+        if not items:
+            return
+        now = int(time.time())
+        encode = _encode_int8 if self._quantize else _encode_fp16
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO emb (k, v, s, t) VALUES (?, ?, ?, ?)",
+                [(key, *encode(vector), now) for key, vector in items.items()],
+            )
+            self._evict_if_full(conn)
+
+    def _evict_if_full(self, conn: sqlite3.Connection) -> None:
+        """Delete the oldest EVICTION_FRACTION of entries once live pages exceed max_bytes."""
+        page_count, free_pages, page_size = (
+            conn.execute(f"PRAGMA {pragma}").fetchone()[0] for pragma in ("page_count", "freelist_count", "page_size")
+        )
+        if (page_count - free_pages) * page_size <= self._max_bytes:
+            return
+        (entries,) = conn.execute("SELECT COUNT(*) FROM emb").fetchone()
+        evict = max(1, int(entries * EVICTION_FRACTION))
+        conn.execute("DELETE FROM emb WHERE k IN (SELECT k FROM emb ORDER BY t LIMIT ?)", (evict,))
+        logger.info("%s:_evict_if_full - Evicted %d of %d entries", __name__, evict, entries)
+
+    def get_or_embed(
+        self,
+        keys: list[bytes],
+        texts: list[str],
+        embed: Callable[[list[str]], list[list[float]]],
+    ) -> list[list[float]]:
+        """
+        Return vectors for texts, embedding only the cache misses.
+
+        Args:
+            keys: Cache keys aligned with texts
+            texts: Texts to embed
+            embed: Function embedding a list of texts (called once, with each missing text once)
+
+        Returns:
+            list[list[float]]: Vectors aligned with texts
+        """
+        cached = self.get_many(keys)
+        misses = _unique_misses(keys, cached)
+        if misses:
+            text_by_key = dict(zip(keys, texts))
+            fresh = dict(zip(misses, embed([text_by_key[key] for key in misses])))
+            self.put_many(fresh)
+            cached.update(fresh)
+        logger.debug(
+            "%s:get_or_embed - %d texts, %d embedded", __name__, len(keys), len(misses)
+        )
+        return [cached[key] for key in keys]
+
+    async def aget_or_embed(
+        self,
+        keys: list[bytes],
+        texts: list[str],
+        embed: Callable[[list[str]], Awaitable[list[list[float]]]],
+    ) -> list[list[float]]:
+        """
+        Async get_or_embed; SQLite reads and writes run in a worker thread.
+
+        Args:
+            keys: Cache keys aligned with texts
+            texts: Texts to embed
+            embed: Coroutine function embedding a list of texts (awaited once, with each missing text once)
+
+        Returns:
+            list[list[float]]: Vectors aligned with texts
+        """
+        cached = await asyncio.to_thread(self.get_many, keys)
+        misses = _unique_misses(keys, cached)
+        if misses:
+            text_by_key = dict(zip(keys, texts))
+            fresh = dict(zip(misses, await embed([text_by_key[key] for key in misses])))
+            await asyncio.to_thread(self.put_many, fresh)
+            cached.update(fresh)
+        return [cached[key] for key in keys]
+
+
+def _encode_fp16(vector: list[float]) -> tuple[bytes, None]:
+    """fp16 blob; a NULL scale marks the row as fp16."""
+    return np.asarray(vector, dtype=np.float16).tobytes(), None
+
+
+def _encode_int8(vector: list[float]) -> tuple[bytes, float]:
+    """Symmetric int8 blob and the scale that maps it back to float32."""
+    values = np.asarray(vector, dtype=np.float32)
+    scale = float(np.abs(values).max()) / 127 or 1.0
+    return np.round(values / scale).astype(np.int8).tobytes(), scale
+
+
+def _decode(blob: bytes, scale: float | None) -> list[float]:
+    """Decode an fp16 row (scale is NULL) or an int8 row to float32 values."""
+    if scale is None:
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32).tolist()
+    return (np.frombuffer(blob, dtype=np.int8).astype(np.float32) * scale).tolist()
+
+
+def _unique_misses(keys: list[bytes], cached: dict[bytes, list[float]]) -> list[bytes]:
+    """Keys absent from cached, deduplicated in first-seen order."""
+    return list(dict.fromkeys(key for key in keys if key not in cached))
+
+
+@lru_cache
+def get_embedding_cache() -> SQLiteEmbeddingCache | None:
+    """
+    Process-wide cache instance, or None if the database cannot be opened.
+
+    EMBEDDING_CACHE_PATH and EMBEDDING_CACHE_MAX_BYTES override the defaults;
+    EMBEDDING_CACHE_QUANTIZE=1 stores new vectors as int8.
+    """
+    path = Path(os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH))
+    try:
+        return SQLiteEmbeddingCache(
+            path,
+            max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            quantize=os.getenv("EMBEDDING_CACHE_QUANTIZE") == "1",
+        )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(
+            "%s:get_embedding_cache - Cache unavailable at %s (%s: %s), embedding uncached",
+            __name__, path, type(e).__name__, e,
+        )
+        return None
@@ -3,20 +3,61 @@ Google Generative AI Embeddings wrapper with fixed output dimensionality.
 
 Wraps GoogleGenerativeAIEmbeddings to ensure consistent vector dimensions
 across all embedding calls. This is required because the base class ignores
-output_dimensionality in the constructor.
+output_dimensionality in the constructor. Optionally reads and writes a
+persistent SQLiteEmbeddingCache so unchanged texts are not re-embedded.
+The async methods use the SDK's async client with the same dimension and
+cache, so async callers do not tie up a worker thread per request.
+get_fixed_dimension_embeddings() shares one instance (and its API client)
+per model/dimension across vector store instances. This module ships in
+the document processing Lambda image; backend.boundary.vdb re-exports it
+for the vector stores.
 
-Dependencies: langchain_google_genai
+Dependencies: langchain_google_genai, tenacity, python-dotenv, backend.core.document_processing.embedding_cache
 System role: Embedding dimension consistency for S3 Vectors compatibility
 """
 
+import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List
 
+from dotenv import load_dotenv
+from google.genai.errors import ClientError
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from .embedding_cache import SQLiteEmbeddingCache, get_embedding_cache
 
-logger = logging.getLogger(__name__)
-from dotenv import load_dotenv
 load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Concurrent embedding requests per embed_documents call
+EMBED_WORKERS = 4
+
+# Gemini batchEmbedContents accepts at most 100 texts per request
+MAX_API_BATCH_SIZE = 100
+
+
+def _is_rate_limited(error: BaseException) -> bool:
+    """True when the Gemini API rejected a request with HTTP 429."""
+    cause = error.__cause__ if error.__cause__ is not None else error
+    return isinstance(cause, ClientError) and cause.code == 429
+
+
+# Backs off a single rate-limited API batch (sync or async); full jitter
+# keeps concurrent batches from retrying in lockstep
+_retry_rate_limited = retry(
+    retry=retry_if_exception(_is_rate_limited),
+    stop=stop_after_attempt(5),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    before_sleep=lambda retry_state: logger.warning(
+        "%s:%s - Rate limited, retry %d/5", __name__, retry_state.fn.__name__, retry_state.attempt_number
+    ),
+    reraise=True,
+)
+
 
 class FixedDimensionEmbeddings(GoogleGenerativeAIEmbeddings):
     """
@@ -28,11 +69,13 @@ class FixedDimensionEmbeddings(GoogleGenerativeAIEmbeddings):
     """
 
     _output_dimensionality: int = 1024
+    _cache: SQLiteEmbeddingCache | None = None
 
     def __init__(
         self,
         model: str = "models/gemini-embedding-001",
         output_dimensionality: int = 1024,
+        cache: SQLiteEmbeddingCache | None = None,
         **kwargs,
     ) -> None:
         """
@@ -41,6 +84,7 @@ class FixedDimensionEmbeddings(GoogleGenerativeAIEmbeddings):
         Args:
             model: Google embedding model ID (default: gemini-embedding-001 for 1024-dim support)
             output_dimensionality: Fixed dimension for all embeddings (default: 1024)
+            cache: Optional persistent embedding cache
             **kwargs: Additional arguments for GoogleGenerativeAIEmbeddings
 
         Note:
@@ -49,9 +93,10 @@ class FixedDimensionEmbeddings(GoogleGenerativeAIEmbeddings):
         """
         super().__init__(model=model, **kwargs)
         self._output_dimensionality = output_dimensionality
+        self._cache = cache
         logger.info(
-            f"{__name__}:__init__ - Initialized with model={model}, "
-            f"output_dimensionality={output_dimensionality}"
+            "%s:__init__ - Initialized with model=%s, output_dimensionality=%d",
+            __name__, model, output_dimensionality,
         )
 
     def embed_documents(
@@ -80,6 +125,66 @@ class FixedDimensionEmbeddings(GoogleGenerativeAIEmbeddings):
             List of embedding vectors
         """
         dim = output_dimensionality or self._output_dimensionality
+
+        def embed(batch: List[str]) -> List[List[float]]:
+            return self._embed_batches_concurrently(batch, titles, batch_size, task_type, dim)
+
+        # Titles change the embedding, so titled calls bypass the cache
+        if self._cache is None or titles:
+            return embed(texts)
+        effective_task_type = task_type or self.task_type or "RETRIEVAL_DOCUMENT"
+        keys = [self._cache.key(self.model, dim, effective_task_type, text) for text in texts]
+        return self._cache.get_or_embed(keys, texts, embed)
+
+    def _embed_batches_concurrently(
+        self,
+        texts: List[str],
+        titles: List[str] | None,
+        batch_size: int,
+        task_type: str | None,
+        dim: int,
+    ) -> List[List[float]]:
+        """
+        Split texts into API-sized batches and embed up to EMBED_WORKERS at once.
+
+        The parent class sends its batches one after another; independent
+        HTTP requests are issued in parallel here instead. batch_size is
+        capped at MAX_API_BATCH_SIZE so oversized requests are never sent.
+        """
+        batch_size = min(batch_size, MAX_API_BATCH_SIZE)
+        starts = range(0, len(texts), batch_size)
+        started = time.perf_counter()
+
+        def embed_batch(start: int) -> List[List[float]]:
+            return self._embed_batch(
+                texts[start : start + batch_size],
+                titles[start : start + batch_size] if titles else None,
+                batch_size,
+                task_type,
+                dim,
+            )
+
+        if len(starts) <= 1:
+            vectors = embed_batch(0)
+        else:
+            with ThreadPoolExecutor(max_workers=min(EMBED_WORKERS, len(starts))) as pool:
+                vectors = [vector for batch in pool.map(embed_batch, starts) for vector in batch]
+        logger.debug(
+            "%s:_embed_batches_concurrently - Embedded %d texts in %d batches, %.1f ms",
+            __name__, len(texts), len(starts), (time.perf_counter() - started) * 1000,
+        )
+        return vectors
+
+    @_retry_rate_limited
+    def _embed_batch(
+        self,
+        texts: List[str],
+        titles: List[str] | None,
+        batch_size: int,
+        task_type: str | None,
+        dim: int,
+    ) -> List[List[float]]:
+        """Embed one API batch, backing off on 429 independently of other batches."""
         return super().embed_documents(
             texts,
             batch_size=batch_size,
@@ -111,9 +216,160 @@ class FixedDimensionEmbeddings(GoogleGenerativeAIEmbeddings):
             Embedding vector
         """
         dim = output_dimensionality or self._output_dimensionality
-        return super().embed_query(
-            text,
+
+        def embed(batch: List[str]) -> List[List[float]]:
+            return [
+                super(FixedDimensionEmbeddings, self).embed_query(
+                    batch[0],
+                    task_type=task_type,
+                    title=title,
+                    output_dimensionality=dim,
+                )
+            ]
+
+        if self._cache is None or title:
+            return embed([text])[0]
+        key = self._cache.key(self.model, dim, task_type or self.task_type or "RETRIEVAL_QUERY", text)
+        return self._cache.get_or_embed([key], [text], embed)[0]
+
+    async def aembed_documents(
+        self,
+        texts: List[str],
+        *,
+        batch_size: int = 100,
+        task_type: str | None = None,
+        titles: List[str] | None = None,
+        output_dimensionality: int | None = None,
+    ) -> List[List[float]]:
+        """
+        Async embed_documents with the same fixed dimension and cache.
+
+        Uses the SDK's native async client; API batches are awaited
+        concurrently, up to EMBED_WORKERS at a time.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Batch size for API calls
+            task_type: Optional task type for embedding
+            titles: Optional titles for documents
+            output_dimensionality: Override dimension (uses configured if None)
+
+        Returns:
+            List of embedding vectors
+        """
+        dim = output_dimensionality or self._output_dimensionality
+
+        async def embed(batch: List[str]) -> List[List[float]]:
+            return await self._aembed_batches_concurrently(batch, titles, batch_size, task_type, dim)
+
+        if self._cache is None or titles:
+            return await embed(texts)
+        effective_task_type = task_type or self.task_type or "RETRIEVAL_DOCUMENT"
+        keys = [self._cache.key(self.model, dim, effective_task_type, text) for text in texts]
+        return await self._cache.aget_or_embed(keys, texts, embed)
+
+    async def _aembed_batches_concurrently(
+        self,
+        texts: List[str],
+        titles: List[str] | None,
+        batch_size: int,
+        task_type: str | None,
+        dim: int,
+    ) -> List[List[float]]:
+        """Async counterpart of _embed_batches_concurrently."""
+        batch_size = min(batch_size, MAX_API_BATCH_SIZE)
+        semaphore = asyncio.Semaphore(EMBED_WORKERS)
+        started = time.perf_counter()
+
+        async def embed_batch(start: int) -> List[List[float]]:
+            async with semaphore:
+                return await self._aembed_batch(
+                    texts[start : start + batch_size],
+                    titles[start : start + batch_size] if titles else None,
+                    batch_size,
+                    task_type,
+                    dim,
+                )
+
+        batches = await asyncio.gather(*(embed_batch(start) for start in range(0, len(texts), batch_size)))
+        logger.debug(
+            "%s:_aembed_batches_concurrently - Embedded %d texts in %d batches, %.1f ms",
+            __name__, len(texts), len(batches), (time.perf_counter() - started) * 1000,
+        )
+        return [vector for batch in batches for vector in batch]
+
+    @_retry_rate_limited
+    async def _aembed_batch(
+        self,
+        texts: List[str],
+        titles: List[str] | None,
+        batch_size: int,
+        task_type: str | None,
+        dim: int,
+    ) -> List[List[float]]:
+        """Async counterpart of _embed_batch."""
+        return await super().aembed_documents(
+            texts,
+            batch_size=batch_size,
             task_type=task_type,
-            title=title,
+            titles=titles,
             output_dimensionality=dim,
         )
+
+    async def aembed_query(
+        self,
+        text: str,
+        task_type: str | None = None,
+        title: str | None = None,
+        output_dimensionality: int | None = None,
+    ) -> List[float]:
+        """
+        Async embed_query with the same fixed dimension and cache.
+
+        Args:
+            text: Query text to embed
+            task_type: Optional task type for embedding
+            title: Optional title
+            output_dimensionality: Override dimension (uses configured if None)
+
+        Returns:
+            Embedding vector
+        """
+        dim = output_dimensionality or self._output_dimensionality
+
+        async def embed(batch: List[str]) -> List[List[float]]:
+            return [
+                await super(FixedDimensionEmbeddings, self).aembed_query(
+                    batch[0],
+                    task_type=task_type,
+                    title=title,
+                    output_dimensionality=dim,
+                )
+            ]
+
+        if self._cache is None or title:
+            return (await embed([text]))[0]
+        key = self._cache.key(self.model, dim, task_type or self.task_type or "RETRIEVAL_QUERY", text)
+        return (await self._cache.aget_or_embed([key], [text], embed))[0]
+
+
+@lru_cache(maxsize=8)
+def get_fixed_dimension_embeddings(model: str, output_dimensionality: int) -> FixedDimensionEmbeddings:
+    """
+    Shared cached-embeddings instance per model and dimension.
+
+    Building the wrapper creates a new Gemini API client (credential and
+    endpoint setup), so stores created repeatedly reuse this one.
+
+    Args:
+        model: Google embedding model ID
+        output_dimensionality: Fixed dimension for all embeddings
+
+    Returns:
+        FixedDimensionEmbeddings: Instance backed by the shared embedding cache
+    """
+    return FixedDimensionEmbeddings(
+        model=model,
+        output_dimensionality=output_dimensionality,
+        cache=get_embedding_cache(),
+    )
@@ -1,7 +1,8 @@
 """
 Document pipeline orchestrator.
 
-Coordinates S3 download, parsing, chunking, and S3 Vectors upload tasks.
+Coordinates S3 download, parsing, chunking, optional contextualization,
+and S3 Vectors upload tasks.
 VectorStoreTask handles embedding generation via Bedrock internally.
 
 Dependencies: All task modules, configs
@@ -20,6 +21,7 @@ from .configs import (
 from .models import PipelineResult
 from .tasks import (
     ChunkingTask,
+    ContextualizationTask,
     ParsingTask,
     S3DownloadTask,
     VectorStoreTask,
@@ -27,7 +29,7 @@ from .tasks import (
 
 
 class DocumentPipeline:
-    """Orchestrate document ingestion: S3 download -> parse -> chunk -> embed+upload."""
+    """Orchestrate document ingestion: S3 download -> parse -> chunk -> (contextualize) -> embed+upload."""
 
     def __init__(self, settings: DocumentPipelineSettings | None = None) -> None:
         """
@@ -47,6 +49,9 @@ class DocumentPipeline:
             chunk_size=self._settings.chunk_size,
             chunk_overlap=self._settings.chunk_overlap,
         )
+        self._contextualization_task = None
+        if self._settings.contextual_retrieval:
+            self._contextualization_task = ContextualizationTask(model_id=self._settings.contextual_model_id)
         self._vector_store_task = VectorStoreTask(
             vectors_bucket=self._settings.vectors_bucket,
             index_name=self._settings.vectors_index,
@@ -107,8 +112,13 @@ class DocumentPipeline:
             # Chunk documents
             chunked_documents = self._chunking_task.chunk(documents)
 
+            # Situate each chunk in its document for embedding (original text is stored)
+            embed_texts = None
+            if self._contextualization_task is not None:
+                embed_texts = self._contextualization_task.contextualize(documents, chunked_documents)
+
             # Upload to S3 Vectors (embedding generated internally)
-            chunk_ids = self._vector_store_task.upload(chunked_documents, doc_id, sess_id)
+            chunk_ids = self._vector_store_task.upload(chunked_documents, doc_id, sess_id, embed_texts)
             output_path = f"s3vectors://{self._settings.vectors_bucket}/{self._settings.vectors_index}/{doc_id}"
 
             elapsed_ms = (time.perf_counter() - start_time) * 1000
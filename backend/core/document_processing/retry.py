@@ -0,0 +1,76 @@
+"""
+Retry policy for S3 Vectors calls.
+
+Shared by the query-side store and the ingestion upload task so both
+retry the same errors: throttling, 5xx responses and network failures
+where the request may not have reached the service. Backoff uses full
+jitter so throttled clients spread their retries instead of retrying in
+waves. botocore's own retries are disabled on these clients. This module
+ships in the document processing Lambda image; backend.boundary.vdb.retry
+re-exports it for the retrieval store.
+
+Dependencies: botocore, tenacity
+System role: Transient-error retry decorators for S3 Vectors requests
+"""
+
+import logging
+
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+from tenacity import RetryCallState, retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+logger = logging.getLogger(__name__)
+
+# Error codes S3 Vectors returns when a request should be retried after backoff
+THROTTLING_ERROR_CODES = frozenset({"ThrottlingException", "SlowDown", "TooManyRequestsException"})
+
+# Server-side failures worth retrying; 4xx other than throttling are permanent
+RETRYABLE_HTTP_STATUSES = frozenset({500, 502, 503, 504})
+
+# Network failures where the request may not have reached the service
+TRANSIENT_NETWORK_ERRORS = (ReadTimeoutError, ConnectTimeoutError, EndpointConnectionError, ConnectionClosedError)
+
+MAX_ATTEMPTS = 5
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for throttling, 5xx responses and transient network errors."""
+    if isinstance(error, TRANSIENT_NETWORK_ERRORS):
+        return True
+    if isinstance(error, ClientError):
+        return (
+            error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+            or error.response.get("ResponseMetadata", {}).get("HTTPStatusCode") in RETRYABLE_HTTP_STATUSES
+        )
+    return False
+
+
+def _log_retry(retry_state: RetryCallState) -> None:
+    logger.warning(
+        "%s:%s - Retry %d/%d after throttling",
+        retry_state.fn.__module__, retry_state.fn.__name__, retry_state.attempt_number, MAX_ATTEMPTS,
+    )
+
+
+# Queries, lists and batched writes: back off for up to 30s per attempt
+retry_throttling = retry(
+    retry=retry_if_exception(is_retryable),
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
+# Deletes are short writes; back off briefly rather than stalling a large delete
+retry_delete_throttling = retry(
+    retry=retry_if_exception(is_retryable),
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    wait=wait_random_exponential(multiplier=0.1, max=5),
+    before_sleep=_log_retry,
+    reraise=True,
+)
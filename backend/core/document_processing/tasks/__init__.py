@@ -1,10 +1,11 @@
 """
 Task modules for document processing pipeline.
 
-Exports: S3DownloadTask, ParsingTask, ChunkingTask, VectorStoreTask
+Exports: S3DownloadTask, ParsingTask, ChunkingTask, ContextualizationTask, VectorStoreTask
 """
 
 from .chunking_task import ChunkingTask
+from .contextualization_task import ContextualizationTask
 from .parsing_task import ParsingError, ParsingTask
 from .s3_download_task import S3DownloadError, S3DownloadTask
 from .vector_store_task import VectorStoreTask, VectorStoreUploadError
@@ -15,6 +16,7 @@ __all__ = [
     "ParsingTask",
     "ParsingError",
     "ChunkingTask",
+    "ContextualizationTask",
     "VectorStoreTask",
     "VectorStoreUploadError",
 ]
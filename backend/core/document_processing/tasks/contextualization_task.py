@@ -0,0 +1,87 @@
+"""
+Contextual retrieval task.
+
+Asks a small Gemini model for a one- or two-sentence context situating each
+chunk within its whole document, and returns the text to embed for each
+chunk: that context followed by the chunk. The stored chunk text is left
+unchanged, so retrieval results and citations still show the original.
+The document comes first in every prompt, so Gemini's implicit prefix
+cache serves it after the first chunk.
+
+Dependencies: langchain_google_genai, langchain_core
+System role: Optional stage between chunking and embedding in document ingestion
+"""
+
+import logging
+
+from langchain_core.documents import Document
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+logger = logging.getLogger(__name__)
+
+# Documents longer than this are truncated in the prompt (~100k tokens)
+MAX_DOCUMENT_CHARS = 400_000
+
+CONTEXT_PROMPT = """<document>
+{document}
+</document>
+Here is the chunk we want to situate within the whole document
+<chunk>
+{chunk}
+</chunk>
+Please give a short succinct context to situate this chunk within the overall document for the purposes of improving search retrieval of the chunk. Answer only with the succinct context and nothing else."""
+
+
+class ContextualizationTask:
+    """Prefix chunks with model-written document context before embedding."""
+
+    def __init__(
+        self,
+        model_id: str = "gemini-2.5-flash-lite",
+        max_concurrency: int = 8,
+    ) -> None:
+        """
+        Initialize contextualization task.
+
+        Args:
+            model_id: Gemini model writing the chunk contexts
+            max_concurrency: Context requests in flight at once
+        """
+        self._model = ChatGoogleGenerativeAI(model=model_id, temperature=0.0)
+        self._max_concurrency = max_concurrency
+
+    def contextualize(self, documents: list[Document], chunks: list[Document]) -> list[str]:
+        """
+        Build the text to embed for each chunk.
+
+        Chunks whose context request fails are embedded as plain chunk text.
+
+        Args:
+            documents: Parsed document pages the chunks were split from
+            chunks: Chunked documents
+
+        Returns:
+            list[str]: "context\\n\\nchunk" per chunk, aligned with chunks
+        """
+        document = "\n\n".join(doc.page_content for doc in documents)[:MAX_DOCUMENT_CHARS]
+        prompts = [CONTEXT_PROMPT.format(document=document, chunk=chunk.page_content) for chunk in chunks]
+        responses = self._model.batch(
+            prompts,
+            config={"max_concurrency": self._max_concurrency},
+            return_exceptions=True,
+        )
+
+        texts = []
+        failed = 0
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                failed += 1
+                texts.append(chunk.page_content)
+                continue
+            context = response.text.strip()
+            texts.append(f"{context}\n\n{chunk.page_content}" if context else chunk.page_content)
+
+        if failed:
+            logger.warning("%s:contextualize - %d of %d context requests failed", __name__, failed, len(chunks))
+        logger.info("%s:contextualize - Contextualized %d chunks", __name__, len(chunks) - failed)
+        return texts
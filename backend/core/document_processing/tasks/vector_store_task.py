@@ -4,21 +4,75 @@ S3 Vectors upload task.
 Uploads document chunks to Amazon S3 Vectors with metadata for similarity search.
 Uses langchain-aws AmazonS3Vectors for LangChain integration.
 Uses Google Gemini embeddings (1024-dimensional) for vector generation.
+Chunks are written and deleted in 500-key batches (the PutVectors and
+DeleteVectors limit) on a shared pool, each batch retried on throttling. All tasks share one
+keep-alive boto3 client per region. Chunks can be embedded from different
+text than is stored (contextual retrieval prefixes).
 
-Dependencies: langchain_aws, langchain_core, backend.boundary.vdb.embeddings_wrapper
+Dependencies: langchain_aws, langchain_core, backend.core.document_processing.embeddings_wrapper, backend.core.document_processing.embedding_cache, backend.core.document_processing.retry
 System role: Final stage of document ingestion pipeline
 """
 
 import hashlib
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+import boto3
+from botocore.config import Config
 from langchain_aws.vectorstores import AmazonS3Vectors
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 
+from ..embedding_cache import get_embedding_cache
 from ..embeddings_wrapper import FixedDimensionEmbeddings
+from ..retry import retry_throttling
 
 logger = logging.getLogger(__name__)
 
+# PutVectors and DeleteVectors accept at most 500 keys per request
+WRITE_BATCH_SIZE = 500
+
+# Shared by all tasks, so WRITE_WORKERS also caps writes in flight per process
+WRITE_WORKERS = 8
+_WRITE_EXECUTOR = ThreadPoolExecutor(max_workers=WRITE_WORKERS, thread_name_prefix="s3vectors-write")
+
+# Pool covers every write worker (AWS_MAX_POOL overrides). botocore does not
+# retry (retry_throttling backs off per batch), but adaptive mode keeps
+# its client-side token bucket: once a write is throttled, every worker sharing
+# the client is slowed to the rate S3 Vectors accepts instead of retrying into it
+S3_VECTORS_UPLOAD_CLIENT_CONFIG = Config(
+    max_pool_connections=int(os.getenv("AWS_MAX_POOL", 64)),
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": 0},
+)
+
+
+@lru_cache(maxsize=8)
+def _get_s3vectors_client(region: str):
+    """
+    Return the process-wide s3vectors client for a region.
+
+    Creating a client resolves credentials and the endpoint and opens a
+    new connection pool, so tasks built per document share this one.
+    """
+    return boto3.client("s3vectors", region_name=region, config=S3_VECTORS_UPLOAD_CLIENT_CONFIG)
+
+
+class _MappedEmbeddings(Embeddings):
+    """Embeds a substitute text for each mapped document text (queries unchanged)."""
+
+    def __init__(self, embeddings: Embeddings, embed_text_by_text: dict[str, str]) -> None:
+        self._embeddings = embeddings
+        self._embed_text_by_text = embed_text_by_text
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embeddings.embed_documents([self._embed_text_by_text.get(text, text) for text in texts])
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embeddings.embed_query(text)
+
 
 class VectorStoreUploadError(Exception):
     """Raised when vector store upload fails."""
@@ -67,6 +121,7 @@ class VectorStoreTask:
         self._embeddings = FixedDimensionEmbeddings(
             model=embedding_model_id,
             output_dimensionality=embedding_dimension,
+            cache=get_embedding_cache(),
         )
         self._vector_store: AmazonS3Vectors | None = None
 
@@ -82,7 +137,7 @@ class VectorStoreTask:
                 vector_bucket_name=self.vectors_bucket,
                 index_name=self.index_name,
                 embedding=self._embeddings,
-                region_name=self.region,
+                client=_get_s3vectors_client(self.region),
             )
         return self._vector_store
 
@@ -139,6 +194,7 @@ class VectorStoreTask:
         documents: list[Document],
         document_id: str,
         session_id: str,
+        embed_texts: list[str] | None = None,
     ) -> list[str]:
         """
         Upload documents to S3 Vectors with session isolation.
@@ -150,6 +206,8 @@ class VectorStoreTask:
             documents: LangChain Documents (chunked text)
             document_id: Document UUID for grouping chunks
             session_id: Session UUID for multi-tenant isolation
+            embed_texts: Optional text to embed per document instead of its content
+                (e.g. contextualized chunks); the stored text is still the content
 
         Returns:
             list[str]: List of generated chunk IDs
@@ -177,12 +235,26 @@ class VectorStoreTask:
 
         try:
             vector_store = self._get_vector_store()
-
-            # Add documents - FixedDimensionEmbeddings ensures 1024-dim output
-            ids = vector_store.add_documents(
-                documents=documents,
-                ids=chunk_ids,
-            )
+            texts = [doc.page_content for doc in documents]
+            metadatas = [doc.metadata for doc in documents]
+            if embed_texts is not None:
+                # Same bucket, index and client; only the embedded text differs
+                vector_store = AmazonS3Vectors(
+                    vector_bucket_name=vector_store.vector_bucket_name,
+                    index_name=vector_store.index_name,
+                    embedding=_MappedEmbeddings(vector_store.embeddings, dict(zip(texts, embed_texts))),
+                    client=vector_store.client,
+                )
+
+            def put_batch(start: int) -> list[str]:
+                end = start + WRITE_BATCH_SIZE
+                return self._put_batch(vector_store, texts[start:end], metadatas[start:end], chunk_ids[start:end])
+
+            # The first batch goes alone so add_texts can create a missing
+            # index before parallel batches would race to create it
+            starts = range(0, len(documents), WRITE_BATCH_SIZE)
+            ids = put_batch(0)
+            ids += [chunk_id for batch in _WRITE_EXECUTOR.map(put_batch, starts[1:]) for chunk_id in batch]
 
             logger.info(
                 "Uploaded documents to S3 Vectors",
@@ -215,10 +287,33 @@ class VectorStoreTask:
                 },
             ) from e
 
+    @retry_throttling
+    def _put_batch(
+        self,
+        vector_store: AmazonS3Vectors,
+        texts: list[str],
+        metadatas: list[dict],
+        chunk_ids: list[str],
+    ) -> list[str]:
+        """Embed and write one PutVectors batch; FixedDimensionEmbeddings ensures 1024-dim output."""
+        return vector_store.add_texts(texts, metadatas, ids=chunk_ids, batch_size=WRITE_BATCH_SIZE)
+
+    @retry_throttling
+    def _delete_batch(self, vector_store: AmazonS3Vectors, chunk_ids: list[str]) -> None:
+        """Delete one DeleteVectors batch, backing off on throttling."""
+        vector_store.client.delete_vectors(
+            vectorBucketName=vector_store.vector_bucket_name,
+            indexName=vector_store.index_name,
+            keys=chunk_ids,
+        )
+
     def delete_document(self, document_id: str, chunk_ids: list[str]) -> None:
         """
         Delete all chunks for a document.
 
+        Chunk ids are deleted in WRITE_BATCH_SIZE batches on the shared
+        write pool, each retried on throttling.
+
         Args:
             document_id: Document UUID
             chunk_ids: List of chunk IDs to delete
@@ -231,7 +326,11 @@ class VectorStoreTask:
 
         try:
             vector_store = self._get_vector_store()
-            vector_store.delete(ids=chunk_ids)
+            batches = [
+                chunk_ids[start : start + WRITE_BATCH_SIZE] for start in range(0, len(chunk_ids), WRITE_BATCH_SIZE)
+            ]
+            # list() re-raises the first failed batch
+            list(_WRITE_EXECUTOR.map(lambda batch: self._delete_batch(vector_store, batch), batches))
 
             logger.info(
                 "Deleted chunks from S3 Vectors",
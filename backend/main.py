@@ -72,6 +72,7 @@ async def lifespan(app: FastAPI):
             model_id="global.anthropic.claude-haiku-4-5-20251001-v1:0",
             region="ap-southeast-2",
             temperature=0.0,
+            retrieval_k=get_settings().vector_store.top_k,
         )
         logger.info("RAG agent initialized")
 
@@ -0,0 +1,28 @@
+"""
+Unit tests for chat stream SSE encoding.
+
+Tests that streamed events are encoded as Server-Sent Events with the
+same JSON payload the endpoint has always sent.
+Dependencies: pytest, backend.api.routers.chat
+System role: Chat streaming endpoint validation
+"""
+
+import json
+
+import pytest
+
+from backend.api.routers.chat import _sse_event
+from backend.models.streaming import StreamEventType
+
+
+class TestSseEvent:
+    """Test suite for _sse_event."""
+
+    @pytest.mark.parametrize("event_type", list(StreamEventType))
+    def test_event_is_encoded_as_sse_frame(self, event_type):
+        """Each event should be one 'event:'/'data:' frame with the same JSON as json.dumps."""
+        data = {"token": "héllo \"world\"\n", "index": 3, "score": 0.5, "page": None}
+
+        frame = _sse_event(event_type, data)
+
+        assert frame == f"event: {event_type.value}\ndata: {json.dumps(data)}\n\n".encode()
@@ -0,0 +1,44 @@
+"""
+Unit tests for SemanticAnswerCache.
+
+Tests similarity-threshold hits, session isolation, TTL expiry and
+per-session eviction.
+Dependencies: pytest, numpy, backend.core.agentic_system.agent.answer_cache
+System role: Answer cache validation
+"""
+
+import numpy as np
+
+from backend.core.agentic_system.agent.answer_cache import SemanticAnswerCache
+
+
+class TestSemanticAnswerCache:
+    """Test suite for SemanticAnswerCache."""
+
+    def test_similar_question_in_same_session_hits(self):
+        """A question within the similarity threshold should return the cached answer."""
+        cache = SemanticAnswerCache(similarity_threshold=0.95)
+        cache.put("s1", np.array([1.0, 0.0]), "answer")
+
+        assert cache.get("s1", np.array([2.0, 0.1])) == "answer"
+        assert cache.get("s1", np.array([1.0, 1.0])) is None
+        assert cache.get("s2", np.array([1.0, 0.0])) is None
+
+    def test_expired_answers_are_not_served(self):
+        """Answers older than the TTL should miss."""
+        cache = SemanticAnswerCache(ttl_s=0.0)
+        cache.put("s1", np.array([1.0, 0.0]), "answer")
+
+        assert cache.get("s1", np.array([1.0, 0.0])) is None
+
+    def test_oldest_answers_and_sessions_are_evicted(self):
+        """Per-session and session caps should drop the oldest entries first."""
+        cache = SemanticAnswerCache(max_sessions=2, max_entries_per_session=2)
+        for i, vector in enumerate(np.eye(3)):
+            cache.put("s1", vector, i)
+        cache.put("s2", np.eye(3)[0], "s2")
+        cache.put("s3", np.eye(3)[0], "s3")
+
+        assert cache.get("s1", np.eye(3)[0]) is None
+        assert cache.get("s2", np.eye(3)[0]) == "s2"
+        assert cache.get("s3", np.eye(3)[0]) == "s3"
@@ -0,0 +1,77 @@
+"""
+Unit tests for ArrowChunkStore.
+
+Tests segment persistence, extra metadata, tombstoned deletes and compaction.
+Dependencies: pytest, pyarrow, backend.boundary.vdb.arrow_chunk_store
+System role: Local chunk store validation
+"""
+
+from backend.boundary.vdb.arrow_chunk_store import ArrowChunkStore
+
+
+def _add(store: ArrowChunkStore, faiss_ids: list[int]) -> None:
+    store.add_chunks(
+        faiss_ids,
+        [f"c{i}" for i in faiss_ids],
+        [f"chunk {i}" for i in faiss_ids],
+        [{"session_id": "s1", "doc_id": "d1", "chunk_id": f"c{i}", "page": i} for i in faiss_ids],
+    )
+
+
+class TestArrowChunkStore:
+    """Test suite for ArrowChunkStore."""
+
+    def test_rows_round_trip_through_segments(self, tmp_path):
+        """Saved rows should be readable after reloading from disk."""
+        store = ArrowChunkStore()
+        _add(store, [0, 1])
+        store.save(tmp_path)
+        _add(store, [2])
+        store.save(tmp_path)
+
+        loaded = ArrowChunkStore.load(tmp_path)
+        rows = loaded.take([2, 0, 99])
+
+        assert len(list(tmp_path.glob("segment-*.arrow"))) == 2
+        assert rows[0].text == "chunk 2"
+        assert rows[1].metadata == {"session_id": "s1", "doc_id": "d1", "chunk_id": "c0", "page": 0}
+        assert rows[2] is None
+        assert loaded.search("c1").page_content == "chunk 1"
+
+    def test_deleted_rows_stay_deleted_and_ids_are_not_reused(self, tmp_path):
+        """Tombstones should persist, while max_faiss_id still counts deleted rows."""
+        store = ArrowChunkStore()
+        _add(store, list(range(10)))
+        store.save(tmp_path)
+        store.delete(["c9"])
+        store.save(tmp_path)
+
+        loaded = ArrowChunkStore.load(tmp_path)
+
+        assert len(loaded) == 9
+        assert loaded.take([9]) == [None]
+        assert loaded.max_faiss_id == 9
+
+    def test_save_compacts_when_tombstones_dominate(self, tmp_path):
+        """Deleting most rows should rewrite live rows into a single segment."""
+        store = ArrowChunkStore()
+        _add(store, [0, 1])
+        store.save(tmp_path)
+        _add(store, [2, 3])
+        store.save(tmp_path)
+        store.delete(["c0", "c1", "c2"])
+        store.save(tmp_path)
+
+        loaded = ArrowChunkStore.load(tmp_path)
+
+        assert len(list(tmp_path.glob("segment-*.arrow"))) == 1
+        assert [row.chunk_id for row in loaded.live_rows()] == ["c3"]
+
+    def test_metadata_outside_the_columns_round_trips(self, tmp_path):
+        """Metadata without a dedicated column should survive a save and reload."""
+        store = ArrowChunkStore()
+        metadata = {"session_id": "s1", "chunk_id": "c0", "page": 2, "filename": "notes.pdf", "tags": ["a", "b"]}
+        store.add_chunks([0], ["c0"], ["chunk 0"], [metadata])
+        store.save(tmp_path)
+
+        assert ArrowChunkStore.load(tmp_path).take([0])[0].metadata == metadata
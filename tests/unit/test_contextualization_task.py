@@ -0,0 +1,53 @@
+"""
+Unit tests for ContextualizationTask.
+
+Tests embed-text construction against a stub chat model (no Gemini calls).
+Dependencies: pytest, langchain_core, backend.core.document_processing.tasks.contextualization_task
+System role: Contextual retrieval validation
+"""
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+from backend.core.document_processing.tasks.contextualization_task import ContextualizationTask
+
+
+class FakeChatModel:
+    """Chat model stub answering with the chunk's line; chunks containing "fail" raise."""
+
+    def __init__(self):
+        self.prompts: list[str] = []
+        self.configs: list[dict] = []
+
+    def batch(self, prompts, config=None, return_exceptions=False):
+        self.prompts.extend(prompts)
+        self.configs.append(config)
+        return [
+            RuntimeError("quota") if "<chunk>\nfail" in prompt else AIMessage(content=" From the intro. ")
+            for prompt in prompts
+        ]
+
+
+@pytest.fixture
+def task(monkeypatch):
+    """ContextualizationTask wired to a stub chat model."""
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    task = ContextualizationTask(max_concurrency=4)
+    task._model = FakeChatModel()
+    return task
+
+
+class TestContextualizationTask:
+    """Test suite for ContextualizationTask."""
+
+    def test_chunks_are_prefixed_with_context_and_failures_fall_back(self, task):
+        """Each chunk should be embedded as context + chunk, or as the plain chunk if its request fails."""
+        pages = [Document(page_content="page one"), Document(page_content="page two")]
+        chunks = [Document(page_content="alpha"), Document(page_content="fail beta")]
+
+        texts = task.contextualize(pages, chunks)
+
+        assert texts == ["From the intro.\n\nalpha", "fail beta"]
+        assert all(prompt.startswith("<document>\npage one\n\npage two\n</document>") for prompt in task._model.prompts)
+        assert task._model.configs == [{"max_concurrency": 4}]
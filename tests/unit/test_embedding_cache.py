@@ -0,0 +1,120 @@
+"""
+Unit tests for SQLiteEmbeddingCache.
+
+Tests content-addressed lookups, miss-only (deduplicated) embedding,
+persistence, size-capped eviction, int8 storage and the uncached fallback.
+Dependencies: pytest, numpy, backend.core.document_processing.embedding_cache
+System role: Embedding cache validation
+"""
+
+import sqlite3
+
+import pytest
+
+from backend.core.document_processing import embedding_cache
+from backend.core.document_processing.embedding_cache import SQLiteEmbeddingCache
+
+
+class RecordingEmbedder:
+    """Embed function stub recording every batch it is asked for."""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+
+    def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+class TestSQLiteEmbeddingCache:
+    """Test suite for SQLiteEmbeddingCache."""
+
+    def test_only_misses_are_embedded(self, tmp_path):
+        """Texts already cached should not be passed to the embedder again."""
+        cache = SQLiteEmbeddingCache(tmp_path / "embed.sqlite")
+        embed = RecordingEmbedder()
+        keys = [cache.key("m", 2, "RETRIEVAL_DOCUMENT", text) for text in ["a", "bb", "ccc"]]
+
+        cache.get_or_embed(keys[:2], ["a", "bb"], embed)
+        vectors = cache.get_or_embed(keys, ["a", "bb", "ccc"], embed)
+
+        assert embed.batches == [["a", "bb"], ["ccc"]]
+        assert vectors == [[1.0, 0.5], [2.0, 0.5], [3.0, 0.5]]
+
+    def test_duplicate_texts_are_embedded_once(self, tmp_path):
+        """Repeated texts in one call should be sent once and scattered to every position."""
+        cache = SQLiteEmbeddingCache(tmp_path / "embed.sqlite")
+        embed = RecordingEmbedder()
+        texts = ["a", "bb", "a", "bb", "a"]
+        keys = [cache.key("m", 2, None, text) for text in texts]
+
+        vectors = cache.get_or_embed(keys, texts, embed)
+
+        assert embed.batches == [["a", "bb"]]
+        assert vectors == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+
+    def test_cache_is_shared_across_instances(self, tmp_path):
+        """A second cache on the same file should see vectors stored as fp16."""
+        key = SQLiteEmbeddingCache.key("m", 2, None, "text")
+        SQLiteEmbeddingCache(tmp_path / "embed.sqlite").put_many({key: [0.1, 0.2]})
+
+        found = SQLiteEmbeddingCache(tmp_path / "embed.sqlite").get_many([key])
+
+        assert found[key] == pytest.approx([0.1, 0.2], abs=1e-3)
+
+    def test_key_depends_on_task_type_and_dimension(self):
+        """Query and document embeddings of the same text must not collide."""
+        document_key = SQLiteEmbeddingCache.key("m", 1024, "RETRIEVAL_DOCUMENT", "text")
+
+        assert document_key != SQLiteEmbeddingCache.key("m", 1024, "RETRIEVAL_QUERY", "text")
+        assert document_key != SQLiteEmbeddingCache.key("m", 768, "RETRIEVAL_DOCUMENT", "text")
+
+    def test_oldest_entries_are_evicted_over_the_size_cap(self, tmp_path, monkeypatch):
+        """Once the database exceeds max_bytes, the oldest entries should go first."""
+        cache = SQLiteEmbeddingCache(tmp_path / "embed.sqlite")
+        old_keys = [cache.key("m", 2, None, str(i)) for i in range(20)]
+        monkeypatch.setattr(embedding_cache.time, "time", lambda: 1.0)
+        cache.put_many({key: [0.1, 0.2] for key in old_keys})
+
+        cache._max_bytes = 0
+        monkeypatch.setattr(embedding_cache.time, "time", lambda: 2.0)
+        new_key = cache.key("m", 2, None, "new")
+        cache.put_many({new_key: [0.3, 0.4]})
+
+        found = cache.get_many(old_keys + [new_key])
+        assert new_key in found
+        assert len(found) == 21 - 2
+
+    def test_databases_without_insert_times_are_migrated(self, tmp_path):
+        """Caches written before eviction existed should stay readable."""
+        path = tmp_path / "embed.sqlite"
+        key = SQLiteEmbeddingCache.key("m", 2, None, "text")
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE emb (k BLOB PRIMARY KEY, v BLOB NOT NULL) WITHOUT ROWID")
+        SQLiteEmbeddingCache(path).put_many({key: [0.1, 0.2]})
+
+        assert key in SQLiteEmbeddingCache(path).get_many([key])
+
+    def test_quantized_vectors_round_trip_alongside_fp16_rows(self, tmp_path):
+        """int8 rows should decode within one quantization step and fp16 rows should still read."""
+        path = tmp_path / "embed.sqlite"
+        fp16_key = SQLiteEmbeddingCache.key("m", 3, None, "fp16")
+        int8_key = SQLiteEmbeddingCache.key("m", 3, None, "int8")
+        SQLiteEmbeddingCache(path).put_many({fp16_key: [0.1, -0.2, 0.3]})
+        SQLiteEmbeddingCache(path, quantize=True).put_many({int8_key: [0.5, -1.27, 0.0]})
+
+        found = SQLiteEmbeddingCache(path).get_many([fp16_key, int8_key])
+
+        assert found[fp16_key] == pytest.approx([0.1, -0.2, 0.3], abs=1e-3)
+        assert found[int8_key] == pytest.approx([0.5, -1.27, 0.0], abs=0.01)
+
+    def test_unwritable_cache_path_falls_back_to_no_cache(self, tmp_path, monkeypatch):
+        """A cache path that cannot be created (e.g. a read-only home in Lambda) should disable caching."""
+        (tmp_path / "file").write_text("")
+        monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "file" / "embed.sqlite"))
+        embedding_cache.get_embedding_cache.cache_clear()
+
+        try:
+            assert embedding_cache.get_embedding_cache() is None
+        finally:
+            embedding_cache.get_embedding_cache.cache_clear()
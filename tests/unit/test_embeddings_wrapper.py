@@ -0,0 +1,125 @@
+"""
+Unit tests for FixedDimensionEmbeddings.
+
+Tests concurrent (sync and async) batching, rate-limit retries and cache
+read-through without Gemini calls.
+Dependencies: pytest, langchain_google_genai, backend.core.document_processing.embeddings_wrapper
+System role: Embedding wrapper validation
+"""
+
+import threading
+
+import pytest
+from google.genai.errors import ClientError
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from langchain_google_genai._common import GoogleGenerativeAIError
+from tenacity import wait_none
+
+from backend.boundary.vdb.embedding_cache import SQLiteEmbeddingCache
+from backend.core.document_processing.embeddings_wrapper import FixedDimensionEmbeddings
+
+
+@pytest.fixture
+def api_calls(monkeypatch):
+    """Replace the Gemini API calls with a stub recording each request."""
+    calls: list[dict] = []
+    lock = threading.Lock()
+
+    def embed_documents(self, texts, **kwargs):
+        with lock:
+            calls.append({"texts": list(texts), **kwargs})
+        return [[float(len(text)), float(kwargs["output_dimensionality"])] for text in texts]
+
+    async def aembed_documents(self, texts, **kwargs):
+        return embed_documents(self, texts, **kwargs)
+
+    async def aembed_query(self, text, **kwargs):
+        return embed_documents(self, [text], **kwargs)[0]
+
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(GoogleGenerativeAIEmbeddings, "embed_documents", embed_documents)
+    monkeypatch.setattr(GoogleGenerativeAIEmbeddings, "aembed_documents", aembed_documents)
+    monkeypatch.setattr(GoogleGenerativeAIEmbeddings, "aembed_query", aembed_query)
+    return calls
+
+
+class TestFixedDimensionEmbeddings:
+    """Test suite for FixedDimensionEmbeddings."""
+
+    def test_batches_are_split_and_reassembled_in_order(self, api_calls):
+        """Each API request should hold at most batch_size texts, results in input order."""
+        embeddings = FixedDimensionEmbeddings(output_dimensionality=8)
+        texts = ["x" * n for n in range(1, 11)]
+
+        vectors = embeddings.embed_documents(texts, batch_size=3)
+
+        assert vectors == [[float(n), 8.0] for n in range(1, 11)]
+        assert sorted(len(call["texts"]) for call in api_calls) == [1, 3, 3, 3]
+
+    def test_batch_size_is_capped_at_the_api_limit(self, api_calls):
+        """Oversized batch_size values should still send at most 100 texts per request."""
+        embeddings = FixedDimensionEmbeddings(output_dimensionality=8)
+
+        vectors = embeddings.embed_documents([f"t{n}" for n in range(250)], batch_size=500)
+
+        assert len(vectors) == 250
+        assert sorted(len(call["texts"]) for call in api_calls) == [50, 100, 100]
+
+    def test_cached_texts_skip_the_api(self, api_calls, tmp_path):
+        """Texts embedded once should be served from the cache afterwards."""
+        cache = SQLiteEmbeddingCache(tmp_path / "embed.sqlite")
+        embeddings = FixedDimensionEmbeddings(output_dimensionality=8, cache=cache)
+
+        embeddings.embed_documents(["a", "bb"])
+        embeddings.embed_documents(["a", "bb", "ccc"])
+
+        assert [call["texts"] for call in api_calls] == [["a", "bb"], ["ccc"]]
+
+    def test_rate_limited_batch_is_retried_alone(self, api_calls, monkeypatch):
+        """A 429 on one batch should retry that batch only."""
+        monkeypatch.setattr(FixedDimensionEmbeddings._embed_batch.retry, "wait", wait_none())
+        stub = GoogleGenerativeAIEmbeddings.embed_documents
+        failed = []
+
+        def flaky_embed_documents(self, texts, **kwargs):
+            if texts == ["ccc"] and not failed:
+                failed.append(texts)
+                quota = ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}})
+                raise GoogleGenerativeAIError("Error embedding content") from quota
+            return stub(self, texts, **kwargs)
+
+        monkeypatch.setattr(GoogleGenerativeAIEmbeddings, "embed_documents", flaky_embed_documents)
+        embeddings = FixedDimensionEmbeddings(output_dimensionality=8)
+
+        vectors = embeddings.embed_documents(["a", "bb", "ccc"], batch_size=1)
+
+        assert vectors == [[1.0, 8.0], [2.0, 8.0], [3.0, 8.0]]
+        assert sorted(call["texts"] for call in api_calls) == [["a"], ["bb"], ["ccc"]]
+
+    def test_other_errors_are_not_retried(self, api_calls, monkeypatch):
+        """Errors other than 429 should surface on the first attempt."""
+
+        def failing_embed_documents(self, texts, **kwargs):
+            api_calls.append({"texts": list(texts)})
+            raise GoogleGenerativeAIError("Error embedding content: bad request")
+
+        monkeypatch.setattr(GoogleGenerativeAIEmbeddings, "embed_documents", failing_embed_documents)
+
+        with pytest.raises(GoogleGenerativeAIError):
+            FixedDimensionEmbeddings(output_dimensionality=8).embed_documents(["a"])
+
+        assert len(api_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_async_embeddings_keep_fixed_dimension_and_cache(self, api_calls, tmp_path):
+        """Async calls should batch, use the configured dimension and share the cache."""
+        cache = SQLiteEmbeddingCache(tmp_path / "embed.sqlite")
+        embeddings = FixedDimensionEmbeddings(output_dimensionality=8, cache=cache)
+
+        vectors = await embeddings.aembed_documents(["a", "bb", "ccc"], batch_size=2)
+        query_vector = await embeddings.aembed_query("dddd")
+        again = embeddings.embed_documents(["a", "bb", "ccc"])
+
+        assert vectors == again == [[1.0, 8.0], [2.0, 8.0], [3.0, 8.0]]
+        assert query_vector == [4.0, 8.0]
+        assert sorted(call["texts"] for call in api_calls) == [["a", "bb"], ["ccc"], ["dddd"]]
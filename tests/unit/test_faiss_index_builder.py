@@ -0,0 +1,80 @@
+"""
+Unit tests for FAISS index builder helpers.
+
+Tests CPU quota detection, OpenMP thread configuration and mmap loading.
+Dependencies: pytest, faiss-cpu, backend.boundary.vdb.faiss_index_builder
+System role: Local vector index helper validation
+"""
+
+import faiss
+import numpy as np
+import pytest
+
+from backend.boundary.vdb.faiss_index_builder import (
+    available_cpus,
+    build_ivfpq_index,
+    configure_omp_threads,
+    create_flat_index,
+    create_hnsw_index,
+    read_index_mmap,
+    remove_vectors,
+)
+
+
+class TestThreadConfiguration:
+    """Test suite for OpenMP thread sizing."""
+
+    def test_cgroup_quota_caps_available_cpus(self, tmp_path):
+        """A cpu.max quota of 1.5 CPUs should round up to 2 threads."""
+        cpu_max = tmp_path / "cpu.max"
+        cpu_max.write_text("150000 100000\n")
+
+        assert available_cpus(str(cpu_max)) == min(2, available_cpus(str(tmp_path / "missing")))
+
+    def test_unlimited_quota_falls_back_to_affinity(self, tmp_path):
+        """An unlimited quota should report the cores the process may run on."""
+        cpu_max = tmp_path / "cpu.max"
+        cpu_max.write_text("max 100000\n")
+
+        assert available_cpus(str(cpu_max)) == available_cpus(str(tmp_path / "missing"))
+
+    def test_explicit_thread_count_is_applied(self):
+        """An explicit count should be passed straight to FAISS."""
+        previous = faiss.omp_get_max_threads()
+        try:
+            assert configure_omp_threads(1) == 1
+            assert faiss.omp_get_max_threads() == 1
+        finally:
+            faiss.omp_set_num_threads(previous)
+
+
+class TestReadIndexMmap:
+    """Test suite for memory-mapped index loading."""
+
+    @pytest.mark.parametrize(
+        "build",
+        [
+            lambda x, ids: _filled(create_flat_index(x.shape[1], "fp16"), x, ids),
+            lambda x, ids: _filled(create_hnsw_index(x.shape[1], 16, 40, "fp16"), x, ids),
+            lambda x, ids: build_ivfpq_index(x, ids, nlist=4, pq_m=8, pq_nbits=4),
+        ],
+        ids=["flat", "hnsw", "ivfpq"],
+    )
+    def test_loaded_index_stays_mutable_without_touching_the_file(self, tmp_path, build):
+        """Adds and removes on a loaded index should work and leave the file unchanged."""
+        vectors = np.random.default_rng(0).random((300, 32), dtype=np.float32)
+        path = tmp_path / "index.faiss"
+        faiss.write_index(build(vectors, np.arange(300, dtype=np.int64)), str(path))
+        saved = path.read_bytes()
+
+        index = read_index_mmap(str(path))
+        index = remove_vectors(index, np.arange(5, dtype=np.int64))
+        index.add_with_ids(vectors[:1], np.array([1000], dtype=np.int64))
+
+        assert index.ntotal == 296
+        assert path.read_bytes() == saved
+
+
+def _filled(index: faiss.Index, vectors: np.ndarray, ids: np.ndarray) -> faiss.Index:
+    index.add_with_ids(vectors, ids)
+    return index
@@ -0,0 +1,482 @@
+"""
+Unit tests for FAISSVectorsStore.
+
+Tests index creation, add/search/delete round trips, IVF-PQ migration and
+loading of existing and legacy indexes using deterministic fake embeddings
+(no Gemini calls).
+Dependencies: pytest, faiss-cpu, numpy, backend.boundary.vdb.faiss_vectors_store
+System role: Local vector store validation
+"""
+
+import gc
+import hashlib
+import weakref
+
+import faiss
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
+from langchain_core.embeddings import Embeddings
+
+from backend.boundary.vdb import faiss_vectors_store
+from backend.boundary.vdb.faiss_index_builder import scalar_quantizer_type
+from backend.boundary.vdb.faiss_vectors_store import FAISSVectorsStore
+from backend.boundary.vdb.mmr import mmr_select
+from backend.boundary.vdb.vector_schemas import VectorSearchResult
+
+DIMENSION = 32
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic embeddings derived from a hash of the text."""
+
+    def __init__(self, model: str = "fake", output_dimensionality: int = DIMENSION, **kwargs):
+        self.dimension = output_dimensionality
+        self.query_calls = 0
+        self.document_calls = 0
+
+    def _vector(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+        return np.random.default_rng(seed).random(self.dimension, dtype=np.float32).tolist()
+
+    def embed_query(self, text: str, **kwargs) -> list[float]:
+        self.query_calls += 1
+        return self._vector(text)
+
+    def embed_documents(self, texts: list[str], **kwargs) -> list[list[float]]:
+        self.document_calls += 1
+        return [self._vector(text) for text in texts]
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    """Factory building stores against a temp index dir and fake embeddings."""
+    monkeypatch.setattr(faiss_vectors_store, "FAISS_INDEX_DIR", tmp_path)
+    monkeypatch.setattr(
+        faiss_vectors_store,
+        "get_fixed_dimension_embeddings",
+        lambda model, output_dimensionality: FakeEmbeddings(model, output_dimensionality),
+    )
+
+    stores: list[FAISSVectorsStore] = []
+
+    def _make(**kwargs) -> FAISSVectorsStore:
+        kwargs.setdefault("embedding_dimension", DIMENSION)
+        kwargs.setdefault("pq_m", 8)
+        kwargs.setdefault("pq_nbits", 4)
+        kwargs.setdefault("nlist", 4)
+        store = FAISSVectorsStore(index_name="test", **kwargs)
+        stores.append(store)
+        return store
+
+    yield _make
+    for store in stores:
+        store.close()
+
+
+def _metadata(session_id: str, doc_id: str, chunk_id: str) -> dict:
+    return {"session_id": session_id, "doc_id": doc_id, "chunk_id": chunk_id}
+
+
+class TestFAISSVectorsStore:
+    """Test suite for FAISSVectorsStore add/search/delete."""
+
+    @pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivfpq", "mmap_flat"])
+    def test_each_index_type_supports_search_and_delete(self, make_store, index_type):
+        """Every index type should search exactly on small corpora and delete by id."""
+        store = make_store(index_type=index_type)
+        ids = [f"c{i}" for i in range(6)]
+        store.add_documents([f"chunk {i}" for i in range(6)], [_metadata("s1", "d1", i) for i in ids], ids)
+
+        store.delete_by_doc_id("d1", ["c4"])
+
+        assert store.similarity_search("chunk 5", k=1)[0].chunk_id == "c5"
+        assert "c4" not in {r.chunk_id for r in store.similarity_search("chunk 4", k=6)}
+
+    def test_every_index_type_reports_the_same_cosine_scores(self, make_store, tmp_path, monkeypatch):
+        """Scores should be cosine similarities, best first, whatever the index type."""
+        ids = [f"c{i}" for i in range(8)]
+        scores = {}
+        for index_type in ["flat", "hnsw", "ivfpq", "mmap_flat"]:
+            monkeypatch.setattr(faiss_vectors_store, "FAISS_INDEX_DIR", tmp_path / index_type)
+            store = make_store(index_type=index_type, precision="fp32")
+            store.add_documents([f"chunk {i}" for i in range(8)], [_metadata("s1", "d1", i) for i in ids], ids)
+            scores[index_type] = [r.similarity_score for r in store.similarity_search("chunk 3", k=4)]
+
+        for index_type, type_scores in scores.items():
+            assert type_scores[0] == pytest.approx(1.0, abs=1e-5), index_type
+            assert type_scores == sorted(type_scores, reverse=True), index_type
+            assert type_scores == pytest.approx(scores["mmap_flat"], abs=1e-5), index_type
+
+    def test_add_then_search_returns_exact_match_first(self, make_store):
+        """Added chunk text should be its own nearest neighbour."""
+        store = make_store()
+        texts = [f"chunk {i}" for i in range(10)]
+        ids = [f"c{i}" for i in range(10)]
+        store.add_documents(texts, [_metadata("s1", "d1", i) for i in ids], ids)
+
+        results = store.similarity_search("chunk 3", k=3)
+
+        assert results[0].chunk_id == "c3"
+        assert results[0].content == "chunk 3"
+        assert len(results) == 3
+
+    def test_search_filters_by_session_and_doc(self, make_store):
+        """Results should only contain chunks matching the requested filters."""
+        store = make_store()
+        texts = [f"chunk {i}" for i in range(12)]
+        ids = [f"c{i}" for i in range(12)]
+        metadatas = [
+            _metadata("s1" if i % 2 else "s2", "d1" if i < 6 else "d2", ids[i])
+            for i in range(12)
+        ]
+        store.add_documents(texts, metadatas, ids)
+
+        session_results = store.similarity_search("chunk 1", k=20, session_id="s1")
+        doc_results = store.similarity_search("chunk 1", k=20, session_id="s1", doc_id="d2")
+
+        assert session_results
+        assert {r.metadata.session_id for r in session_results} == {"s1"}
+        assert {(r.metadata.session_id, r.metadata.doc_id) for r in doc_results} == {("s1", "d2")}
+
+    def test_list_by_metadata_filters_without_embedding(self, make_store):
+        """Listing by doc_id should return that document's live chunks without a query embedding."""
+        store = make_store()
+        ids = [f"c{i}" for i in range(6)]
+        metadatas = [_metadata("s1", "d1" if i < 4 else "d2", ids[i]) for i in range(6)]
+        store.add_documents([f"chunk {i}" for i in range(6)], metadatas, ids)
+        store.delete_by_doc_id("d1", ["c1"])
+
+        listed = store.list_by_metadata(doc_id="d1", limit=1000)
+
+        assert store._embeddings.query_calls == 0
+        assert [r.chunk_id for r in listed] == ["c0", "c2", "c3"]
+        assert all(r.similarity_score == 0.0 for r in listed)
+        assert [r.chunk_id for r in store.list_by_metadata(limit=2)] == ["c0", "c2"]
+        assert store.list_by_metadata(doc_id="missing") == []
+
+    def test_delete_by_doc_id_removes_chunks(self, make_store):
+        """Deleted chunks must not be returned by later searches."""
+        store = make_store()
+        ids = [f"c{i}" for i in range(5)]
+        store.add_documents([f"chunk {i}" for i in range(5)], [_metadata("s1", "d1", i) for i in ids], ids)
+
+        store.delete_by_doc_id("d1", ["c1", "c2"])
+        results = store.similarity_search("chunk 1", k=5)
+
+        assert {r.chunk_id for r in results} == {"c0", "c3", "c4"}
+
+    def test_index_persists_across_instances(self, make_store):
+        """A second store instance should load the saved index and docstore."""
+        store = make_store()
+        ids = [f"c{i}" for i in range(4)]
+        store.add_documents([f"chunk {i}" for i in range(4)], [_metadata("s1", "d1", i) for i in ids], ids)
+        store.flush()
+
+        reloaded = make_store()
+        results = reloaded.similarity_search("chunk 2", k=1)
+
+        assert results[0].chunk_id == "c2"
+
+    def test_legacy_save_local_index_is_migrated(self, make_store, tmp_path):
+        """An index saved by FAISS.save_local should be migrated with its metadata, not replaced."""
+        texts = [f"chunk {i}" for i in range(4)]
+        metadatas = [{**_metadata("s1", "d1", f"c{i}"), "filename": "notes.pdf"} for i in range(4)]
+        FAISS.from_texts(texts, FakeEmbeddings(), metadatas, ids=[f"c{i}" for i in range(4)]).save_local(
+            str(tmp_path), index_name="test"
+        )
+
+        store = make_store()
+
+        assert store._embeddings.document_calls == 0
+        results = store.similarity_search("chunk 2", k=1, session_id="s1")
+        assert results[0].chunk_id == "c2" and results[0].content == "chunk 2"
+        assert store._vector_store.docstore.search("c2").metadata == metadatas[2]
+        assert make_store().similarity_search("chunk 3", k=1)[0].chunk_id == "c3"
+
+    def test_unloadable_index_refuses_to_start(self, make_store, tmp_path, caplog):
+        """A saved index that fails to load should stop startup and keep its chunks on disk."""
+        store = make_store()
+        store.add_documents(["chunk 0"], [_metadata("s1", "d1", "c0")], ["c0"])
+        store.flush()
+        (tmp_path / "test.faiss").write_bytes(b"corrupt")
+
+        with pytest.raises(RuntimeError, match="Could not load FAISS index"):
+            make_store()
+        with pytest.raises(RuntimeError, match="another index_type"):
+            make_store(index_type="mmap_flat")
+
+        assert any(record.levelname == "ERROR" for record in caplog.records)
+        assert list((tmp_path / "test.chunks").glob("segment-*.arrow"))
+
+    def test_mutations_are_persisted_lazily(self, make_store):
+        """add_documents should defer the disk write until flush or the debounce interval."""
+        store = make_store(save_interval_s=60)
+        store.add_documents(["chunk 0"], [_metadata("s1", "d1", "c0")], ["c0"])
+
+        assert make_store().similarity_search("chunk 0", k=1) == []
+
+        store.flush()
+
+        assert make_store().similarity_search("chunk 0", k=1)[0].chunk_id == "c0"
+
+    def test_close_stops_the_persist_thread_and_saves(self, make_store):
+        """close() should join the background thread and write pending mutations."""
+        store = make_store(save_interval_s=60)
+        store.add_documents(["chunk 0"], [_metadata("s1", "d1", "c0")], ["c0"])
+
+        store.close()
+        store.close()
+
+        assert not store._persist_thread.is_alive()
+        assert store not in faiss_vectors_store._OPEN_STORES
+        assert make_store().similarity_search("chunk 0", k=1)[0].chunk_id == "c0"
+
+    def test_unreferenced_store_is_collected_and_its_thread_exits(self, tmp_path, monkeypatch):
+        """Neither the persist thread nor the exit hook should keep a dropped store alive."""
+        monkeypatch.setattr(faiss_vectors_store, "FAISS_INDEX_DIR", tmp_path)
+        monkeypatch.setattr(
+            faiss_vectors_store,
+            "get_fixed_dimension_embeddings",
+            lambda model, output_dimensionality: FakeEmbeddings(model, output_dimensionality),
+        )
+        store = FAISSVectorsStore(index_name="dropped", embedding_dimension=DIMENSION, save_interval_s=0.01)
+        store_ref = weakref.ref(store)
+        thread = store._persist_thread
+
+        del store
+        gc.collect()
+        thread.join(timeout=5)
+
+        assert store_ref() is None
+        assert not thread.is_alive()
+
+    def test_flat_index_migrates_to_ivfpq_after_training_threshold(self, make_store):
+        """Crossing the training threshold should swap in a trained IVF-PQ index."""
+        store = make_store(index_type="ivfpq", nprobe=4)
+        count = 39 * 16
+        ids = [f"c{i}" for i in range(count)]
+        store.add_documents([f"chunk {i}" for i in range(count)], [_metadata("s1", "d1", i) for i in ids], ids)
+
+        ivf = faiss.try_extract_index_ivf(store._vector_store.index)
+        results = store.similarity_search("chunk 7", k=5)
+
+        assert ivf is not None
+        assert ivf.is_trained
+        assert ivf.ntotal == count
+        assert "c7" in {r.chunk_id for r in results}
+
+    def test_ivfpq_rescoring_returns_exact_distances_and_persists(self, make_store, tmp_path):
+        """Re-scored IVF-PQ hits should carry exact scores computed from the on-disk float32 vectors."""
+        store = make_store(index_type="ivfpq", nprobe=4, rescore_k_factor=4)
+        count = 39 * 16
+        ids = [f"c{i}" for i in range(count)]
+        store.add_documents([f"chunk {i}" for i in range(count)], [_metadata("s1", "d1", i) for i in ids], ids)
+        store.delete_by_doc_id("d1", ["c3"])
+        store.flush()
+
+        reloaded = make_store(index_type="ivfpq", nprobe=4, rescore_k_factor=4)
+        results = reloaded.similarity_search("chunk 7", k=5)
+
+        assert faiss.try_extract_index_ivf(reloaded._vector_store.index) is not None
+        assert results[0].chunk_id == "c7"
+        assert results[0].similarity_score == pytest.approx(1.0, abs=1e-5)
+        assert [r.similarity_score for r in results] == sorted((r.similarity_score for r in results), reverse=True)
+        assert "c3" not in {r.chunk_id for r in reloaded.similarity_search("chunk 3", k=5)}
+        assert (tmp_path / "test.exact" / "vectors.f32").stat().st_size == count * DIMENSION * 4
+
+    def test_search_with_unknown_session_skips_embedding(self, make_store):
+        """A filter matching no vectors should return early without embedding."""
+        store = make_store()
+        store.add_documents(["chunk 0"], [_metadata("s1", "d1", "c0")], ["c0"])
+        document_calls = store._embeddings.document_calls
+
+        results = store.similarity_search("chunk 0", k=3, session_id="missing")
+
+        assert results == []
+        assert store._embeddings.document_calls == document_calls
+
+    def test_filtered_search_returns_k_results_from_matching_session(self, make_store):
+        """Filtering inside FAISS should fill k from the session, not over-fetch then trim."""
+        store = make_store()
+        ids = [f"c{i}" for i in range(30)]
+        metadatas = [_metadata("s1" if i < 3 else "s2", "d1", ids[i]) for i in range(30)]
+        store.add_documents([f"chunk {i}" for i in range(30)], metadatas, ids)
+
+        results = store.similarity_search("chunk 29", k=3, session_id="s1")
+
+        assert {r.chunk_id for r in results} == {"c0", "c1", "c2"}
+
+    def test_filtered_search_excludes_deleted_chunks(self, make_store):
+        """Deleted chunks should drop out of the session filter columns."""
+        store = make_store()
+        ids = ["c0", "c1", "c2"]
+        metadatas = [_metadata("s1", "d1", "c0"), _metadata("s1", "d2", "c1"), _metadata("s2", "d3", "c2")]
+        store.add_documents(["chunk 0", "chunk 1", "chunk 2"], metadatas, ids)
+
+        store.delete_by_doc_id("d1", ["c0"])
+
+        assert [r.chunk_id for r in store.similarity_search("chunk 0", k=5, session_id="s1")] == ["c1"]
+        assert store.similarity_search("chunk 0", k=5, doc_id="d1") == []
+
+    def test_new_index_is_created_without_probe_embedding(self, make_store):
+        """Index creation should size from the configured dimension, not an API call."""
+        store = make_store()
+
+        assert store._vector_store.index.d == DIMENSION
+        assert store._embeddings.query_calls == 0
+        assert store._embeddings.document_calls == 0
+
+    def test_embed_dim_sizes_both_index_and_embedder(self, make_store, monkeypatch):
+        """A non-default EMBED_DIM should reach the embedder as well as the index."""
+        monkeypatch.setenv("EMBED_DIM", "16")
+        store = make_store()
+        store.add_documents(["chunk 0"], [_metadata("s1", "d1", "c0")], ["c0"])
+
+        assert store._vector_store.index.d == store._embeddings.dimension == 16
+        assert store.similarity_search("chunk 0", k=1)[0].chunk_id == "c0"
+
+    @pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+    def test_int8_precision_quantizes_after_calibration(self, make_store, index_type):
+        """int8 stores should switch to SQ8 codes once enough vectors are collected."""
+        store = make_store(index_type=index_type, precision="int8", sq_training_size=64)
+        ids = [f"c{i}" for i in range(64)]
+        store.add_documents([f"chunk {i}" for i in range(64)], [_metadata("s1", "d1", i) for i in ids], ids)
+
+        store.delete_by_doc_id("d1", ["c1"])
+        store.compact()
+
+        assert scalar_quantizer_type(store._vector_store.index) == faiss.ScalarQuantizer.QT_8bit
+        assert store._vector_store.index.ntotal == 63
+        assert store.similarity_search("chunk 9", k=1)[0].chunk_id == "c9"
+
+    def test_small_delete_is_tombstoned_and_masked(self, make_store):
+        """Deletes below the compaction ratio should keep vectors but hide them from search."""
+        store = make_store(index_type="hnsw")
+        ids = [f"c{i}" for i in range(20)]
+        store.add_documents([f"chunk {i}" for i in range(20)], [_metadata("s1", f"d{i}", i) for i in ids], ids)
+
+        store.delete_by_doc_id("d3", ["c3"])
+
+        assert store._vector_store.index.ntotal == 20
+        assert "c3" not in {r.chunk_id for r in store.similarity_search("chunk 3", k=20)}
+
+    def test_tombstones_compact_above_ratio_and_survive_reload(self, make_store):
+        """Tombstones should persist across instances and compact once they exceed the ratio."""
+        store = make_store(index_type="flat")
+        ids = [f"c{i}" for i in range(20)]
+        store.add_documents([f"chunk {i}" for i in range(20)], [_metadata("s1", f"d{i}", i) for i in ids], ids)
+        store.delete_by_doc_id("d0", ["c0"])
+        store.flush()
+
+        reloaded = make_store(index_type="flat")
+        assert reloaded._tombstones == {0}
+        assert "c0" not in {r.chunk_id for r in reloaded.similarity_search("chunk 0", k=20)}
+
+        reloaded.delete_by_doc_id("d1", ["c1"])
+        reloaded.delete_by_doc_id("d2", ["c2"])
+
+        assert reloaded._tombstones == set()
+        assert reloaded._vector_store.index.ntotal == 17
+
+    def test_fp16_precision_is_the_default(self, make_store):
+        """New flat/HNSW indexes should store fp16 codes unless configured otherwise."""
+        assert scalar_quantizer_type(make_store()._vector_store.index) == faiss.ScalarQuantizer.QT_fp16
+
+    def test_mmr_search_filters_by_session_and_diversifies(self, make_store):
+        """MMR should only return session chunks and skip near-duplicates of earlier picks."""
+        store = make_store(index_type="flat", precision="fp32")
+        texts = ["chunk 0", "chunk 0", "chunk 1", "chunk 2", "chunk 3"]
+        ids = ["c0", "c0-dup", "c1", "c2", "c3"]
+        metadatas = [_metadata("s1", "d1", i) for i in ids[:4]] + [_metadata("s2", "d2", "c3")]
+        store.add_documents(texts, metadatas, ids)
+
+        results = store.max_marginal_relevance_search("chunk 0", k=2, fetch_k=5, lambda_mult=0.3, session_id="s1")
+
+        assert results[0].chunk_id in {"c0", "c0-dup"}
+        assert {r.chunk_id for r in results}.isdisjoint({"c3"})
+        assert len({r.content for r in results}) == 2
+
+    def test_mmap_flat_scores_cosine_similarity_and_persists(self, make_store, tmp_path):
+        """mmap_flat should return cosine scores and reload vectors from the mapped file."""
+        store = make_store(index_type="mmap_flat")
+        ids = [f"c{i}" for i in range(8)]
+        store.add_documents([f"chunk {i}" for i in range(8)], [_metadata("s1", "d1", i) for i in ids], ids)
+        store.delete_by_doc_id("d1", ["c0", "c1", "c2"])
+        store.flush()
+
+        reloaded = make_store(index_type="mmap_flat")
+        results = reloaded.similarity_search("chunk 5", k=3, session_id="s1")
+
+        assert results[0].chunk_id == "c5"
+        assert results[0].similarity_score == pytest.approx(1.0, abs=1e-5)
+        assert results[0].similarity_score >= results[1].similarity_score
+        assert (tmp_path / "test.mmap" / "vectors.f32").stat().st_size == 5 * DIMENSION * 4
+
+    def test_mmap_flat_supports_langchain_mmr_retriever(self, make_store):
+        """LangChain's MMR reconstructs vectors one id at a time, which mmap_flat must support."""
+        store = make_store(index_type="mmap_flat")
+        texts = ["chunk 0", "chunk 0", "chunk 1", "chunk 2"]
+        ids = ["c0", "c0-dup", "c1", "c2"]
+        store.add_documents(texts, [_metadata("s1", "d1", i) for i in ids], ids)
+
+        index = store._vector_store.index
+        assert np.array_equal(index.reconstruct(1), index.reconstruct_batch(np.array([1]))[0])
+
+        retriever = store.as_retriever(search_type="mmr", k=2, fetch_k=4, lambda_mult=0.3)
+        docs = retriever.invoke("chunk 0")
+
+        assert docs[0].page_content == "chunk 0"
+        assert len({doc.page_content for doc in docs}) == 2
+
+    def test_repeated_query_reuses_cached_embedding(self, make_store):
+        """A repeated query should be embedded once and served from the LRU afterwards."""
+        store = make_store()
+        store.add_documents(["chunk 0"], [_metadata("s1", "d1", "c0")], ["c0"])
+        document_calls = store._embeddings.document_calls
+
+        first = store.similarity_search("chunk 0", k=1)
+        second = store.similarity_search("chunk 0", k=1)
+
+        assert first == second
+        assert store._embeddings.document_calls == document_calls + 1
+
+    @pytest.mark.parametrize("index_type", ["hnsw", "mmap_flat"])
+    def test_batch_search_matches_single_searches(self, make_store, index_type):
+        """Batch search should embed once and return the same hits as per-query searches."""
+        store = make_store(index_type=index_type)
+        ids = [f"c{i}" for i in range(8)]
+        metadatas = [_metadata("s1" if i % 2 else "s2", "d1", chunk_id) for i, chunk_id in enumerate(ids)]
+        store.add_documents([f"chunk {i}" for i in range(8)], metadatas, ids)
+        queries = ["chunk 1", "chunk 3", "chunk 5"]
+        calls_before = store._embeddings.document_calls
+
+        batch = store.similarity_search_batch(queries, k=2, session_id="s1")
+
+        assert store._embeddings.document_calls == calls_before + 1
+        assert [[r.chunk_id for r in hits] for hits in batch] == [
+            [r.chunk_id for r in store.similarity_search(query, k=2, session_id="s1")] for query in queries
+        ]
+        assert store.similarity_search_batch(queries, session_id="missing") == [[], [], []]
+
+    def test_search_results_match_validated_models(self, make_store):
+        """Unvalidated result construction should still produce fully typed models."""
+        store = make_store()
+        store.add_documents(["chunk 0"], [{**_metadata("s1", "d1", "c0"), "page": 3}], ["c0"])
+
+        result = store.similarity_search("chunk 0", k=1)[0]
+
+        assert VectorSearchResult.model_validate(result.model_dump()) == result
+        assert result.metadata.page == 3
+        assert result.metadata.section is None
+
+    def test_mmr_selection_matches_langchain_reference(self):
+        """The vectorized MMR should pick the same candidates as LangChain's helper."""
+        rng = np.random.default_rng(0)
+        candidates = rng.standard_normal((20, DIMENSION)).astype(np.float32)
+        query = rng.standard_normal(DIMENSION).astype(np.float32)
+
+        expected = maximal_marginal_relevance(query, candidates.tolist(), lambda_mult=0.5, k=5)
+
+        assert mmr_select(query, candidates, k=5, lambda_mult=0.5) == expected
@@ -0,0 +1,67 @@
+"""
+Unit tests for QueryEmbeddingBatcher.
+
+Tests coalescing of concurrent query embeddings and error propagation.
+Dependencies: pytest, backend.boundary.vdb.query_embedding_batcher
+System role: Query embedding batching validation
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.boundary.vdb.query_embedding_batcher import QueryEmbeddingBatcher
+
+
+class RecordingEmbeddings:
+    """Embeddings stub recording every embed_documents batch."""
+
+    def __init__(self, fail: bool = False):
+        self.batches: list[list[str]] = []
+        self.task_types: list[str | None] = []
+        self.fail = fail
+
+    def embed_documents(self, texts, task_type=None):
+        self.batches.append(list(texts))
+        self.task_types.append(task_type)
+        if self.fail:
+            raise RuntimeError("embedding API down")
+        return [[float(len(text))] for text in texts]
+
+
+class TestQueryEmbeddingBatcher:
+    """Test suite for QueryEmbeddingBatcher."""
+
+    def test_single_query_is_embedded_as_query(self):
+        """A lone query should be embedded with the query task type."""
+        embeddings = RecordingEmbeddings()
+        batcher = QueryEmbeddingBatcher(embeddings, window_ms=1)
+
+        assert batcher.embed_query("abc") == [3.0]
+        assert embeddings.task_types == ["RETRIEVAL_QUERY"]
+
+    def test_concurrent_queries_share_a_batch(self):
+        """Queries arriving within the window should be embedded together."""
+        embeddings = RecordingEmbeddings()
+        batcher = QueryEmbeddingBatcher(embeddings, window_ms=200, max_batch=8)
+        barrier = threading.Barrier(8)
+
+        def embed(text: str) -> list[float]:
+            barrier.wait()
+            return batcher.embed_query(text)
+
+        texts = ["x" * n for n in range(1, 9)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(embed, texts))
+
+        assert results == [[float(n)] for n in range(1, 9)]
+        assert len(embeddings.batches) < 8
+        assert sorted(sum(embeddings.batches, [])) == sorted(texts)
+
+    def test_embedding_error_propagates_to_caller(self):
+        """Provider errors should be raised in every waiting caller."""
+        batcher = QueryEmbeddingBatcher(RecordingEmbeddings(fail=True), window_ms=1)
+
+        with pytest.raises(RuntimeError, match="embedding API down"):
+            batcher.embed_query("abc")
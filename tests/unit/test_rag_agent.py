@@ -0,0 +1,265 @@
+"""
+Unit tests for RAGAgent.
+
+Tests shared model construction, the astream event sequence, invoke_fast
+citation parsing and the semantic answer cache against a stub vector
+store and a stub chat model (no Gemini or AWS calls).
+Dependencies: pytest, numpy, langchain_core, backend.core.agentic_system.agent.rag_agent
+System role: RAG agent validation
+"""
+
+import gc
+import logging
+import threading
+import weakref
+import zlib
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+from backend.boundary.vdb.vector_schemas import VectorMetadata, VectorSearchResult
+from backend.core.agentic_system.agent import rag_agent
+from backend.core.agentic_system.agent.rag_agent import RAGAgent
+from backend.core.agentic_system.agent.rag_agent_prompt import RAG_AGENT_PROMPT
+from backend.models.streaming import StreamEventType, StreamingCitation
+
+
+class FakeVectorStore:
+    """Vector store stub returning fixed results and recording searches."""
+
+    def __init__(self):
+        self.searches: list[dict] = []
+
+    def embed_query(self, query: str) -> np.ndarray:
+        # One-hot per question; differences in case and punctuation are ignored
+        return np.eye(1024, dtype=np.float32)[zlib.crc32(query.lower().strip("?!. ").encode()) % 1024]
+
+    def similarity_search(self, query: str, k: int = 5, session_id: str | None = None, doc_id: str | None = None):
+        self.searches.append({"query": query, "k": k, "session_id": session_id})
+        return [
+            VectorSearchResult(
+                chunk_id=f"c{i}",
+                content=f"text {i}",
+                metadata=VectorMetadata(
+                    session_id="s1", doc_id="d1", chunk_id=f"c{i}", page=i + 1, source_uri=f"s3://bucket/doc{i}.pdf"
+                ),
+                similarity_score=0.9,
+            )
+            for i in range(2)
+        ]
+
+
+class FakeStreamingModel:
+    """Chat model stub answering with fixed tokens; streams carry usage on the last chunk."""
+
+    def __init__(self, tokens: list[str]):
+        self.tokens = tokens
+        self.calls: list[list] = []
+
+    async def astream(self, messages):
+        self.calls.append(messages)
+        for token in self.tokens:
+            yield AIMessageChunk(content=token)
+        yield AIMessageChunk(
+            content="",
+            usage_metadata={
+                "input_tokens": 900,
+                "output_tokens": len(self.tokens),
+                "total_tokens": 900 + len(self.tokens),
+                "input_token_details": {"cache_read": 600},
+            },
+        )
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        return AIMessage(content="".join(self.tokens))
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """RAGAgent wired to a stub vector store and a stub streaming model."""
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    agent = RAGAgent(vector_store=FakeVectorStore())
+    agent._model = FakeStreamingModel(["Hello", " world"])
+    return agent
+
+
+async def _collect(agent: RAGAgent, question: str = "what is a vector?", **kwargs) -> list:
+    return [event async for event in agent.astream(question, session_id="s1", **kwargs)]
+
+
+class TestRAGAgentConstruction:
+    """Test suite for RAGAgent construction."""
+
+    def test_agents_share_model_and_compiled_graph(self, monkeypatch):
+        """Agents with the same settings and store should reuse one model and one agent graph."""
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        store = FakeVectorStore()
+
+        first, second = RAGAgent(vector_store=store), RAGAgent(vector_store=store)
+        other = RAGAgent(vector_store=FakeVectorStore(), temperature=0.5)
+
+        assert second._model is first._model and second._agent is first._agent
+        assert other._model is not first._model and other._agent is not first._agent
+
+    def test_search_agent_is_cached_per_model_and_released_with_its_store(self, monkeypatch):
+        """Agents over one store should get a graph per model setting, dropped once the store is gone."""
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        built = []
+        monkeypatch.setattr(rag_agent, "create_agent", lambda model, **kwargs: built.append(model) or object())
+        store = FakeVectorStore()
+
+        first = RAGAgent(vector_store=store, model_id="gemini-a")
+        same = RAGAgent(vector_store=store, model_id="gemini-a")
+        other = RAGAgent(vector_store=store, model_id="gemini-b")
+
+        assert same._agent is first._agent and other._agent is not first._agent
+        assert built == [rag_agent._get_chat_model("gemini-a", 0.0), rag_agent._get_chat_model("gemini-b", 0.0)]
+        store_ref = weakref.ref(store)
+        del first, same, other, store
+        gc.collect()
+        assert store_ref() is None
+
+
+class TestRAGAgentStream:
+    """Test suite for RAGAgent.astream."""
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_context_tokens_citations_and_answer(self, agent):
+        """A stream should emit context, one event per token, citations, then the full answer."""
+        events = await _collect(agent)
+
+        assert [e.event for e in events] == [
+            StreamEventType.CONTEXT,
+            StreamEventType.TOKEN,
+            StreamEventType.TOKEN,
+            StreamEventType.CITATIONS,
+            StreamEventType.COMPLETE,
+        ]
+        assert [c["chunk_id"] for c in events[0].data["chunks"]] == ["c0", "c1"]
+        assert events[3].data["citations"][0]["doc_name"] == "doc0.pdf"
+        assert all(StreamingCitation.model_validate(c).model_dump() == c for c in events[3].data["citations"])
+        assert events[-1].data == {"full_answer": "Hello world"}
+        assert "---\n[Page 1]\n\ntext 0\n---\n---\n[Page 2]\n\ntext 1\n---" in agent._model.calls[0][-1].content
+
+    @pytest.mark.asyncio
+    async def test_stream_logs_cached_prompt_tokens(self, agent, caplog):
+        """Prompt-cache reads reported by the model should be logged per stream."""
+        with caplog.at_level(logging.INFO):
+            await _collect(agent)
+
+        assert "input_tokens=900, cache_read=600, output_tokens=2" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_repeated_question_is_replayed_from_answer_cache(self, agent):
+        """A near-identical first-turn question should replay the stream without retrieval or generation."""
+        first = await _collect(agent, "What is a vector?")
+        second = await _collect(agent, "what is a vector")
+
+        assert [e.model_dump() for e in second] == [e.model_dump() for e in first]
+        assert len(agent._vector_store.searches) == 1
+        assert len(agent._model.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_follow_up_questions_bypass_answer_cache(self, agent):
+        """Questions with chat history depend on it and should always be answered fresh."""
+        history = [HumanMessage(content="hi"), AIMessage(content="hello")]
+
+        await _collect(agent, chat_history=history)
+        await _collect(agent, chat_history=history)
+
+        assert len(agent._model.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_empty_retrieval_skips_the_model(self, agent, monkeypatch):
+        """With no chunks retrieved, stream and invoke should answer with the canned reply and no model call."""
+        monkeypatch.setattr(agent._vector_store, "similarity_search", lambda **kwargs: [])
+
+        events = await _collect(agent)
+        response = await agent.ainvoke("what is a vector?", session_id="s1")
+
+        assert [e.model_dump() for e in events] == [
+            {"event": StreamEventType.CONTEXT, "data": {"chunks": []}},
+            {"event": StreamEventType.TOKEN, "data": {"token": rag_agent.NO_RESULTS_ANSWER, "index": 0}},
+            {"event": StreamEventType.CITATIONS, "data": {"citations": []}},
+            {"event": StreamEventType.COMPLETE, "data": {"full_answer": rag_agent.NO_RESULTS_ANSWER}},
+        ]
+        assert response.answer == rag_agent.NO_RESULTS_ANSWER and response.citations == []
+        assert agent._model.calls == []
+
+    @pytest.mark.asyncio
+    async def test_prompt_is_fetched_once_per_refresh_interval(self, agent, monkeypatch):
+        """Streams should reuse the fetched prompt instead of asking the registry each time."""
+        fetches = []
+        monkeypatch.setattr(
+            rag_agent, "get_rag_prompt", lambda **kwargs: fetches.append(kwargs) or RAG_AGENT_PROMPT
+        )
+
+        await _collect(agent, "first question")
+        await _collect(agent, "second, different question")
+        agent._prompt_fetched_at -= rag_agent.PROMPT_REFRESH_S
+        await _collect(agent, "third question after the refresh interval")
+
+        assert len(fetches) == 2
+
+    @pytest.mark.asyncio
+    async def test_prompt_refresh_overlaps_retrieval(self, agent, monkeypatch):
+        """A registry fetch should run while the vector search is in flight, not before it."""
+        search_started = threading.Event()
+        overlapped = []
+        search = agent._vector_store.similarity_search
+
+        def slow_search(**kwargs):
+            search_started.set()
+            return search(**kwargs)
+
+        def fetch_prompt(**kwargs):
+            overlapped.append(search_started.wait(2))
+            return RAG_AGENT_PROMPT
+
+        monkeypatch.setattr(agent._vector_store, "similarity_search", slow_search)
+        monkeypatch.setattr(rag_agent, "get_rag_prompt", fetch_prompt)
+
+        await _collect(agent)
+
+        assert overlapped == [True]
+
+
+class TestRAGAgentInvokeFast:
+    """Test suite for RAGAgent.invoke_fast."""
+
+    def test_cite_markers_become_citations(self, agent):
+        """Markers for retrieved chunks become citations in first-cited order and are removed from the answer."""
+        agent._model = FakeStreamingModel(["Vectors have size [cite:c1]", " and direction [cite:c0] [cite:c1] [cite:zz]."])
+
+        response = agent.invoke_fast("what is a vector?", session_id="s1")
+
+        assert response.answer == "Vectors have size and direction."
+        assert [c.chunk_id for c in response.citations] == ["c1", "c0"]
+        assert response.citations[0].page == 2 and response.citations[0].content_snippet == "text 1"
+        assert rag_agent.FAST_CITATION_INSTRUCTION in agent._model.calls[0][-1].content
+        assert "chunk_id: c0" in agent._model.calls[0][-1].content
+
+
+class TestContentText:
+    """Test suite for streamed chunk text extraction."""
+
+    def test_string_and_block_content_are_flattened(self):
+        """String content passes through; list content joins text blocks and strings."""
+        blocks = [{"type": "text", "text": "Hel"}, "lo", {"type": "thinking", "signature": "x"}]
+
+        assert rag_agent._content_text("Hello") == "Hello"
+        assert rag_agent._content_text(blocks) == "Hello"
+        assert rag_agent._content_text([{"type": "thinking", "signature": "x"}]) == ""
+
+
+class TestFormatHistory:
+    """Test suite for chat history rendering."""
+
+    def test_history_is_rendered_as_labelled_turns(self):
+        """Turns should be labelled User/Assistant under a header; no history renders empty."""
+        history = [HumanMessage(content="hi"), AIMessage(content="hello")]
+
+        assert rag_agent._format_history(history) == "Previous Conversation:\nUser: hi\nAssistant: hello\n"
+        assert rag_agent._format_history(None) == rag_agent._format_history([]) == ""
@@ -0,0 +1,374 @@
+"""
+Unit tests for S3VectorsStore.
+
+Tests query embedding batching and caching, result caching, batch search, hedging,
+metadata listing, local MMR re-ranking and batched deletes against a stub
+s3vectors client (no AWS or Gemini calls).
+Dependencies: pytest, numpy, boto3, langchain_core, backend.boundary.vdb.s3_vectors_store
+System role: Production vector store validation
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import numpy as np
+import pytest
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+from botocore.validate import validate_parameters
+from langchain_core.embeddings import Embeddings
+from tenacity import wait_none
+
+from backend.boundary.vdb import s3_vectors_store
+from backend.boundary.vdb.query_embedding_batcher import QueryEmbeddingBatcher
+from backend.boundary.vdb.retry import is_retryable
+from backend.boundary.vdb.s3_vectors_store import S3VectorsStore
+
+VECTORS = {
+    "c0": [1.0, 0.0, 0.0],
+    "c0-dup": [1.0, 0.0, 0.0],
+    "c1": [0.7, 0.7, 0.0],
+    "c2": [0.0, 0.0, 1.0],
+}
+
+SERVICE_MODEL = boto3.client("s3vectors", region_name="us-east-1").meta.service_model
+
+
+class FakeEmbeddings(Embeddings):
+    """Embeddings stub recording embedding calls."""
+
+    def __init__(self):
+        self.query_calls = 0
+        self.document_calls: list[tuple[list[str], dict]] = []
+
+    def embed_query(self, text: str) -> list[float]:
+        self.query_calls += 1
+        return [1.0, 0.0, 0.0]
+
+    def embed_documents(self, texts: list[str], **kwargs) -> list[list[float]]:
+        self.document_calls.append((list(texts), kwargs))
+        return [[1.0, 0.0, 0.0] for _ in texts]
+
+
+class FakeS3VectorsClient:
+    """
+    s3vectors client stub returning every stored vector in key order.
+
+    Request parameters are validated against the real s3vectors service
+    model, so calls botocore would reject fail here too.
+    """
+
+    def __init__(
+        self,
+        first_call_delay_s: float = 0.0,
+        error: Exception | None = None,
+        failures: int | None = None,
+    ):
+        self.queries: list[dict] = []
+        self._first_call_delay_s = first_call_delay_s
+        self._error = error
+        self._failures = failures
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _validate(operation: str, kwargs: dict) -> None:
+        validate_parameters(kwargs, SERVICE_MODEL.operation_model(operation).input_shape)
+
+    def query_vectors(self, **kwargs) -> dict:
+        self._validate("QueryVectors", kwargs)
+        with self._lock:
+            self.queries.append(kwargs)
+            is_first = len(self.queries) == 1
+        if self._error is not None and (self._failures is None or len(self.queries) <= self._failures):
+            raise self._error
+        if is_first and self._first_call_delay_s:
+            threading.Event().wait(self._first_call_delay_s)
+        return {
+            "vectors": [
+                {
+                    "key": key,
+                    "distance": 0.1,
+                    "metadata": {"_page_content": f"text {key}", "chunk_id": key, "session_id": "s1", "doc_id": "d1"},
+                }
+                for key in list(VECTORS)[: kwargs["topK"]]
+            ]
+        }
+
+    def get_vectors(self, **kwargs) -> dict:
+        self._validate("GetVectors", kwargs)
+        with self._lock:
+            self.queries.append(kwargs)
+        return {"vectors": [{"key": key, "data": {"float32": VECTORS[key]}} for key in kwargs["keys"] if key in VECTORS]}
+
+    def delete_vectors(self, **kwargs) -> dict:
+        self._validate("DeleteVectors", kwargs)
+        with self._lock:
+            self.queries.append(kwargs)
+        return {}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """S3VectorsStore wired to stub embeddings and a stub client."""
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(s3_vectors_store, "get_fixed_dimension_embeddings", lambda model, dimension: embeddings)
+    s3_vectors_store._get_vector_store.cache_clear()
+    store = S3VectorsStore(region="us-east-1")
+    store._vector_store.client = FakeS3VectorsClient()
+    yield store
+    s3_vectors_store._get_vector_store.cache_clear()
+
+
+class TestS3VectorsStore:
+    """Test suite for S3VectorsStore search paths."""
+
+    def test_repeated_query_reuses_cached_embedding(self, store):
+        """The second identical query should hit the LRU and still query S3 Vectors."""
+        store._result_cache_size = 0
+        first = store.similarity_search("what is a vector?", k=2, session_id="s1")
+        second = store.similarity_search("what is a vector?", k=2, session_id="s1")
+
+        assert len(store._embeddings.document_calls) == 1
+        assert len(store._vector_store.client.queries) == 2
+        assert [r.chunk_id for r in first] == [r.chunk_id for r in second] == ["c0", "c0-dup"]
+        assert first[0].content == "text c0"
+        assert store._vector_store.client.queries[0]["filter"] == {"session_id": "s1"}
+
+    def test_query_embeddings_are_cached_as_float32_arrays(self, store):
+        """The LRU should hold one read-only float32 array per query and hand it out as-is."""
+        vector = store._embed_query("query")
+
+        assert vector.dtype == np.float32 and not vector.flags.writeable
+        assert store._embed_query("query") is vector
+
+    def test_preloaded_queries_are_batch_embedded_and_served_from_the_lru(self, store):
+        """Preloading should embed distinct queries in one batch and warm the LRU."""
+        store.preload_queries(["q1", "q2", "q1", " "])
+        embed_calls = len(store._embeddings.document_calls)
+
+        store.similarity_search("q2", k=1)
+
+        assert store._embeddings.document_calls[0] == (["q1", "q2"], {"task_type": "RETRIEVAL_QUERY"})
+        assert len(store._embeddings.document_calls) == embed_calls
+
+    def test_concurrent_queries_share_one_embedding_call(self, store):
+        """Queries from concurrent sessions should be embedded together as queries."""
+        store._result_cache_size = 0
+        store._query_embedder = QueryEmbeddingBatcher(store._embeddings, window_ms=200)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda i: store.similarity_search(f"q{i}", k=1, session_id=f"s{i}"), range(4)))
+
+        assert len(store._embeddings.document_calls) == 1
+        texts, kwargs = store._embeddings.document_calls[0]
+        assert sorted(texts) == ["q0", "q1", "q2", "q3"] and kwargs == {"task_type": "RETRIEVAL_QUERY"}
+        assert store._embeddings.query_calls == 0
+
+    def test_mmr_reranks_candidates_with_vectors_from_get_vectors(self, store):
+        """MMR should query candidates, fetch their vectors with GetVectors, and skip near-duplicates."""
+        client = boto3.client("s3vectors", region_name="us-east-1")
+        candidates = [
+            {"key": key, "distance": 0.1, "metadata": {"chunk_id": key, "_page_content": f"text {key}"}}
+            for key in VECTORS
+        ]
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                "query_vectors",
+                {"vectors": candidates, "distanceMetric": "cosine"},
+                {
+                    "vectorBucketName": "student-helper-dev-vectors",
+                    "indexName": "documents",
+                    "topK": 4,
+                    "queryVector": {"float32": [1.0, 0.0, 0.0]},
+                    "filter": {"session_id": "s1"},
+                    "returnMetadata": True,
+                    "returnDistance": True,
+                },
+            )
+            stubber.add_response(
+                "get_vectors",
+                # c1 was deleted between the two calls
+                {"vectors": [{"key": key, "data": {"float32": VECTORS[key]}} for key in VECTORS if key != "c1"]},
+                {
+                    "vectorBucketName": "student-helper-dev-vectors",
+                    "indexName": "documents",
+                    "keys": list(VECTORS),
+                    "returnData": True,
+                },
+            )
+            store._vector_store.client = client
+
+            results = store.max_marginal_relevance_search("query", k=2, fetch_k=4, lambda_mult=0.3, session_id="s1")
+
+            stubber.assert_no_pending_responses()
+        assert [r.chunk_id for r in results] == ["c0", "c2"]
+        assert all(r.similarity_score == 1.0 for r in results)
+
+    def test_batch_search_embeds_queries_in_one_call(self, store):
+        """Batch search should embed every query once as a query and return aligned results."""
+        results = store.similarity_search_batch(["q1", "q2", "q3"], k=1, session_id="s1")
+
+        assert store._embeddings.document_calls == [(["q1", "q2", "q3"], {"task_type": "RETRIEVAL_QUERY"})]
+        assert [[r.chunk_id for r in hits] for hits in results] == [["c0"], ["c0"], ["c0"]]
+        assert all(q["filter"] == {"session_id": "s1"} for q in store._vector_store.client.queries)
+
+    def test_slow_query_is_hedged(self, store):
+        """A query exceeding the hedge budget should be answered by the second request."""
+        store._hedge_after_s = 0.02
+        store._vector_store.client = FakeS3VectorsClient(first_call_delay_s=1.0)
+
+        results = store.similarity_search("query", k=1)
+
+        assert [r.chunk_id for r in results] == ["c0"]
+        assert len(store._vector_store.client.queries) == 2
+
+    def test_non_throttling_errors_are_not_retried(self, store):
+        """Programming errors should surface immediately instead of backing off."""
+        store._vector_store.client = FakeS3VectorsClient(error=ValueError("bad filter"))
+
+        with pytest.raises(ValueError):
+            store.similarity_search("query", k=1)
+
+        assert len(store._vector_store.client.queries) == 1
+
+    def test_client_uses_pooled_keepalive_config(self, monkeypatch):
+        """The boto3 client should keep connections alive in a pool sized for batch search."""
+        monkeypatch.setattr(s3_vectors_store, "get_fixed_dimension_embeddings", lambda model, dimension: None)
+        vector_store = s3_vectors_store._get_vector_store.__wrapped__("bucket", "index", "us-east-1", "m", 8)
+
+        config = vector_store.client.meta.config
+        assert config.max_pool_connections == 64
+        assert config.tcp_keepalive is True
+        assert (config.connect_timeout, config.read_timeout) == (1.0, 5.0)
+
+    def test_query_responses_are_parsed_with_orjson(self, monkeypatch):
+        """The client's orjson body parser should produce the same response as botocore's json."""
+        monkeypatch.setattr(s3_vectors_store, "get_fixed_dimension_embeddings", lambda model, dimension: None)
+        client = s3_vectors_store._get_vector_store.__wrapped__("bucket", "index", "us-east-1", "m", 8).client
+        body = {
+            "vectors": [
+                {"key": "c0", "distance": 0.125, "data": {"float32": [0.1, -2.5]}, "metadata": {"page": 3.0}}
+            ],
+            "distanceMetric": "cosine",
+        }
+        shape = client.meta.service_model.operation_model("QueryVectors").output_shape
+        response = {"body": json.dumps(body).encode(), "headers": {}, "status_code": 200}
+
+        parsed = client._response_parser.parse(response, shape)
+        expected = boto3.client("s3vectors", region_name="us-east-1")._response_parser.parse(response, shape)
+
+        assert s3_vectors_store.ORJSON_AVAILABLE
+        assert parsed == expected
+        assert parsed["vectors"][0]["metadata"] == {"page": 3.0}
+        assert client._response_parser._parse_body_as_json(b"not json") == {"message": "not json"}
+
+    def test_stores_share_the_vector_store_client(self, store):
+        """Stores for the same index should reuse one AmazonS3Vectors and boto3 client."""
+        other = S3VectorsStore(region="us-east-1")
+
+        assert other._vector_store is store._vector_store
+        assert S3VectorsStore(index_name="other", region="us-east-1")._vector_store is not store._vector_store
+
+    def test_blank_query_stays_on_the_filtered_query_path(self, store):
+        """A blank query should run one filtered QueryVectors call, never a ListVectors scan."""
+        store.similarity_search("  ", k=2, session_id="s1")
+
+        assert [q["filter"] for q in store._vector_store.client.queries] == [{"session_id": "s1"}]
+
+    def test_list_by_metadata_is_one_filtered_query(self, store):
+        """Listing should run one filtered QueryVectors call without embedding or scanning the index."""
+        results = store.list_by_metadata(session_id="s1", limit=2)
+
+        assert store._embeddings.query_calls == 0
+        assert [r.chunk_id for r in results] == ["c0", "c0-dup"]
+        assert all(r.similarity_score == 0.0 for r in results)
+        (query,) = store._vector_store.client.queries
+        assert query["filter"] == {"session_id": "s1"}
+        assert query["topK"] == 2
+
+    def test_delete_is_split_into_batches(self, store):
+        """Large deletes should be sent as DeleteVectors calls of at most 100 keys."""
+        chunk_ids = [f"c{i}" for i in range(250)]
+
+        store.delete_by_doc_id("d1", chunk_ids)
+
+        batches = sorted((q["keys"] for q in store._vector_store.client.queries), key=len, reverse=True)
+        assert [len(keys) for keys in batches] == [100, 100, 50]
+        assert sorted(key for keys in batches for key in keys) == sorted(chunk_ids)
+
+    def test_doc_filter_uses_the_ingested_metadata_key(self, store):
+        """Document filters must target doc_id, the key written at ingestion."""
+        store.similarity_search("query", k=1, session_id="s1", doc_id="d1")
+        listed = store.list_by_metadata(session_id="s1", doc_id="d1", limit=1)
+
+        assert store._vector_store.client.queries[0]["filter"] == {"session_id": "s1", "doc_id": "d1"}
+        assert [r.metadata.doc_id for r in listed] == ["d1"]
+
+    def test_filters_are_built_once_per_session_and_document(self):
+        """Repeated filters should be the same memoized dict; no ids means no filter."""
+        assert s3_vectors_store._build_filter("s1", None) is s3_vectors_store._build_filter("s1", None)
+        assert s3_vectors_store._build_filter("s1", "d1") == {"session_id": "s1", "doc_id": "d1"}
+        assert s3_vectors_store._build_filter(None, None) is None
+
+    def test_throttling_retries_reuse_the_query_embedding(self, store, monkeypatch):
+        """Throttled queries should be retried without embedding the query again."""
+        monkeypatch.setattr(S3VectorsStore._query_vectors.retry, "wait", wait_none())
+        throttled = ClientError({"Error": {"Code": "ThrottlingException"}}, "QueryVectors")
+        store._vector_store.client = FakeS3VectorsClient(error=throttled, failures=2)
+
+        results = store.similarity_search("query", k=1)
+
+        assert [r.chunk_id for r in results] == ["c0"]
+        assert len(store._vector_store.client.queries) == 3
+        assert len(store._embeddings.document_calls) == 1
+
+    def test_identical_search_is_served_from_result_cache(self, store):
+        """Repeated searches should skip S3 Vectors until a delete clears the cache."""
+        first = store.similarity_search("query", k=2, session_id="s1")
+        second = store.similarity_search("query", k=2, session_id="s1")
+        store.similarity_search("query", k=3, session_id="s1")
+
+        assert first == second
+        assert len(store._vector_store.client.queries) == 2
+
+        store.delete_by_doc_id("d1", ["c0"])
+        store.similarity_search("query", k=2, session_id="s1")
+
+        assert [q.get("topK") for q in store._vector_store.client.queries] == [2, 3, None, 2]
+
+    def test_expired_results_are_fetched_again(self, store):
+        """Cached results older than the TTL should not be served."""
+        store._result_cache_ttl_s = 0.0
+
+        store.similarity_search("query", k=1)
+        store.similarity_search("query", k=1)
+
+        assert len(store._vector_store.client.queries) == 2
+
+    @pytest.mark.parametrize(
+        ("code", "status", "expected"),
+        [
+            ("ThrottlingException", 429, True),
+            ("ServiceUnavailableException", 503, True),
+            ("InternalServerException", 500, True),
+            ("AccessDeniedException", 403, False),
+            ("ValidationException", 400, False),
+        ],
+    )
+    def test_only_transient_client_errors_are_retryable(self, code, status, expected):
+        """Throttling and 5xx responses are retried; other client errors are permanent."""
+        error = ClientError(
+            {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, "QueryVectors"
+        )
+
+        assert is_retryable(error) is expected
+
+    def test_results_coerce_float_pages_without_validation(self):
+        """S3 Vectors returns numeric metadata as floats; pages should come back as ints."""
+        vectors = [{"key": "c0", "metadata": {"chunk_id": "c0", "page": 3.0, "_page_content": "text"}}]
+
+        (result,) = s3_vectors_store._to_search_results(vectors, [0.25])
+
+        assert result.metadata.page == 3 and isinstance(result.metadata.page, int)
+        assert result == result.model_validate(result.model_dump())
@@ -0,0 +1,65 @@
+"""
+Unit tests for SingleFlight.
+
+Tests that concurrent calls with the same key share one execution and its
+result or exception, and that finished keys run again.
+Dependencies: pytest, backend.boundary.vdb.single_flight
+System role: In-flight deduplication validation
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.boundary.vdb.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Waiters for an in-flight key should get the owner's result without calling fn."""
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_embed() -> list[float]:
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return [1.0, 2.0]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            owner = pool.submit(flight.do, "query", slow_embed)
+            started.wait(5)
+            waiters = [pool.submit(flight.do, "query", slow_embed) for _ in range(3)]
+            # Give the waiters time to join the in-flight call before it finishes
+            threading.Event().wait(0.1)
+            release.set()
+            results = [owner.result()] + [w.result() for w in waiters]
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_exception_reaches_every_waiter_and_key_is_released(self):
+        """A failed call should raise in all waiters and not block later calls."""
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def failing() -> list[float]:
+            started.set()
+            release.wait(5)
+            raise RuntimeError("embedding API down")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            owner = pool.submit(flight.do, "query", failing)
+            started.wait(5)
+            waiter = pool.submit(flight.do, "query", failing)
+            threading.Event().wait(0.1)
+            release.set()
+            for future in (owner, waiter):
+                with pytest.raises(RuntimeError):
+                    future.result()
+
+        assert flight.do("query", lambda: [3.0]) == [3.0]
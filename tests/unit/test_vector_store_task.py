@@ -0,0 +1,154 @@
+"""
+Unit tests for VectorStoreTask.
+
+Tests batched, throttling-tolerant uploads and deletes against a stub
+s3vectors client (no AWS or Gemini calls), and that the ingestion package
+stays importable inside its Lambda image.
+Dependencies: pytest, langchain_aws, backend.core.document_processing.tasks.vector_store_task
+System role: Ingestion upload validation
+"""
+
+import ast
+import threading
+from pathlib import Path
+
+import pytest
+from botocore.exceptions import ClientError
+from langchain_aws.vectorstores import AmazonS3Vectors
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from tenacity import wait_none
+
+from backend.core import document_processing
+from backend.core.document_processing.tasks import vector_store_task
+from backend.core.document_processing.tasks.vector_store_task import VectorStoreTask
+
+
+class FakeEmbeddings(Embeddings):
+    """Embeddings stub encoding the text length."""
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(len(text)), 1.0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeS3VectorsClient:
+    """s3vectors client stub recording writes; the first `throttled` puts fail."""
+
+    def __init__(self, throttled: int = 0):
+        self.puts: list[list[dict]] = []
+        self.deletes: list[list[str]] = []
+        self._throttled = throttled
+        self._lock = threading.Lock()
+
+    def get_index(self, **kwargs) -> dict:
+        return {"index": {"indexName": kwargs["indexName"]}}
+
+    def put_vectors(self, **kwargs) -> dict:
+        with self._lock:
+            if self._throttled:
+                self._throttled -= 1
+                raise ClientError({"Error": {"Code": "ThrottlingException"}}, "PutVectors")
+            self.puts.append(kwargs["vectors"])
+        return {}
+
+    def delete_vectors(self, **kwargs) -> dict:
+        with self._lock:
+            self.deletes.append(kwargs["keys"])
+        return {}
+
+
+@pytest.fixture
+def make_task(monkeypatch):
+    """Factory building tasks wired to stub embeddings and a stub client."""
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(vector_store_task, "get_embedding_cache", lambda: None)
+
+    def _make(client: FakeS3VectorsClient) -> VectorStoreTask:
+        task = VectorStoreTask(vectors_bucket="bucket", region="us-east-1")
+        task._vector_store = AmazonS3Vectors(
+            vector_bucket_name="bucket", index_name="documents", embedding=FakeEmbeddings(), client=client
+        )
+        return task
+
+    return _make
+
+
+def _documents(count: int) -> list[Document]:
+    return [Document(page_content=f"chunk {i}", metadata={"page": i % 7, "start_index": i}) for i in range(count)]
+
+
+class TestVectorStoreTask:
+    """Test suite for VectorStoreTask uploads."""
+
+    def test_upload_is_split_into_put_vectors_batches(self, make_task):
+        """Uploads should send at most 500 vectors per request and return ids in order."""
+        client = FakeS3VectorsClient()
+        documents = _documents(1203)
+
+        ids = make_task(client).upload(documents, document_id="d1", session_id="s1")
+
+        assert sorted(len(batch) for batch in client.puts) == [203, 500, 500]
+        assert ids == [doc.metadata["chunk_id"] for doc in documents]
+        assert {vector["metadata"]["session_id"] for batch in client.puts for vector in batch} == {"s1"}
+
+    def test_throttled_batch_is_retried(self, make_task, monkeypatch):
+        """A throttled PutVectors batch should be retried rather than failing the upload."""
+        monkeypatch.setattr(VectorStoreTask._put_batch.retry, "wait", wait_none())
+        client = FakeS3VectorsClient(throttled=2)
+
+        ids = make_task(client).upload(_documents(10), document_id="d1", session_id="s1")
+
+        assert len(ids) == 10
+        assert [len(batch) for batch in client.puts] == [10]
+
+    def test_embed_texts_are_embedded_but_chunk_text_is_stored(self, make_task):
+        """Substitute embed texts should drive the vectors while the stored page content stays the chunk."""
+        client = FakeS3VectorsClient()
+        documents = _documents(3)
+        embed_texts = [f"context for {doc.page_content}\n\n{doc.page_content}" for doc in documents]
+
+        make_task(client).upload(documents, document_id="d1", session_id="s1", embed_texts=embed_texts)
+
+        vectors = client.puts[0]
+        assert [v["data"]["float32"][0] for v in vectors] == [float(len(text)) for text in embed_texts]
+        assert [v["metadata"]["_page_content"] for v in vectors] == ["chunk 0", "chunk 1", "chunk 2"]
+
+    def test_delete_is_split_into_batches(self, make_task):
+        """Deletes should send at most 500 keys per request and cover every chunk id."""
+        client = FakeS3VectorsClient()
+        chunk_ids = [f"c{i}" for i in range(1100)]
+
+        make_task(client).delete_document("d1", chunk_ids)
+
+        assert sorted(len(keys) for keys in client.deletes) == [100, 500, 500]
+        assert sorted(key for keys in client.deletes for key in keys) == sorted(chunk_ids)
+
+    def test_tasks_share_a_pooled_client(self, make_task):
+        """Tasks in the same region should reuse one keep-alive, rate-limited boto3 client."""
+        first = VectorStoreTask(vectors_bucket="bucket", region="us-east-1")._get_vector_store()
+        second = VectorStoreTask(vectors_bucket="other", region="us-east-1")._get_vector_store()
+
+        assert first.client is second.client
+        assert first.client.meta.config.max_pool_connections == 64
+        assert first.client.meta.config.tcp_keepalive is True
+        assert first.client.meta.config.retries == {"mode": "adaptive", "total_max_attempts": 1}
+
+    def test_ingestion_package_does_not_import_the_boundary_layer(self):
+        """The Lambda image ships only backend/core/document_processing, so no module may import backend.boundary."""
+        package_dir = Path(document_processing.__file__).parent
+        offenders = []
+        for path in package_dir.rglob("*.py"):
+            for node in ast.walk(ast.parse(path.read_text())):
+                if isinstance(node, ast.ImportFrom):
+                    modules = [node.module or ""]
+                elif isinstance(node, ast.Import):
+                    modules = [alias.name for alias in node.names]
+                else:
+                    continue
+                if any(module.startswith("backend.boundary") for module in modules):
+                    offenders.append(f"{path.relative_to(package_dir)}:{node.lineno}")
+
+        assert offenders == []